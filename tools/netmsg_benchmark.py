@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+UniX SDK - NetMsg Conflict Checker Benchmark
+Version: 1.0.0
+
+License: MPL-2.0
+See LICENSE file for details.
+
+2025-2026 © RoidMC Studios
+
+NetMsg ID冲突检测工具的性能基准测试
+
+用途：
+- 生成可配置规模的合成Lua项目（文件数量、NetMsg块数量、冲突密度、GBK/UTF-8比例、大文件）
+- 分别统计文件发现、解析、注册和报告生成各阶段的耗时
+- 将结果保存为JSON，便于比较不同版本之间的性能变化
+
+使用方法：
+- python netmsg_benchmark.py --files 2000 --output result.json
+- python netmsg_benchmark.py --compare baseline.json --output result.json
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from netmsg_conflict_checker import NetMsgConflictChecker
+
+# 确保正确处理中文
+if sys.platform == 'win32':
+    # Windows平台特殊处理
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+# 计时的阶段，按执行顺序排列
+PHASES = ["discovery", "parsing", "registration", "report"]
+
+# 填充代码，模拟普通Lua文件中的函数、注释和字符串
+FILLER_LINES = [
+    "-- 处理玩家数据同步，确保客户端与服务器状态一致",
+    "local function handle{n}(playerId, data)",
+    "    if not data then return nil end",
+    "    local key = \"player_\" .. tostring(playerId) .. \"_{n}\"",
+    "    --[[ 多行注释: Foo.NetMsg = {{ Fake = 1 }} ]]",
+    "    cache[key] = {{ value = data.value, time = os.time() }}",
+    "    return cache[key]",
+    "end",
+    "",
+]
+
+
+def generate_project(root: str, files: int, blocks_per_file: int, ids_per_block: int,
+                     netmsg_ratio: float, conflict_density: float, gbk_ratio: float,
+                     large_files: int, large_file_mb: float, seed: int) -> Dict[str, Any]:
+    """
+    生成合成Lua项目
+    
+    Args:
+        root: 项目根目录
+        files: 普通Lua文件数量
+        blocks_per_file: 包含NetMsg的文件中NetMsg块的数量
+        ids_per_block: 每个NetMsg块中的ID数量
+        netmsg_ratio: 包含NetMsg定义的文件比例
+        conflict_density: 复用已有ID（产生冲突）的概率
+        gbk_ratio: 使用GBK编码的文件比例
+        large_files: 大文件数量
+        large_file_mb: 大文件大小（MB），超过1MB的文件会分块扫描
+        seed: 随机数种子
+    
+    Returns:
+        生成的项目统计信息
+    """
+    rng = random.Random(seed)
+    used_ids = []
+    next_id = 1000
+    stats = {"files": 0, "netmsg_files": 0, "gbk_files": 0, "large_files": 0,
+             "definitions": 0, "bytes": 0}
+    
+    def new_id() -> int:
+        nonlocal next_id
+        if used_ids and rng.random() < conflict_density:
+            return rng.choice(used_ids)
+        next_id += rng.randint(1, 3)
+        used_ids.append(next_id)
+        return next_id
+    
+    def netmsg_block(module: str, block: int) -> List[str]:
+        lines = [f"{module}.NetMsg = {{"]
+        for i in range(ids_per_block):
+            lines.append(f"    Msg{block}_{i} = {new_id()}, -- 消息 {i}")
+        lines.append("}")
+        stats["definitions"] += ids_per_block
+        return lines
+    
+    def write(rel_path: str, lines: List[str], gbk: bool) -> None:
+        abs_path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        data = "\n".join(lines).encode("gbk" if gbk else "utf-8")
+        with open(abs_path, "wb") as file:
+            file.write(data)
+        stats["files"] += 1
+        stats["bytes"] += len(data)
+        stats["gbk_files"] += gbk
+    
+    # 报告输出目录
+    os.makedirs(os.path.join(root, "src", "Public", "UniX-SDK", "tools"), exist_ok=True)
+    
+    for n in range(files):
+        module = f"Module{n}"
+        rel_path = os.path.join("src", "Game", f"pkg{n % 50}", f"module_{n}.lua")
+        lines = [f"local {module} = {{}}", ""]
+        has_netmsg = rng.random() < netmsg_ratio
+        if has_netmsg:
+            stats["netmsg_files"] += 1
+            for block in range(blocks_per_file):
+                lines.extend(netmsg_block(module, block))
+        for i in range(rng.randint(5, 20)):
+            lines.extend(line.format(n=i) for line in FILLER_LINES)
+        lines.append(f"return {module}")
+        write(rel_path, lines, rng.random() < gbk_ratio)
+    
+    filler = [line.format(n=0) for line in FILLER_LINES]
+    filler_size = len("\n".join(filler).encode("utf-8")) + 1
+    for n in range(large_files):
+        module = f"Generated{n}"
+        repeat = max(1, int(large_file_mb * 1024 * 1024 / filler_size))
+        lines = [f"local {module} = {{}}"] + netmsg_block(module, 0) + filler * repeat
+        write(os.path.join("src", "Generated", f"protocol_{n}.lua"), lines, False)
+        stats["large_files"] += 1
+    
+    # 将修改时间调整到一分钟前，模拟近期未修改的项目，使热启动场景能直接命中缓存
+    mtime = time.time() - 60
+    for directory, _, names in os.walk(os.path.join(root, "src")):
+        for name in names:
+            os.utime(os.path.join(directory, name), (mtime, mtime))
+    
+    return stats
+
+
+def run_benchmark(root: str, jobs: int, use_cache: bool) -> Dict[str, float]:
+    """
+    运行一次完整检查，分别统计各阶段耗时
+    
+    Args:
+        root: 项目根目录
+        jobs: 并行解析的进程数
+        use_cache: 是否使用解析缓存
+    
+    Returns:
+        {阶段: 耗时（秒）}
+    """
+    checker = NetMsgConflictChecker(root)
+    checker.config["jobs"] = jobs
+    checker.config["use_cache"] = use_cache
+    timings = {}
+    
+    # 检测器作为库使用时不输出到控制台，输出不会影响计时
+    start = time.perf_counter()
+    checker.file_index = checker.discover_files()
+    timings["discovery"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    parsed = checker.parse_files(checker.file_index)
+    timings["parsing"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    checker.register_definitions(parsed)
+    checker.register_references(checker.cache_entries)
+    timings["registration"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    checker.generate_report()
+    checker.generate_data_report()
+    timings["report"] = time.perf_counter() - start
+    
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """汇总多次运行的各阶段耗时"""
+    summary = {}
+    for phase in PHASES + ["total"]:
+        values = sorted(run[phase] for run in runs)
+        summary[phase] = {
+            "min": values[0],
+            "median": values[len(values) // 2],
+            "mean": sum(values) / len(values),
+            "max": values[-1]
+        }
+    return summary
+
+
+def print_summary(title: str, summary: Dict[str, Dict[str, float]],
+                  baseline: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+    """输出各阶段耗时，提供基准结果时同时输出变化比例"""
+    print(f"\n{title}")
+    print("--------------------------------------------")
+    for phase in PHASES + ["total"]:
+        line = f"{phase:<14}{summary[phase]['median'] * 1000:>10.1f} ms"
+        if baseline and phase in baseline:
+            base = baseline[phase]["median"]
+            if base > 0:
+                line += f"  ({(summary[phase]['median'] - base) / base * 100:+.1f}%)"
+        print(line)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='UniX SDK - NetMsg ID 冲突检测工具性能基准测试')
+    parser.add_argument('--files', type=int, default=1000, help='普通Lua文件数量 (默认: 1000)')
+    parser.add_argument('--blocks-per-file', type=int, default=1, help='每个文件的NetMsg块数量 (默认: 1)')
+    parser.add_argument('--ids-per-block', type=int, default=10, help='每个NetMsg块的ID数量 (默认: 10)')
+    parser.add_argument('--netmsg-ratio', type=float, default=0.2,
+                        help='包含NetMsg定义的文件比例 (默认: 0.2)')
+    parser.add_argument('--conflict-density', type=float, default=0.01,
+                        help='复用已有ID产生冲突的概率 (默认: 0.01)')
+    parser.add_argument('--gbk-ratio', type=float, default=0.3, help='GBK编码文件比例 (默认: 0.3)')
+    parser.add_argument('--large-files', type=int, default=0, help='大文件数量 (默认: 0)')
+    parser.add_argument('--large-file-mb', type=float, default=9.5,
+                        help='大文件大小，单位MB (默认: 9.5)')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子 (默认: 42)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='并行解析的进程数 (默认: 1)')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='每种场景的运行次数 (默认: 3)')
+    parser.add_argument('--project', help='生成项目的目录 (默认: 临时目录，结束后删除)')
+    parser.add_argument('--output', '-o', help='结果JSON文件路径')
+    parser.add_argument('--compare', help='用于比较的历史结果JSON文件')
+    args = parser.parse_args()
+    
+    params = {
+        "files": args.files,
+        "blocks_per_file": args.blocks_per_file,
+        "ids_per_block": args.ids_per_block,
+        "netmsg_ratio": args.netmsg_ratio,
+        "conflict_density": args.conflict_density,
+        "gbk_ratio": args.gbk_ratio,
+        "large_files": args.large_files,
+        "large_file_mb": args.large_file_mb,
+        "seed": args.seed,
+        "jobs": args.jobs,
+        "repeat": args.repeat
+    }
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)["results"]
+    
+    root = args.project or tempfile.mkdtemp(prefix="netmsg_bench_")
+    try:
+        print(f"正在生成合成项目: {root}")
+        start = time.perf_counter()
+        project = generate_project(root, args.files, args.blocks_per_file, args.ids_per_block,
+                                   args.netmsg_ratio, args.conflict_density, args.gbk_ratio,
+                                   args.large_files, args.large_file_mb, args.seed)
+        print(f"生成完成: {project['files']} 个文件, {project['definitions']} 个定义, "
+              f"{project['bytes'] / 1024 / 1024:.1f} MB ({time.perf_counter() - start:.1f} 秒)")
+        
+        # 冷启动：不使用缓存；热启动：缓存已建立，文件未变化
+        cold_runs = [run_benchmark(root, args.jobs, use_cache=False) for _ in range(args.repeat)]
+        run_benchmark(root, args.jobs, use_cache=True)
+        warm_runs = [run_benchmark(root, args.jobs, use_cache=True) for _ in range(args.repeat)]
+    finally:
+        if not args.project:
+            shutil.rmtree(root, ignore_errors=True)
+    
+    results = {"cold": summarize(cold_runs), "warm": summarize(warm_runs)}
+    print_summary("冷启动 (不使用缓存，中位数)", results["cold"], baseline and baseline.get("cold"))
+    print_summary("热启动 (使用缓存，中位数)", results["warm"], baseline and baseline.get("warm"))
+    
+    if args.output:
+        report = {
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": sys.platform,
+                "cpu_count": os.cpu_count()
+            },
+            "params": params,
+            "project": project,
+            "results": results,
+            "runs": {"cold": cold_runs, "warm": warm_runs}
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.output}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,12 +31,38 @@ import re
 import sys
 import json
 import argparse
+import bisect
 import traceback
 import codecs
+import contextlib
+import fnmatch
+import hashlib
+import inspect
+import itertools
 import logging
+import logging.handlers
+import operator
+import select
+import socketserver
+import struct
+import subprocess
+import threading
+import time
+import types
+from array import array
 from datetime import datetime
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple, Any, Optional
+from collections.abc import Mapping, Sequence
+from typing import Dict, List, Set, Tuple, Any, Optional, NamedTuple, Iterable, Union
+
+try:
+    import tomllib
+except ImportError:
+    # Python 3.11以下可以使用兼容的tomli，都不可用时只支持JSON格式的所有者配置
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
 
 # 确保正确处理中文
 if sys.platform == 'win32':
@@ -44,453 +70,4414 @@ if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
-class NetMsgConflictChecker:
-    """网络消息ID冲突检测器"""
+# 日志记录器，作为库使用时默认不输出任何内容，由调用方（或命令行入口）配置输出方式
+logger = logging.getLogger("netmsg_conflict_checker")
+logger.addHandler(logging.NullHandler())
+
+
+class FileEntry(NamedTuple):
+    """文件索引条目"""
+    path: str       # 相对于项目根目录的路径
+    size: int       # 文件大小（字节）
+    mtime_ns: int   # 修改时间（纳秒）
+
+
+class CheckResult(NamedTuple):
+    """
+    检查结果
     
-    def __init__(self, project_root: str):
+    各字段直接引用检测器的内部数据，检测器再次运行或更新前保持有效。
+    """
+    project_root: str                                       # 项目根目录
+    file_count: int                                         # 索引的文件数量
+    definitions: Dict[str, List[Tuple[str, int]]]           # {文件路径: [(名称, ID), ...]}
+    discovered_ids: Mapping                                 # {id: [NetMsgDefinition, ...]}
+    conflicts: Mapping                                      # {id: [NetMsgDefinition, ...]}
+    reserved_violations: Dict[str, List["NetMsgDefinition"]]  # {范围名称: [NetMsgDefinition, ...]}
+    undefined_references: List["NetMsgReference"]           # 引用了未定义的名称
+    unused_definitions: Sequence                            # 从未被引用的定义 [NetMsgDefinition, ...]
+    report_paths: Dict[str, str]                            # {报告类型: 绝对路径}，未写入报告时为空
+    profile: Optional[Dict[str, Any]]                       # 性能分析数据，未启用时为None
+    
+    @property
+    def violation_count(self) -> int:
+        """违反保留范围的ID数量"""
+        return sum(len(v) for v in self.reserved_violations.values())
+    
+    @property
+    def ok(self) -> bool:
+        """没有ID冲突和保留范围违规"""
+        return not self.conflicts and not self.violation_count
+
+
+# 解析缓存格式版本，扫描规则或缓存结构变化时递增
+CACHE_VERSION = 6
+
+# 分片部分结果的格式版本，部分结果的结构变化时递增
+PARTIAL_RESULT_VERSION = 1
+
+# 修改时间落在缓存写入前该时间窗口内的文件，需要比较内容哈希才能确认未变化
+CACHE_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+# 写入报告文件时使用的缓冲区大小
+REPORT_BUFFER_SIZE = 1024 * 1024
+
+# 命令行输出缓冲的消息条数，警告及以上级别的消息会立即输出
+LOG_BUFFER_CAPACITY = 1000
+
+# 超过该大小的文件分块读取和扫描，内存占用与文件大小无关
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# 分块扫描时，每块末尾留到下一块再处理的字符数，跨行的记号（如 NetMsg =\n{）不能超过该长度；
+# 分块处没有换行（如压缩成一行的文件）时在距末尾该长度处分块
+SCAN_HOLDBACK = 4096
+
+# ID的最大值（64位有符号整数），更大的值（如过长的数字）视为无法确定
+MAX_ID_VALUE = 2 ** 63 - 1
+
+# 解析结果在缓存条目中的字段，文件内容未变化时沿用缓存中的这些字段
+PARSE_RESULT_FIELDS = ("definitions", "references")
+
+# 保留范围未指定所有者时的默认所有者：路径中任一部分包含UniX-SDK的文件（即SDK自己的文件）
+DEFAULT_RANGE_OWNERS = ("**/*UniX-SDK*/**",)
+
+# 非ASCII字节，用于快速判断文件是否为纯ASCII
+_NON_ASCII_PATTERN = re.compile(rb'[\x80-\xff]')
+
+# ID的值的开头：数字、名称、括号或负号，值本身由parse_lua_constant从该位置开始解析（如 BASE + 3、0x30D41）
+_LUA_EXPR_PATTERN = r'(?=[\w.(]|-(?!-))'
+
+# 表达式中的空白和注释
+_LUA_SPACE_PATTERN = re.compile(r'(?:\s+|--\[(=*)\[.*?\]\1\]|--(?!\[=*\[)[^\n]*)*', re.S)
+
+# 常量表达式的记号：数字、名称、运算符
+# 数字与Lua词法一致，连同其后紧跟的字母、数字、下划线和.一起读入（如 1e5、0x1p4、1..2），再整体检查格式
+_LUA_EXPR_TOKEN_PATTERN = re.compile(r"""
+      (?P<number>0[xX](?:[pP][+-]|[\w.])*|\.?\d(?:[eE][+-]|[\w.])*)
+    | (?P<name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+    | (?P<op>//|\.\.|-(?!-)|[+*/%^()])
+""", re.X)
+
+# 合法的Lua数字：十六进制（可带小数和p指数）、十进制（可带小数和e指数）
+_LUA_HEX_NUMBER_PATTERN = re.compile(r'0[xX](?:[0-9A-Fa-f]+\.?[0-9A-Fa-f]*|\.[0-9A-Fa-f]+)(?:[pP][+-]?\d+)?')
+_LUA_DECIMAL_NUMBER_PATTERN = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+# 十进制整数ID，后面不能紧跟其他数字字符（如 1e5、1.5），更长的数字交给parse_lua_constant判断
+_DECIMAL_ID_PATTERN = re.compile(r'\d{1,19}(?![\w.])')
+
+# Lua词法扫描模式 - 注释和字符串整体跳过，只在代码中识别NetMsg定义和引用
+# 每个分支都以固定字符开头，正则引擎可以直接跳到候选位置，整个文件只需扫描一遍
+# 长注释和长字符串在当前内容中没有结束标记时，只匹配开始标记（comment_open/string_open），由扫描器在后续内容中查找结束标记
+# 分块扫描时，到内容末尾仍未结束的行注释（line_comment）和字符串（quote_open）可能被分块截断，由扫描器单独处理
+_LUA_TOKEN_SOURCE = r"""
+      --(?:\[(?P<comment_eq>=*)\[(?:.*?\](?P=comment_eq)\]|(?P<comment_open>))|(?P<line_comment>[^\n]*))   # 注释 -- ... / --[[ ... ]]
+    | \[(?P<string_eq>=*)\[(?:.*?\](?P=string_eq)\]|(?P<string_open>))                # 长字符串 [[ ... ]]
+    | "(?:\\.|[^"\\\n])*"                                         # 双引号字符串
+    | '(?:\\.|[^'\\\n])*'                                         # 单引号字符串
+    | (?P<quote_open>"(?:\\.|[^"\\\n])*\\?\Z|'(?:\\.|[^'\\\n])*\\?\Z)  # 到内容末尾仍未结束的字符串
+    | NetMsg(?:\s*=\s*(?P<block>\{)                                 # 块定义 NetMsg = {
+              |\.(?P<key>[A-Za-z_]\w{0,99})(?:\s*=\s*(?P<value>%s))?)  # 单行定义 NetMsg.Key = Value 或引用 NetMsg.Key
+    | local\s+(?!function\b)(?P<local>[A-Za-z_]\w{0,99})(?:\s*<\s*\w+\s*>)?          # 局部变量 local BASE = 210000
+            (?P<local_names>(?:\s*,\s*[A-Za-z_]\w{0,99}(?:\s*<\s*\w+\s*>)?)*)            # local a, b = ... 或没有初始值的 local a
+            (?:\s*=[ \t]*(?P<local_value>%s))?
+""" % (_LUA_EXPR_PATTERN, _LUA_EXPR_PATTERN)
+_LUA_TOKEN_PATTERN = re.compile(_LUA_TOKEN_SOURCE, re.S | re.X)
+
+# 同时识别代码块开始和结束关键字的扫描模式，用于按作用域确定局部常量的值
+# 关键字在代码中很常见，匹配次数成倍增加，只在ID用到局部常量的文件中使用
+_LUA_SCOPED_TOKEN_PATTERN = re.compile(_LUA_TOKEN_SOURCE + r"""
+    | \b(?P<scope>function|do|if|repeat|end|until)\b              # 代码块的开始和结束，块内的局部变量在块结束后不再可见
+""", re.S | re.X)
+
+# 函数的参数列表，参数在函数体内覆盖同名的局部常量
+_LUA_FUNCTION_PARAMS_PATTERN = re.compile(r'\s*[\w.:]*\s*\(([^)]*)\)')
+
+# NetMsg定义块内部的扫描模式 - 跟踪花括号深度，只收集第一层的键值对，并识别值中对其他NetMsg的引用
+_BLOCK_TOKEN_PATTERN = re.compile(r"""
+      (?P<long_comment>--\[(?P<comment_eq>=*)\[.*?\](?P=comment_eq)\])
+    | (?P<long_comment_open>--\[(?P<open_comment_eq>=*)\[)
+    | (?P<line_comment>--[^\n]*)
+    | (?P<long_string>\[(?P<string_eq>=*)\[.*?\](?P=string_eq)\])
+    | (?P<long_string_open>\[(?P<open_string_eq>=*)\[)
+    | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+    | (?P<quote_open>"(?:\\.|[^"\\\n])*\\?\Z|'(?:\\.|[^'\\\n])*\\?\Z)
+    | (?P<open>\{)
+    | (?P<close>\})
+    | (?P<reference>NetMsg\.(?P<reference_key>[A-Za-z_]\w{0,99}))    # 引用 A = Other.NetMsg.B
+    | (?P<pair>(?P<key>[A-Za-z_]\w{0,99})\s*=\s*(?:(?P<id>\d{1,19})[ \t]*(?=[,;}])|(?P<value>%s)))  # 最常见的 Key = 123, 直接匹配
+""" % _LUA_EXPR_PATTERN, re.S | re.X)
+
+
+# 常量表达式的二元运算符：{运算符: (优先级, 运算)}，与Lua一致，^为右结合且优先级高于一元负号
+_LUA_BINARY_OPERATORS = {
+    '+': (1, operator.add),
+    '-': (1, operator.sub),
+    '*': (2, operator.mul),
+    '/': (2, operator.truediv),
+    '//': (2, operator.floordiv),
+    '%': (2, operator.mod),
+    '^': (4, lambda a, b: float(a) ** b)
+}
+
+# 一元负号的优先级
+_LUA_UNARY_PRECEDENCE = 3
+
+
+def _is_identifier_char(char: str) -> bool:
+    """判断字符是否可以作为Lua标识符的一部分"""
+    return char.isalnum() or char == '_'
+
+
+def _lua_number(text: str):
+    """将Lua数字转换为int或float，格式不正确（如 1e、1..2）或过长时抛出ValueError"""
+    if len(text) > 64:
+        # 超出ID范围的数字，避免转换任意长的数字
+        raise ValueError(text)
+    if _LUA_HEX_NUMBER_PATTERN.fullmatch(text):
+        if '.' in text or 'p' in text or 'P' in text:
+            return float.fromhex(text)
+        return int(text, 16)
+    if _LUA_DECIMAL_NUMBER_PATTERN.fullmatch(text):
+        return int(text) if text.isdigit() else float(text)
+    raise ValueError(text)
+
+
+def _is_lua_expression_end(text: str, pos: int, in_table: bool) -> bool:
+    """
+    判断表达式是否在pos处结束
+    
+    表构造器中的字段之后只能是 , ; }，语句之后只能是 ;、下一条语句（以名称开头，and/or除外）或文件末尾，
+    其他内容（如 .. 拼接、函数调用的括号、比较运算）说明值不是常量表达式。
+    """
+    pos = _LUA_SPACE_PATTERN.match(text, pos).end()
+    char = text[pos:pos + 1]
+    if in_table:
+        return char in (',', ';', '}')
+    if char in ('', ';'):
+        return True
+    if not (char.isalpha() or char == '_'):
+        return False
+    # and/or是二元运算符，不是下一条语句的开头
+    for word in ('and', 'or'):
+        if text.startswith(word, pos) and not _is_identifier_char(text[pos + len(word):pos + len(word) + 1]):
+            return False
+    return True
+
+
+def parse_lua_constant(text: str, pos: int, symbols: Dict[str, int]) -> Tuple[Optional[int], int]:
+    """
+    从text的pos处解析Lua常量表达式
+    
+    支持十进制和十六进制数字（含小数和指数）、符号表中的常量名、括号、一元负号和 + - * / // % ^ 运算，
+    如 BASE + 3、0x30D41、(BASE + 1) * 2。表达式可以跨行，其中的注释会被跳过，
+    遇到不能继续表达式的记号（如下一条语句的名称、逗号）时结束。
+    
+    Args:
+        text: 源码文本
+        pos: 表达式的起始位置
+        symbols: 已知常量 {名称: 值}
+        
+    Returns:
+        (值, 表达式最后一个记号的结束位置)；包含未知名称、格式错误的数字，或结果不是不超过MAX_ID_VALUE的非负整数时值为None
+    """
+    space = _LUA_SPACE_PATTERN.match
+    token_match = _LUA_EXPR_TOKEN_PATTERN.match
+    
+    def token(pos: int):
+        pos = space(text, pos).end()
+        match = token_match(text, pos)
+        if match is None:
+            return None, None, pos
+        return match.lastgroup, match.group(), match.end()
+    
+    def parse(pos: int, min_precedence: int):
+        kind, value, end = token(pos)
+        if value == '-':
+            value, end = parse(end, _LUA_UNARY_PRECEDENCE)
+            value = -value
+        elif value == '(':
+            value, end = parse(end, 0)
+            kind, close, end = token(end)
+            if close != ')':
+                raise ValueError(text[pos:end])
+        elif kind == "number":
+            value = _lua_number(value)
+        elif kind == "name" and value in symbols:
+            value = symbols[value]
+        else:
+            raise ValueError(text[pos:end])
+        
+        while True:
+            kind, op, op_end = token(end)
+            if op not in _LUA_BINARY_OPERATORS:
+                return value, end
+            precedence, function = _LUA_BINARY_OPERATORS[op]
+            if precedence < min_precedence:
+                return value, end
+            # ^为右结合，其余运算符为左结合
+            right, end = parse(op_end, precedence if op == '^' else precedence + 1)
+            value = function(value, right)
+    
+    try:
+        value, end = parse(pos, 0)
+    except (ValueError, TypeError, OverflowError, ZeroDivisionError, RecursionError):
+        return None, pos
+    if isinstance(value, float):
+        if not value.is_integer():
+            return None, pos
+        value = int(value)
+    if not isinstance(value, int) or not 0 <= value <= MAX_ID_VALUE:
+        return None, pos
+    return value, end
+
+
+def evaluate_lua_constant(expr: str, symbols: Dict[str, int]) -> Optional[int]:
+    """
+    计算Lua常量表达式的值
+    
+    Args:
+        expr: 表达式文本，整个文本（除首尾空白和注释）必须是一个表达式
+        symbols: 已知常量 {名称: 值}
+        
+    Returns:
+        非负整数值；规则与parse_lua_constant相同，表达式之后还有其他内容时返回None
+    """
+    value, end = parse_lua_constant(expr, 0, symbols)
+    if value is None or _LUA_SPACE_PATTERN.match(expr, end).end() != len(expr):
+        return None
+    return value
+
+
+class NetMsgScanner:
+    """
+    可分段输入的NetMsg词法扫描器
+    
+    NetMsg定义块的花括号深度和未闭合的长注释/长字符串在分段之间保留，
+    因此跨越分段边界的定义块和注释都能正确识别，扫描大文件时内存占用与文件大小无关。
+    
+    局部常量按代码块作用域记录：function/do/if/repeat块内的声明在块结束后撤销，函数参数在函数体内覆盖同名常量。
+    跟踪代码块需要匹配所有关键字，因此默认不跟踪；扫描后needs_scopes为True时，应以scoped=True重新扫描。
+    """
+    
+    def __init__(self, references: Optional[List[Tuple[str, int]]] = None, scoped: bool = False):
         """
-        初始化检测器
+        Args:
+            references: 如果提供，按出现顺序追加引用的(名称, 行号)
+            scoped: 是否跟踪代码块，按作用域确定局部常量的值
+        """
+        self.definitions = []   # [(名称, ID), ...]，按出现顺序排列
+        self.references = references
+        self.symbols = {}       # 当前可见的值为常量的局部变量 {名称: 值}
+        self.scoped = scoped
+        self._pattern = _LUA_SCOPED_TOKEN_PATTERN if scoped else _LUA_TOKEN_PATTERN
+        self._scopes = []       # 每层嵌套代码块中被覆盖的局部常量 [[(名称, 块外的值或None), ...], ...]
+        self._has_locals = False        # 是否声明过局部变量
+        self._has_expressions = False   # 是否有ID不是十进制数字，可能用到局部常量
+        self.matches = 0        # 正则匹配次数
+        self._seen = set()
+        self._depth = 0         # NetMsg定义块内的花括号深度，0表示不在定义块内
+        self._closer = None     # 未闭合的长注释或长字符串的结束标记，如 "]==]"
+        self._line = 1          # 当前分段起始位置的行号
+        self._line_pos = 0      # 行号已统计到的位置
+        self._prev_char = ''    # 上一个分段已处理部分的最后一个字符
+    
+    def add(self, name: str, id_value: int) -> None:
+        """登记定义，同一文件中相同的(名称, ID)只登记一次"""
+        item = (name, id_value)
+        if item not in self._seen:
+            # 集合和定义列表共用同一个元组
+            self._seen.add(item)
+            self.definitions.append(item)
+    
+    def feed(self, content: str, final: bool = True) -> int:
+        """
+        扫描一段源码
+        
+        非最后一段时，末尾SCAN_HOLDBACK个字符内开始的记号可能跨越分段边界（如 NetMsg =\n{），
+        留到下一段再处理。通常在此之前的最后一个换行处分段；没有换行时在距末尾SCAN_HOLDBACK处分段，
+        跨越该处的行注释在下一段中查找换行，字符串从开头留到下一段，未处理部分的长度因此有上限。
         
         Args:
-            project_root: 项目根目录路径
+            content: 源码片段
+            final: 是否为最后一段
+            
+        Returns:
+            已处理的长度，content[返回值:]需要拼接在下一段之前重新输入
         """
-        # 规范化项目根目录路径，确保使用正确的路径分隔符
-        self.project_root = os.path.abspath(project_root)
+        if final:
+            limit = len(content)
+        else:
+            limit = content.rfind('\n', 0, max(0, len(content) - SCAN_HOLDBACK)) + 1
+            if limit == 0:
+                limit = max(0, len(content) - SCAN_HOLDBACK)
         
-        # 检测是否在工具目录下运行，如果是则自动向上查找项目根目录
-        tools_dir = os.path.join("src", "Public", "UniX-SDK", "tools")
-        if os.path.normpath(self.project_root).endswith(os.path.normpath(tools_dir)):
-            # 当前在tools目录下，向上四级找到项目根目录
-            self.project_root = os.path.abspath(os.path.join(self.project_root, "..", "..", "..", ".."))
-            print(f"检测到在工具目录下运行，已自动调整项目根目录为: {self.project_root}")
+        pos = 0
+        self._line_pos = 0
+        while True:
+            if self._closer is not None:
+                end = content.find(self._closer, pos)
+                if end < 0:
+                    # 结束标记本身可能被分段截断，保留末尾几个字符
+                    pos = len(content) if final else max(pos, len(content) - len(self._closer) + 1)
+                    break
+                pos = end + len(self._closer)
+                self._closer = None
+            elif self._depth:
+                pos = self._scan_block(content, pos, limit)
+                if self._depth and self._closer is None:
+                    break
+            else:
+                pos = self._scan_code(content, pos, limit)
+                if not self._depth and self._closer is None:
+                    break
         
-        # 配置
-        self.config = {
-            # 扫描目录（相对于项目根目录）
-            "scan_dirs": [
-                os.path.join("src", "Public"),
-                os.path.join("src"),
-                # 添加其他需要扫描的目录
-            ],
+        self._line += content.count('\n', self._line_pos, pos)
+        if pos > 0:
+            self._prev_char = content[pos - 1]
+        return pos
+    
+    def _scan_code(self, content: str, pos: int, limit: int) -> int:
+        """扫描定义块以外的代码，进入定义块、遇到未闭合的长注释/长字符串或到达limit时返回当前位置"""
+        search = self._pattern.search
+        while True:
+            match = search(content, pos)
+            if match is None or match.start() >= limit:
+                # limit之前没有记号开始，可以直接从limit继续
+                return max(pos, limit)
+            self.matches += 1
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "scope":
+                self._enter_or_leave(content, match)
+                continue
+            if kind == "comment_open":
+                self._closer = "]" + match.group("comment_eq") + "]"
+                return pos
+            if kind == "string_open":
+                self._closer = "]" + match.group("string_eq") + "]"
+                return pos
+            if limit < len(content) and pos == len(content):
+                if kind == "line_comment":
+                    # 行注释被分段截断，在下一段中查找行尾
+                    self._closer = "\n"
+                    return pos
+                if kind == "quote_open":
+                    # 字符串被分段截断，从字符串开头留到下一段
+                    return match.start()
+            if kind not in ("block", "key", "value", "local_value", "local_names"):
+                # 注释或字符串，整体跳过
+                continue
             
-            # 文件扩展名过滤
-            "file_extensions": [
-                ".lua"
-            ],
+            # NetMsg前面紧跟标识符字符时不是独立的NetMsg（如 MyNetMsg = {...}）
+            start = match.start()
+            prev = content[start - 1] if start > 0 else self._prev_char
+            if prev and _is_identifier_char(prev):
+                pos = start + 1
+                continue
             
-            # SDK保留ID范围
-            "reserved_ranges": [
-                {"name": "UniX SDK", "min": 200000, "max": 250000}
-                # 可以添加其他保留范围
-            ],
+            if kind == "block":
+                self._depth = 1
+                return pos
+            if kind in ("local_names", "local_value"):
+                self._has_locals = True
+            if kind == "local_names" or match.group("local_names"):
+                # 没有初始值或同时声明多个变量（local a, b = 1, 2），这些名称不再是可确定的常量
+                self._declare(match.group("local"), None)
+                for name in match.group("local_names").split(',')[1:]:
+                    self._declare(name.split('<')[0].strip(), None)
+                if kind == "local_value":
+                    pos = match.start("local_value")
+            elif kind == "local_value":
+                # 局部变量被重新声明时，之前的值不再可见
+                value, pos = self.evaluate(content, match.start("local_value"), False, False)
+                self._declare(match.group("local"), value)
+            elif kind == "value":
+                value, pos = self.evaluate(content, match.start("value"), False)
+                if value is not None:
+                    self.add(match.group("key"), value)
+            elif self.references is not None:
+                self._add_reference(content, start, pos, match.group("key"))
+    
+    def _scan_block(self, content: str, pos: int, limit: int) -> int:
+        """扫描NetMsg定义块，定义块结束、遇到未闭合的长注释/长字符串或到达limit时返回当前位置"""
+        search = _BLOCK_TOKEN_PATTERN.search
+        while True:
+            match = search(content, pos)
+            if match is None or match.start() >= limit:
+                return max(pos, limit)
+            self.matches += 1
+            pos = match.end()
+            kind = match.lastgroup
             
-            # 输出文件路径（相对于项目根目录）
-            "output_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_report.txt"),
+            if kind == "open":
+                self._depth += 1
+            elif kind == "close":
+                self._depth -= 1
+                if self._depth == 0:
+                    return pos
+            elif kind == "long_comment_open":
+                self._closer = "]" + match.group("open_comment_eq") + "]"
+                return pos
+            elif kind == "long_string_open":
+                self._closer = "]" + match.group("open_string_eq") + "]"
+                return pos
+            elif limit < len(content) and pos == len(content) and kind in ("line_comment", "quote_open"):
+                # 行注释或字符串被分段截断，与_scan_code相同
+                if kind == "quote_open":
+                    return match.start()
+                self._closer = "\n"
+                return pos
+            elif kind == "reference" and self.references is not None:
+                start = match.start()
+                prev = content[start - 1] if start > 0 else self._prev_char
+                if not (prev and _is_identifier_char(prev)):
+                    self._add_reference(content, start, pos, match.group("reference_key"))
+            elif kind == "pair" and self._depth == 1:
+                start = match.start()
+                prev = content[start - 1] if start > 0 else self._prev_char
+                if prev and (_is_identifier_char(prev) or prev == '.'):
+                    continue
+                if match.group("id") is not None and int(match.group("id")) <= MAX_ID_VALUE:
+                    value = int(match.group("id"))
+                else:
+                    value, pos = self.evaluate(content, match.start("value"), True)
+                if value is not None:
+                    self.add(match.group("key"), value)
+    
+    @property
+    def needs_scopes(self) -> bool:
+        """未跟踪代码块，而文件中既声明了局部变量，又有ID是表达式，结果可能与按作用域扫描不同"""
+        return not self.scoped and self._has_locals and self._has_expressions
+    
+    def _add_reference(self, content: str, start: int, end: int, key: str) -> None:
+        """登记从start开始、到end结束的 NetMsg.Key 引用"""
+        # 赋值（NetMsg.Key = 表达式）既不是引用也不是可识别的定义，比较运算（==）是引用
+        rest = content[end:end + 102].lstrip()
+        if rest.startswith('=') and not rest.startswith('=='):
+            return
+        # 行号按引用位置增量计算，只统计上一个引用之后的换行符
+        self._line += content.count('\n', self._line_pos, start)
+        self._line_pos = start
+        self.references.append((key, self._line))
+    
+    def _enter_or_leave(self, content: str, match) -> None:
+        """处理代码块的开始或结束关键字，代码块结束时撤销块内对局部常量的声明"""
+        start = match.start()
+        if start == 0 and self._prev_char and _is_identifier_char(self._prev_char):
+            # 关键字是上一个分段末尾的标识符的一部分（如 un|do）
+            return
+        word = match.group("scope")
+        if word == "end" or word == "until":
+            if self._scopes:
+                for name, value in reversed(self._scopes.pop()):
+                    self._set_symbol(name, value)
+            return
+        self._scopes.append([])
+        if word == "function":
+            params = _LUA_FUNCTION_PARAMS_PATTERN.match(content, match.end())
+            if params is not None:
+                for name in params.group(1).split(','):
+                    name = name.strip()
+                    if name and name != '...':
+                        self._declare(name, None)
+    
+    def _declare(self, name: str, value: Optional[int]) -> None:
+        """声明局部变量，值不是常量时为None；嵌套代码块中的声明在代码块结束时撤销"""
+        if self._scopes:
+            self._scopes[-1].append((name, self.symbols.get(name)))
+        self._set_symbol(name, value)
+    
+    def _set_symbol(self, name: str, value: Optional[int]) -> None:
+        """设置局部常量的值，值为None时名称不再可见"""
+        if value is None:
+            self.symbols.pop(name, None)
+        else:
+            self.symbols[name] = value
+    
+    def evaluate(self, content: str, pos: int, in_table: bool, definition: bool = True) -> Tuple[Optional[int], int]:
+        """
+        计算从pos开始的ID表达式的值，十进制数字直接转换，其余按常量表达式在当前符号表中计算
+        
+        Args:
+            definition: 是否为ID定义的值，否则为局部变量的初始值
+        
+        Returns:
+            (值, 继续扫描的位置)；值为None时从pos继续扫描，右侧可能引用了NetMsg（如 local id = X.NetMsg.Key），
+            否则从表达式之后继续扫描，同一行中的下一条语句（如 local A = 1 local B = 2）不会被跳过
+        """
+        match = _DECIMAL_ID_PATTERN.match(content, pos)
+        if (match is not None and _is_lua_expression_end(content, match.end(), in_table)
+                and int(match.group()) <= MAX_ID_VALUE):
+            return int(match.group()), match.end()
+        if definition:
+            self._has_expressions = True
+        value, end = parse_lua_constant(content, pos, self.symbols)
+        if value is None or not _is_lua_expression_end(content, end, in_table):
+            return None, pos
+        return value, end
+
+
+def scan_netmsg_definitions(content: str, stats: Optional[Dict[str, Any]] = None,
+                            references: Optional[List[Tuple[str, int]]] = None) -> List[Tuple[str, int]]:
+    """
+    单次扫描Lua源码，提取所有NetMsg ID定义，并可同时收集对NetMsg名称的引用
+    
+    支持块定义（X.NetMsg = {...}、local NetMsg = {...}）和单行定义（X.NetMsg.Key = Value），
+    注释和字符串中的内容会被跳过。同一文件中相同的(名称, ID)只返回一次。
+    
+    引用是除赋值以外的 X.NetMsg.Key（如 System:BindNotify(X.NetMsg.Key, ...)），与定义在同一遍扫描中识别，
+    之后按名称在哈希表中查找，名称数量不影响扫描速度。
+    
+    ID可以是常量表达式（如 BASE + 3、0x30D41），其中的名称在文件的局部常量（local BASE = 210000）中查找，
+    局部常量在声明处计算一次并记录在符号表中，无法计算出不超过MAX_ID_VALUE的非负整数的定义会被跳过。
+    值之后必须是表构造器的 , ; } 或语句边界，否则（如 Foo = BASE .. "x"、Foo = f(1)）同样跳过。
+    
+    Args:
+        content: Lua源码内容
+        stats: 如果提供，扫描过程中的正则匹配次数会写入stats["matches"]
+        references: 如果提供，按出现顺序追加引用的(名称, 行号)
+        
+    Returns:
+        按出现顺序排列的(名称, ID)列表
+    """
+    # 快速路径：不包含NetMsg的文件无需词法扫描
+    if "NetMsg" not in content:
+        return []
+    
+    count = len(references) if references is not None else 0
+    scanner = NetMsgScanner(references)
+    scanner.feed(content)
+    matches = scanner.matches
+    if scanner.needs_scopes:
+        # ID可能用到了局部常量，按代码块作用域重新扫描
+        if references is not None:
+            del references[count:]
+        scanner = NetMsgScanner(references, scoped=True)
+        scanner.feed(content)
+        matches += scanner.matches
+    if stats is not None:
+        stats["matches"] = matches
+    return scanner.definitions
+
+
+def parse_file_entry(project_root: str, file_path: str, known_hash: Optional[str] = None,
+                     profile: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    读取并解析文件中的NetMsg ID定义，返回可写入解析缓存的条目
+    
+    该函数不依赖检测器状态，可以在工作进程中执行
+    
+    Args:
+        project_root: 项目根目录路径
+        file_path: 文件路径（相对于项目根目录）
+        known_hash: 缓存中记录的内容哈希，内容未变化时跳过解析
+        profile: 是否记录性能数据，记录在条目的"profile"字段中
+        
+    Returns:
+        {"size", "mtime_ns", "hash", "definitions", "references"}，文件无法读取时返回None；
+        内容哈希与known_hash一致时definitions和references为None，表示沿用缓存中的结果
+    """
+    start = time.perf_counter()
+    abs_path = os.path.join(project_root, file_path)
+    
+    # 检查文件是否存在并获取文件状态
+    try:
+        stat = os.stat(abs_path)
+    except FileNotFoundError:
+        logger.error(f"错误: 文件不存在: {abs_path}")
+        return None
+    except OSError as e:
+        logger.error(f"无法获取文件大小: {abs_path}, 错误: {e}")
+        return None
+    
+    entry = _new_parse_entry(stat.st_size, stat.st_mtime_ns, profile)
+    try:
+        with open(abs_path, 'rb') as file:
+            # 大文件分块读取和扫描，不把整个文件读入内存
+            if stat.st_size > STREAM_CHUNK_SIZE:
+                _parse_file_stream(file, entry, known_hash, start)
+            else:
+                _parse_file_data(file.read(), entry, known_hash, start)
+        if profile:
+            entry["profile"]["total"] = time.perf_counter() - start
+        return entry
+    except MemoryError:
+        logger.error(f"内存不足，无法处理文件: {file_path}")
+        return None
+    except Exception as e:
+        logger.error(f"无法打开文件: {abs_path}, 错误: {e}")
+        return None
+
+
+def parse_content_entry(data: bytes, known_hash: Optional[str] = None, profile: bool = False) -> Dict[str, Any]:
+    """
+    解析内存中的文件内容（如git暂存区中的版本），返回与parse_file_entry格式相同的条目
+    
+    Args:
+        data: 文件内容
+        known_hash: 缓存中记录的内容哈希，内容未变化时跳过解析
+        profile: 是否记录性能数据
+        
+    Returns:
+        缓存条目，修改时间为0
+    """
+    start = time.perf_counter()
+    entry = _new_parse_entry(len(data), 0, profile)
+    _parse_file_data(data, entry, known_hash, start)
+    if profile:
+        entry["profile"]["total"] = time.perf_counter() - start
+    return entry
+
+
+def _new_parse_entry(size: int, mtime_ns: int, profile: bool) -> Dict[str, Any]:
+    """创建空的缓存条目，profile为True时包含性能数据字段"""
+    entry = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "hash": None,
+        "definitions": [],
+        "references": []
+    }
+    
+    if profile:
+        entry["profile"] = {"read": 0.0, "decode": 0.0, "match": 0.0, "total": 0.0,
+                            "bytes": 0, "matches": 0, "encoding": None}
+    return entry
+
+
+def _parse_file_data(data, entry: Dict[str, Any], known_hash: Optional[str], start: float) -> None:
+    """
+    解析文件的原始字节内容，填充缓存条目的哈希、定义和引用
+    
+    Args:
+        data: 文件内容
+        entry: 缓存条目
+        known_hash: 缓存中记录的内容哈希
+        start: 开始读取文件的时间（time.perf_counter），用于性能统计
+    """
+    entry["hash"] = hashlib.blake2b(data, digest_size=16).hexdigest()
+    profile = entry.get("profile")
+    if profile is not None:
+        now = time.perf_counter()
+        profile["read"] = now - start
+        profile["bytes"] = len(data)
+        start = now
+    
+    if known_hash is not None and entry["hash"] == known_hash:
+        # 内容未变化（例如仅修改时间被更新），沿用缓存的解析结果
+        for field in PARSE_RESULT_FIELDS:
+            entry[field] = None
+        return
+    
+    # 字节级预过滤：不包含NetMsg的文件无需解码和扫描（大多数文件属于这种情况）
+    if data.find(b"NetMsg") < 0:
+        return
+    
+    content, encoding = _decode_content(data)
+    if profile is not None:
+        now = time.perf_counter()
+        profile["decode"] = now - start
+        profile["encoding"] = encoding
+        start = now
+    
+    # 单次扫描文件内容，跳过注释和字符串，提取块定义、单行定义和引用
+    entry["definitions"] = scan_netmsg_definitions(content, profile, entry["references"])
+    if profile is not None:
+        profile["match"] = time.perf_counter() - start
+
+
+def _parse_file_stream(file, entry: Dict[str, Any], known_hash: Optional[str], start: float,
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+    """
+    分块读取和扫描大文件，填充缓存条目的哈希、定义和引用，内存占用与文件大小无关
+    
+    第一遍计算内容哈希，同时判断是否包含NetMsg、是否为纯ASCII；需要解析时第二遍逐块解码和扫描。
+    编码的判断顺序与_decode_content一致，UTF-8解码失败时从头改用下一种编码。
+    
+    Args:
+        file: 以二进制模式打开的文件
+        entry: 缓存条目
+        known_hash: 缓存中记录的内容哈希
+        start: 开始读取文件的时间（time.perf_counter），用于性能统计
+        chunk_size: 每次读取的字节数
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    head = None
+    tail = b""
+    has_netmsg = False
+    ascii_only = True
+    size = 0
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        if head is None:
+            head = chunk[:3]
+        hasher.update(chunk)
+        size += len(chunk)
+        # NetMsg可能跨越两个块，额外检查边界附近的字节
+        if not has_netmsg:
+            has_netmsg = chunk.find(b"NetMsg") >= 0 or (tail + chunk[:5]).find(b"NetMsg") >= 0
+            tail = chunk[-5:] if len(chunk) >= 5 else (tail + chunk)[-5:]
+        if ascii_only and _NON_ASCII_PATTERN.search(chunk) is not None:
+            ascii_only = False
+    
+    entry["hash"] = hasher.hexdigest()
+    profile = entry.get("profile")
+    if profile is not None:
+        now = time.perf_counter()
+        profile["read"] = now - start
+        profile["bytes"] = size
+    
+    if known_hash is not None and entry["hash"] == known_hash:
+        # 内容未变化（例如仅修改时间被更新），沿用缓存的解析结果
+        for field in PARSE_RESULT_FIELDS:
+            entry[field] = None
+        return
+    if not has_netmsg:
+        return
+    
+    if head == codecs.BOM_UTF8:
+        candidates = [('utf-8-sig', 'replace')]
+    elif ascii_only:
+        candidates = [('ascii', 'strict')]
+    else:
+        candidates = [('utf-8', 'strict'), ('gbk', 'strict'), ('latin1', 'strict')]
+    
+    for encoding, errors in candidates:
+        file.seek(0)
+        references = []
+        try:
+            scanner = _scan_stream(file, encoding, errors, chunk_size, references, profile)
+        except UnicodeDecodeError:
+            continue
+        matches = scanner.matches
+        if scanner.needs_scopes:
+            # ID可能用到了局部常量，按代码块作用域重新扫描，编码已经确定
+            file.seek(0)
+            references = []
+            scanner = _scan_stream(file, encoding, errors, chunk_size, references, profile, scoped=True)
+            matches += scanner.matches
+        entry["definitions"] = scanner.definitions
+        entry["references"] = references
+        if profile is not None:
+            profile["encoding"] = encoding
+            profile["matches"] = matches
+        return
+
+
+def _scan_stream(file, encoding: str, errors: str, chunk_size: int, references: List[Tuple[str, int]],
+                 profile: Optional[Dict[str, Any]], scoped: bool = False) -> NetMsgScanner:
+    """
+    按指定编码逐块解码并扫描文件
+    
+    扫描器未处理的部分与下一块拼接，其长度有上限，单行的大文件同样按块扫描。
+    scoped与NetMsgScanner的参数相同。
+    
+    Raises:
+        UnicodeDecodeError: 文件内容不是该编码
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    scanner = NetMsgScanner(references, scoped)
+    carry = ""
+    while True:
+        timer = time.perf_counter()
+        chunk = file.read(chunk_size)
+        final = not chunk
+        text = carry + decoder.decode(chunk, final)
+        if profile is not None:
+            now = time.perf_counter()
+            profile["decode"] += now - timer
+            timer = now
+        
+        if final:
+            scanner.feed(text)
+        else:
+            carry = text[scanner.feed(text, final=False):]
+        if profile is not None:
+            profile["match"] += time.perf_counter() - timer
+        if final:
+            return scanner
+
+
+def _decode_content(data) -> Tuple[str, str]:
+    """
+    根据文件内容推断编码并解码，每个文件通常只需解码一次
+    
+    依次判断：UTF-8 BOM、纯ASCII、UTF-8、GBK，均不符合时使用latin1（不会失败）
+    
+    Args:
+        data: 文件内容
+        
+    Returns:
+        (解码后的文本, 使用的编码)
+    """
+    if data[:3] == codecs.BOM_UTF8:
+        return str(data[3:], 'utf-8', 'replace'), 'utf-8-sig'
+    if _NON_ASCII_PATTERN.search(data) is None:
+        return str(data, 'ascii'), 'ascii'
+    
+    # UTF-8校验在第一个非法字节处即失败，GBK文件通常在文件头部的中文注释就能识别出来
+    for encoding in ('utf-8', 'gbk'):
+        try:
+            return str(data, encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return str(data, 'latin1'), 'latin1'
+
+
+def hash_file_entry(project_root: str, file_path: str, profile: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    只读取文件并计算内容哈希，不解码和扫描，用于查找内容相同的文件
+    
+    Args:
+        project_root: 项目根目录路径
+        file_path: 文件路径（相对于项目根目录）
+        profile: 是否记录性能数据，记录在条目的"profile"字段中
+        
+    Returns:
+        与parse_file_entry格式相同的条目，definitions和references为None，文件无法读取时返回None
+    """
+    start = time.perf_counter()
+    abs_path = os.path.join(project_root, file_path)
+    hasher = hashlib.blake2b(digest_size=16)
+    try:
+        with open(abs_path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            for chunk in iter(lambda: file.read(STREAM_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+    except OSError as e:
+        logger.error(f"无法打开文件: {abs_path}, 错误: {e}")
+        return None
+    
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": hasher.hexdigest()}
+    entry.update((field, None) for field in PARSE_RESULT_FIELDS)
+    if profile:
+        elapsed = time.perf_counter() - start
+        entry["profile"] = {"read": elapsed, "decode": 0.0, "match": 0.0, "total": elapsed,
+                            "bytes": stat.st_size, "matches": 0, "encoding": None}
+    return entry
+
+
+def extract_file_definitions(project_root: str, file_path: str) -> List[Tuple[str, int]]:
+    """
+    读取并解析文件中的NetMsg ID定义
+    
+    Args:
+        project_root: 项目根目录路径
+        file_path: 文件路径（相对于项目根目录）
+        
+    Returns:
+        文件中的(名称, ID)定义列表，文件无法读取时返回空列表
+    """
+    entry = parse_file_entry(project_root, file_path)
+    return entry["definitions"] if entry is not None else []
+
+
+def run_parse_tasks(tasks: List[Tuple[str, str, Optional[str], bool]], jobs: int = 1,
+                    executor=None, worker=None) -> List[Optional[Dict[str, Any]]]:
+    """
+    执行解析任务，多进程时分发到进程池
+    
+    Args:
+        tasks: [(项目根目录, 文件路径, 已知内容哈希, 是否记录性能数据), ...]
+        jobs: 进程数（1为单进程，0为使用全部CPU核心）
+        executor: 已创建的进程池，多次调用时共用同一个进程池；为None时按需创建
+        worker: 处理单个任务的模块级函数，默认为完整解析（_parse_file_worker）
+        
+    Returns:
+        与tasks顺序一致的解析结果列表
+    """
+    worker = worker or _parse_file_worker
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    
+    if jobs > 1:
+        # 每个进程一次领取一批文件，减少进程间通信开销
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        if executor is not None:
+            return list(executor.map(worker, tasks, chunksize=chunksize))
+        try:
+            from concurrent.futures import ProcessPoolExecutor
             
-            # 输出JSON文件路径（相对于项目根目录）
-            "json_output_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_report.json")
-        }
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                return list(executor.map(worker, tasks, chunksize=chunksize))
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"警告: 无法启动进程池 ({e})，改为单进程解析")
+    
+    return [worker(task) for task in tasks]
+
+
+def run_deduplicated_parse_tasks(tasks: List[Tuple[str, str, Optional[str], bool]], sizes: List[int],
+                                 known_entries: Iterable[Dict[str, Any]] = (), jobs: int = 1,
+                                 executor=None) -> Tuple[List[Optional[Dict[str, Any]]], int]:
+    """
+    执行解析任务，内容相同的文件只完整解析一次
+    
+    内容相同的文件大小一定相同。大小唯一（与其他任务和known_entries中的结果都不同）的文件直接解析；
+    其余文件先只读取并计算内容哈希，按(大小, 哈希)分组：与known_entries中的结果或自己缓存的哈希一致时
+    直接复用，否则每种内容只完整解析一次，结果用于所有内容相同的文件。
+    
+    Args:
+        tasks: [(项目根目录, 文件路径, 已知内容哈希, 是否记录性能数据), ...]
+        sizes: 与tasks顺序一致的文件大小（来自文件索引）
+        known_entries: 可以直接复用的已有解析结果（如命中缓存的文件的缓存条目）
+        jobs: 进程数（1为单进程，0为使用全部CPU核心）
+        executor: 已创建的进程池，参见run_parse_tasks
         
-        # 确保输出路径是相对于项目根目录的
-        tools_dir = os.path.join("src", "Public", "UniX-SDK", "tools")
-        if not os.path.exists(os.path.join(self.project_root, tools_dir)):
-            print(f"警告: 工具目录不存在，将在当前目录创建报告文件")
-            self.config["output_path"] = "netmsg_report.txt"
-            self.config["json_output_path"] = "netmsg_report.json"
+    Returns:
+        (与tasks顺序一致的解析结果列表, 复用其他文件解析结果的文件数量)
+    """
+    known = {(entry["size"], entry["hash"]): entry for entry in known_entries if entry["hash"] is not None}
+    known_sizes = {size for size, _ in known}
+    size_counts = defaultdict(int)
+    for size in sizes:
+        size_counts[size] += 1
+    
+    # 第一轮：大小唯一的文件直接解析，其余文件只计算内容哈希
+    results = [None] * len(tasks)
+    unique = [index for index, size in enumerate(sizes) if size_counts[size] == 1 and size not in known_sizes]
+    grouped = [index for index, size in enumerate(sizes) if size_counts[size] > 1 or size in known_sizes]
+    for index, entry in zip(unique, run_parse_tasks([tasks[index] for index in unique], jobs, executor)):
+        results[index] = entry
+    hashed = run_parse_tasks([tasks[index] for index in grouped], jobs, executor, worker=_hash_file_worker)
+    
+    # 按(大小, 哈希)分组，每种未知内容选第一个文件完整解析
+    reused = 0
+    pending = defaultdict(list)  # {(大小, 哈希): [任务下标, ...]}，第一个为完整解析的文件
+    for index, entry in zip(grouped, hashed):
+        results[index] = entry
+        if entry is None or entry["hash"] == tasks[index][2]:
+            # 无法读取，或内容与自己缓存的结果一致（definitions为None，沿用缓存）
+            continue
+        source = known.get((entry["size"], entry["hash"]))
+        if source is not None:
+            _copy_parse_result(entry, source)
+            reused += 1
+        else:
+            pending[(entry["size"], entry["hash"])].append(index)
+    
+    # 第二轮：每种内容完整解析一次；解析时内容已经变化的文件不能作为其他文件的来源，改为逐个解析
+    representatives = [indexes[0] for indexes in pending.values()]
+    fallback = []
+    parse_tasks = [tasks[index][:2] + (None, tasks[index][3]) for index in representatives]
+    for (key, indexes), entry in zip(pending.items(), run_parse_tasks(parse_tasks, jobs, executor)):
+        results[indexes[0]] = entry
+        if entry is None or (entry["size"], entry["hash"]) != key:
+            fallback.extend(indexes[1:])
+            continue
+        for index in indexes[1:]:
+            _copy_parse_result(results[index], entry)
+            reused += 1
+    for index, entry in zip(fallback, run_parse_tasks([tasks[index] for index in fallback], jobs, executor)):
+        results[index] = entry
+    return results, reused
+
+
+def _copy_parse_result(entry: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """将内容相同的文件的解析结果复制到只计算了哈希的条目中"""
+    for field in PARSE_RESULT_FIELDS:
+        entry[field] = source[field]
+
+
+def _parse_file_worker(task: Tuple[str, str, Optional[str], bool]) -> Optional[Dict[str, Any]]:
+    """进程池工作函数，参数为(项目根目录, 文件路径, 已知内容哈希, 是否记录性能数据)"""
+    return parse_file_entry(*task)
+
+
+def _hash_file_worker(task: Tuple[str, str, Optional[str], bool]) -> Optional[Dict[str, Any]]:
+    """进程池工作函数，只计算内容哈希，参数与_parse_file_worker相同"""
+    return hash_file_entry(task[0], task[1], task[3])
+
+
+class ReservedRangeIndex:
+    """
+    保留范围的有序区间索引
+    
+    将所有保留范围的边界排序，切分为互不重叠的基本区间，每个基本区间记录覆盖它的保留范围。
+    查询时二分查找ID所在的基本区间，复杂度为O(log k)，k为保留范围数量。
+    """
+    
+    def __init__(self, ranges: List[Dict[str, Any]]):
+        """
+        Args:
+            ranges: 保留范围列表 [{name, min, max}, ...]
+        """
+        bounds = sorted({r["min"] for r in ranges} | {r["max"] + 1 for r in ranges})
+        self._starts = bounds
+        # 第i个基本区间为 [bounds[i], bounds[i+1])，保留范围按配置顺序排列
+        self._segments = [
+            tuple(r for r in ranges if r["min"] <= start <= r["max"])
+            for start in bounds[:-1]
+        ]
+    
+    def lookup(self, id_value: int) -> Tuple[Dict[str, Any], ...]:
+        """
+        查找包含指定ID的所有保留范围
+        
+        Args:
+            id_value: ID值
+            
+        Returns:
+            包含该ID的保留范围（按配置顺序），不在任何保留范围内时返回空元组
+        """
+        i = bisect.bisect_right(self._starts, id_value) - 1
+        if i < 0 or i >= len(self._segments):
+            return ()
+        return self._segments[i]
+
+
+class _OwnerTrieNode:
+    """所有者前缀树的节点"""
+    
+    __slots__ = ("children", "wildcards", "globstar", "loop", "owners")
+    
+    def __init__(self, loop: bool = False):
+        self.children = {}      # {路径段: 节点}
+        self.wildcards = {}     # {含通配符的路径段: (匹配函数, 节点)}
+        self.globstar = None    # "**"对应的节点
+        self.loop = loop        # 是否为"**"节点，可以消耗任意个路径段后停留在原处
+        self.owners = set()     # 路径在此结束时的所有者（保留范围名称）
+
+
+class OwnershipMatcher:
+    """
+    保留范围所有者的路径匹配器
+    
+    所有保留范围的所有者glob按路径段编译为一棵前缀树：普通路径段作为子节点的键，
+    含通配符的路径段编译为正则，"**"匹配任意层（包括零层）目录，相同前缀的glob共用节点。
+    匹配时沿树同时推进所有可能的状态，代价只与路径深度和树中的通配符分支有关，
+    与保留范围和glob的数量无关；每个文件的结果会缓存，同一文件中的定义只匹配一次。
+    """
+    
+    def __init__(self, ranges: List[Dict[str, Any]]):
+        """
+        Args:
+            ranges: 保留范围列表 [{name, min, max, owners}, ...]，未指定owners时使用DEFAULT_RANGE_OWNERS
+        """
+        self._root = _OwnerTrieNode()
+        self._cache = {}  # {文件路径: frozenset(保留范围名称)}
+        for range_info in ranges:
+            for pattern in range_info.get("owners", DEFAULT_RANGE_OWNERS):
+                self._add(pattern, range_info["name"])
+    
+    def _add(self, pattern: str, owner: str) -> None:
+        """将一个glob加入前缀树"""
+        node = self._root
+        previous = None
+        for segment in pattern.replace('\\', '/').strip('/').split('/'):
+            if segment == '**':
+                if previous == '**':
+                    continue
+                if node.globstar is None:
+                    node.globstar = _OwnerTrieNode(loop=True)
+                node = node.globstar
+            elif any(char in segment for char in '*?['):
+                wildcard = node.wildcards.get(segment)
+                if wildcard is None:
+                    wildcard = node.wildcards[segment] = (re.compile(fnmatch.translate(segment)).match,
+                                                          _OwnerTrieNode())
+                node = wildcard[1]
+            else:
+                node = node.children.setdefault(segment, _OwnerTrieNode())
+            previous = segment
+        node.owners.add(owner)
+    
+    @staticmethod
+    def _closure(nodes: Iterable[_OwnerTrieNode]) -> Set[_OwnerTrieNode]:
+        """加入"**"匹配零层目录时可以到达的节点"""
+        states = set()
+        for node in nodes:
+            while node is not None and node not in states:
+                states.add(node)
+                node = node.globstar
+        return states
+    
+    def owners_of(self, file_path: str) -> frozenset:
+        """
+        查找文件的所有者
+        
+        Args:
+            file_path: 文件路径（相对于项目根目录）
+            
+        Returns:
+            拥有该文件的保留范围名称集合
+        """
+        owners = self._cache.get(file_path)
+        if owners is not None:
+            return owners
         
-        # 存储发现的所有NetMsg ID
-        self.discovered_ids = {}  # {id: [{name, file}, ...]}
+        states = self._closure([self._root])
+        for segment in file_path.replace(os.sep, '/').split('/'):
+            following = []
+            for node in states:
+                if node.loop:
+                    # "**"节点消耗当前路径段后停留在原处
+                    following.append(node)
+                child = node.children.get(segment)
+                if child is not None:
+                    following.append(child)
+                for match, child in node.wildcards.values():
+                    if match(segment):
+                        following.append(child)
+            states = self._closure(following)
+            if not states:
+                break
         
-        # 存储ID冲突信息
-        self.conflicts = {}  # {id: [{name, file}, ...]}
+        owners = self._cache[file_path] = frozenset().union(*(node.owners for node in states))
+        return owners
+
+
+def load_ownership_config(config_path: str) -> List[Dict[str, Any]]:
+    """
+    读取保留范围和所有者配置
+    
+    配置文件为TOML（.toml）或JSON格式，包含ranges列表，每项为 {name, min, max, owners}，
+    owners为相对于项目根目录的glob列表，未指定时使用DEFAULT_RANGE_OWNERS，为空列表时范围内的任何定义都视为违规。
+    
+    Args:
+        config_path: 配置文件路径
         
-        # 存储在保留范围内的非SDK ID
-        self.reserved_violations = defaultdict(list)  # {range_name: [{name, id, file}, ...]}
+    Returns:
+        保留范围列表 [{name, min, max, owners}, ...]
+        
+    Raises:
+        ValueError: 配置格式错误，或读取TOML时没有可用的解析库
+    """
+    with open(config_path, 'rb') as file:
+        data = file.read()
+    try:
+        if config_path.lower().endswith('.toml'):
+            if tomllib is None:
+                raise ValueError("读取TOML需要Python 3.11及以上版本或安装tomli，也可以改用JSON格式")
+            config = tomllib.loads(data.decode('utf-8'))
+        else:
+            config = json.loads(data.decode('utf-8'))
+    except ValueError as e:
+        raise ValueError(f"无法解析所有者配置 {config_path}: {e}") from None
+    
+    ranges = config.get("ranges") if isinstance(config, dict) else None
+    if not isinstance(ranges, list):
+        raise ValueError(f"所有者配置缺少ranges列表: {config_path}")
+    
+    result = []
+    for i, item in enumerate(ranges):
+        where = f"{config_path} 中的第{i + 1}个保留范围"
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            raise ValueError(f"{where}缺少名称")
+        if not all(isinstance(item.get(key), int) and not isinstance(item.get(key), bool) for key in ("min", "max")) \
+                or item["min"] > item["max"]:
+            raise ValueError(f"{where} ({item['name']}) 的min/max无效")
+        owners = item.get("owners", list(DEFAULT_RANGE_OWNERS))
+        if isinstance(owners, str):
+            owners = [owners]
+        if not isinstance(owners, list) or not all(isinstance(owner, str) and owner for owner in owners):
+            raise ValueError(f"{where} ({item['name']}) 的owners必须是glob列表")
+        result.append({"name": item["name"], "min": item["min"], "max": item["max"], "owners": owners})
+    return result
+
+
+def shard_of_file(file_path: str, shard_count: int) -> int:
+    """
+    文件所属的分片
+    
+    由路径的哈希决定，与平台的路径分隔符和Python的哈希随机化无关，同一文件在不同机器上总是属于同一分片。
+    
+    Args:
+        file_path: 文件路径（相对于项目根目录）
+        shard_count: 分片总数
+        
+    Returns:
+        分片序号，从1开始
+    """
+    digest = hashlib.blake2b(file_path.replace(os.sep, '/').encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shard_count + 1
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """
+    解析分片参数
+    
+    Args:
+        spec: "i/N"，i从1开始
+        
+    Returns:
+        (分片序号, 分片总数)
+        
+    Raises:
+        ValueError: 格式错误或分片序号超出范围
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', spec)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"无效的分片: {spec} (应为 i/N，1 <= i <= N)")
+    return int(match.group(1)), int(match.group(2))
+
+
+def allocate_free_ids(used_ids: Iterable[int], blocked_ranges: List[Tuple[int, int]],
+                      count: int, min_id: int, max_id: int) -> List[int]:
+    """
+    在[min_id, max_id]中分配空闲ID
+    
+    先从分配范围中去掉禁止使用的区间，得到若干可用区间；已使用的ID排序后，每个可用区间内的ID
+    通过二分查找定位，相邻ID之间的间隙即为空闲ID，只需一次排序和一次线性扫描。
+    优先返回第一个能容纳全部ID的连续间隙，否则按从小到大返回零散的空闲ID。
+    
+    Args:
+        used_ids: 已使用的ID
+        blocked_ranges: 禁止使用的闭区间 [(min, max), ...]
+        count: 需要的ID数量
+        min_id: 分配范围下限（包含）
+        max_id: 分配范围上限（包含）
+        
+    Returns:
+        分配的ID列表，按从小到大排列
+        
+    Raises:
+        ValueError: 范围内的空闲ID不足
+    """
+    # 可用区间 = 分配范围 - 禁止使用的区间
+    segments = []
+    next_free = min_id
+    for lo, hi in sorted(blocked_ranges):
+        if lo > next_free:
+            segments.append((next_free, min(lo - 1, max_id)))
+        next_free = max(next_free, hi + 1)
+        if next_free > max_id:
+            break
+    if next_free <= max_id:
+        segments.append((next_free, max_id))
+    
+    ids = sorted(used_ids)
+    scattered = []
+    for seg_min, seg_max in segments:
+        prev = seg_min - 1
+        start = bisect.bisect_left(ids, seg_min)
+        end = bisect.bisect_right(ids, seg_max)
+        for used in ids[start:end] + [seg_max + 1]:
+            # 间隙 [prev + 1, used - 1]
+            if used - prev > count:
+                return list(range(prev + 1, prev + 1 + count))
+            if used - prev > 1 and len(scattered) < count:
+                scattered.extend(range(prev + 1, min(used, prev + 1 + count - len(scattered))))
+            prev = used
+    
+    if len(scattered) < count:
+        raise ValueError(f"范围 {min_id}-{max_id} 内的空闲ID不足: 需要 {count} 个，只有 {len(scattered)} 个")
+    return scattered
+
+
+class _Record:
+    """
+    使用__slots__的记录，字段也可以按键读取（record["name"]），兼容以字典表示记录的调用方
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+
+class NetMsgDefinition(_Record):
+    """一处NetMsg ID定义，名称和文件路径与注册表共享同一个字符串对象"""
+    
+    __slots__ = ("name", "id", "file")
+    
+    def __init__(self, name: str, id_value: int, file_path: str):
+        self.name = name
+        self.id = id_value
+        self.file = file_path
+    
+    def __repr__(self) -> str:
+        return f"NetMsgDefinition({self.name!r}, {self.id!r}, {self.file!r})"
+
+
+class NetMsgReference(_Record):
+    """一处对NetMsg名称的引用"""
+    
+    __slots__ = ("name", "file", "line")
+    
+    def __init__(self, name: str, file_path: str, line: int):
+        self.name = name
+        self.file = file_path
+        self.line = line
+    
+    def __repr__(self) -> str:
+        return f"NetMsgReference({self.name!r}, {self.file!r}, {self.line!r})"
+
+
+class _DefinitionView(Mapping):
+    """
+    注册表中定义的只读视图 {id: [NetMsgDefinition, ...]}
+    
+    定义以列的形式保存在注册表中，只有访问某个ID时才生成对应的记录列表。
+    """
+    
+    def __init__(self, registry: "NetMsgRegistry", keys: Dict[int, Any]):
+        self._registry = registry
+        self._keys = keys
+    
+    def __getitem__(self, id_value: int) -> List[NetMsgDefinition]:
+        if id_value not in self._keys:
+            raise KeyError(id_value)
+        return self._registry.get_definitions(id_value)
+    
+    def __contains__(self, id_value) -> bool:
+        return id_value in self._keys
+    
+    def __iter__(self):
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class _DefinitionList(Sequence):
+    """
+    注册表中若干行定义的只读列表 [NetMsgDefinition, ...]
+    
+    只保存行号，访问元素时才生成记录对象。
+    """
+    
+    def __init__(self, registry: "NetMsgRegistry", rows: array):
+        self._registry = registry
+        self._rows = rows
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._registry.definition_at(row) for row in self._rows[index]]
+        return self._registry.definition_at(self._rows[index])
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class NetMsgRegistry:
+    """
+    NetMsg ID注册表
+    
+    定义按列存储：每次注册占用一行，文件序号和同一ID前后两行的行号保存在数组中，
+    名称和ID列直接引用解析结果中的对象，不另外复制；文件路径只在文件表中保存一次。
+    每个ID只在哈希表中记录第一行，相同ID的定义通过行号串成双向链表，因此大量定义时
+    内存占用远小于每处定义一个字典。存在多处定义的ID另外按(名称, 文件序号)索引各行，
+    注册和撤销单个定义的复杂度为O(1)，与同一ID的定义数量无关。冲突信息随注册和撤销增量维护，
+    保留范围检查使用有序区间索引，文件所有者由前缀树匹配并按文件缓存，
+    整体注册n个定义的复杂度接近O(n log n)。
+    """
+    
+    def __init__(self, reserved_ranges: List[Dict[str, Any]]):
+        """
+        Args:
+            reserved_ranges: 保留范围列表 [{name, min, max, owners}, ...]
+        """
+        # 文件表，定义中只记录文件序号
+        self.files = []             # [file, ...]
+        self._file_numbers = {}     # {file: 序号}
+        
+        # 定义的列，下标为行号；已撤销的行文件序号为-1，留给之后的注册复用
+        self._names = []                # 名称
+        self._ids = []                  # ID
+        self._file_column = array('l')  # 文件序号
+        self._next = array('l')         # 相同ID的下一行，-1表示没有
+        self._prev = array('l')         # 相同ID的上一行；第一行保存最后一行，追加时无需遍历链表
+        self._free_rows = []
+        
+        # 每个ID的第一行，按首次注册的顺序排列
+        self._heads = {}            # {id: 行号}
+        
+        # 存在多处定义的ID中每处定义所在的行；只有一处定义的ID直接比较第一行，不占用索引
+        self._members = {}          # {id: {(name, 文件序号): 行号}}
+        
+        # 存在多处定义的ID，按成为冲突的顺序排列
+        self._conflicts = {}        # {id: None}
+        
+        self.discovered_ids = _DefinitionView(self, self._heads)  # {id: [NetMsgDefinition, ...]}
+        self.conflicts = _DefinitionView(self, self._conflicts)   # {id: [NetMsgDefinition, ...]}
+        
+        # 在保留范围内但文件不属于该范围所有者的ID，按(名称, ID, 文件)索引，撤销时O(1)删除
+        self._violations = defaultdict(dict)  # {range_name: {(name, id, file): NetMsgDefinition}}
+        self._violations_view = None
+        
+        self._range_index = ReservedRangeIndex(reserved_ranges)
+        self._owner_matcher = OwnershipMatcher(reserved_ranges)
+        
+        # 每次注册或撤销定义时递增，用于判断依赖定义的计算结果是否需要更新
+        self.version = 0
+        
+        # 按名称查找定义的索引，第一次查找时建立，之后随注册和撤销增量更新
+        self._name_index = None  # {name: 行号 或 [行号, ...]}
+    
+    @property
+    def reserved_violations(self) -> Dict[str, List[NetMsgDefinition]]:
+        """在保留范围内但不属于该范围所有者的ID {range_name: [NetMsgDefinition, ...]}，按注册顺序排列"""
+        if self._violations_view is None:
+            self._violations_view = {
+                range_name: list(violations.values())
+                for range_name, violations in self._violations.items()
+                if violations
+            }
+        return self._violations_view
+    
+    def definition_at(self, row: int) -> NetMsgDefinition:
+        """生成某一行的定义记录"""
+        return NetMsgDefinition(self._names[row], self._ids[row], self.files[self._file_column[row]])
+    
+    def get_definitions(self, id_value: int) -> List[NetMsgDefinition]:
+        """返回ID的所有定义，按注册顺序排列，ID未注册时返回空列表"""
+        definitions = []
+        row = self._heads.get(id_value, -1)
+        while row >= 0:
+            definitions.append(self.definition_at(row))
+            row = self._next[row]
+        return definitions
+    
+    def first_definition(self, id_value: int) -> Tuple[str, str]:
+        """返回ID的第一处定义 (名称, 文件)，不生成记录对象"""
+        row = self._heads[id_value]
+        return self._names[row], self.files[self._file_column[row]]
+    
+    def find_name(self, name: str) -> List[NetMsgDefinition]:
+        """
+        查找某个名称的所有定义
+        
+        名称索引未建立时先建立索引，之后每次查找的复杂度为O(1)。
+        
+        Returns:
+            [NetMsgDefinition, ...]，按ID排序
+        """
+        if self._name_index is None:
+            self.build_name_index()
+        rows = self._name_index.get(name)
+        if rows is None:
+            return []
+        if isinstance(rows, int):
+            return [self.definition_at(rows)]
+        return sorted((self.definition_at(row) for row in rows), key=lambda d: d.id)
+    
+    def build_name_index(self) -> None:
+        """建立按名称查找定义的索引，之后随注册和撤销增量更新"""
+        self._name_index = {}
+        file_column = self._file_column
+        for row, name in enumerate(self._names):
+            if file_column[row] >= 0:
+                self._index_name(name, row)
+    
+    def _index_name(self, name: str, row: int) -> None:
+        """在名称索引中登记一行；大多数名称只有一处定义，直接保存行号"""
+        rows = self._name_index.get(name)
+        if rows is None:
+            self._name_index[name] = row
+        elif isinstance(rows, int):
+            self._name_index[name] = [rows, row]
+        else:
+            rows.append(row)
+    
+    def _unindex_name(self, name: str, row: int) -> None:
+        """从名称索引中移除一行"""
+        rows = self._name_index.get(name)
+        if rows == row:
+            del self._name_index[name]
+        elif isinstance(rows, list):
+            rows.remove(row)
+            if len(rows) == 1:
+                self._name_index[name] = rows[0]
+    
+    def definitions_excluding(self, excluded_names: Set[str]) -> Sequence:
+        """
+        名称不在excluded_names中的所有定义
+        
+        Returns:
+            [NetMsgDefinition, ...]，按ID从小到大排列，相同ID的定义按注册顺序排列；
+            只保存行号，注册表再次更新前有效
+        """
+        names = self._names
+        next_row = self._next
+        rows = array('l')
+        for id_value in sorted(self._heads):
+            row = self._heads[id_value]
+            while row >= 0:
+                if names[row] not in excluded_names:
+                    rows.append(row)
+                row = next_row[row]
+        return _DefinitionList(self, rows)
+    
+    def ids_by_name(self) -> List[int]:
+        """所有ID按第一处定义的名称排序（不区分大小写），名称相同时按首次注册的顺序排列"""
+        names = self._names
+        heads = self._heads
+        return sorted(heads, key=lambda id_value: names[heads[id_value]].lower())
+    
+    def defined_names(self) -> Set[str]:
+        """所有已注册的名称"""
+        file_column = self._file_column
+        return {name for row, name in enumerate(self._names) if file_column[row] >= 0}
+    
+    def register(self, name: str, id_value: int, file_path: str) -> bool:
+        """
+        注册发现的NetMsg ID
+        
+        Args:
+            name: ID名称
+            id_value: ID值
+            file_path: 文件路径
+            
+        Returns:
+            是否为新的定义（相同名称和文件的定义只注册一次）
+        """
+        file_number = self._file_numbers.get(file_path)
+        if file_number is None:
+            file_number = self._file_numbers[file_path] = len(self.files)
+            self.files.append(file_path)
+        
+        # 已经存在相同的定义，不重复添加
+        head = self._heads.get(id_value, -1)
+        members = self._members.get(id_value)
+        if members is not None:
+            if (name, file_number) in members:
+                return False
+        elif head >= 0 and self._file_column[head] == file_number and self._names[head] == name:
+            return False
+        
+        self.version += 1
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._names[row] = name
+            self._ids[row] = id_value
+            self._file_column[row] = file_number
+            self._next[row] = -1
+        else:
+            row = len(self._names)
+            self._names.append(name)
+            self._ids.append(id_value)
+            self._file_column.append(file_number)
+            self._next.append(-1)
+            self._prev.append(-1)
+        
+        if self._name_index is not None:
+            self._index_name(name, row)
+        
+        if head < 0:
+            self._heads[id_value] = row
+            self._prev[row] = row
+        else:
+            # 追加到链表末尾，第一行的上一行即为最后一行
+            last = self._prev[head]
+            self._next[last] = row
+            self._prev[row] = last
+            self._prev[head] = row
+            if members is None:
+                # 同一ID存在不同名称或不同文件的定义即为冲突
+                self._members[id_value] = {(self._names[head], self._file_column[head]): head,
+                                           (name, file_number): row}
+                self._conflicts[id_value] = None
+            else:
+                members[(name, file_number)] = row
+        
+        # 检查是否违反保留范围
+        self.check_reserved_violation(name, id_value, file_path)
+        return True
+    
+    def unregister_file(self, file_path: str, definitions: List[Tuple[str, int]]) -> None:
+        """
+        撤销一个文件的NetMsg ID定义，冲突和保留范围违规信息同步更新
+        
+        Args:
+            file_path: 文件路径
+            definitions: 该文件注册过的(名称, ID)列表
+        """
+        file_number = self._file_numbers.get(file_path)
+        if file_number is None:
+            return
+        
+        for name, id_value in definitions:
+            head = self._heads.get(id_value, -1)
+            members = self._members.get(id_value)
+            if members is not None:
+                row = members.pop((name, file_number), -1)
+            elif head >= 0 and self._file_column[head] == file_number and self._names[head] == name:
+                row = head
+            else:
+                row = -1
+            if row < 0:
+                continue
+            
+            # 从链表中移除该行
+            following = self._next[row]
+            if row == head:
+                if following >= 0:
+                    self._heads[id_value] = following
+                    self._prev[following] = self._prev[row]
+                else:
+                    del self._heads[id_value]
+            else:
+                previous = self._prev[row]
+                self._next[previous] = following
+                self._prev[following if following >= 0 else head] = previous
+            if self._name_index is not None:
+                self._unindex_name(name, row)
+            self._names[row] = None
+            self._ids[row] = None
+            self._file_column[row] = -1
+            self._free_rows.append(row)
+            self.version += 1
+            
+            # 只剩一处定义时不再是冲突，也不再需要成员索引
+            if members is not None and len(members) == 1:
+                del self._members[id_value]
+                del self._conflicts[id_value]
+            
+            for range_info in self._range_index.lookup(id_value):
+                if self._violations[range_info["name"]].pop((name, id_value, file_path), None) is not None:
+                    self._violations_view = None
+    
+    def check_reserved_violation(self, name: str, id_value: int, file_path: str) -> None:
+        """
+        检查是否违反保留范围
+        
+        Args:
+            name: ID名称
+            id_value: ID值
+            file_path: 文件路径
+        """
+        ranges = self._range_index.lookup(id_value)
+        if not ranges:
+            return
+        
+        # 文件属于保留范围的所有者时不算违规（通过文件路径判断）
+        owners = self._owner_matcher.owners_of(file_path)
+        for range_info in ranges:
+            if range_info["name"] not in owners:
+                self._violations[range_info["name"]][(name, id_value, file_path)] = \
+                    NetMsgDefinition(name, id_value, file_path)
+                self._violations_view = None
+
+
+class NetMsgConflictChecker:
+    """网络消息ID冲突检测器"""
+    
+    def __init__(self, project_root: str):
+        """
+        初始化检测器
+        
+        Args:
+            project_root: 项目根目录路径
+        """
+        # 规范化项目根目录路径，确保使用正确的路径分隔符
+        self.project_root = os.path.abspath(project_root)
+        
+        # 检测是否在工具目录下运行，如果是则自动向上查找项目根目录
+        tools_dir = os.path.join("src", "Public", "UniX-SDK", "tools")
+        if os.path.normpath(self.project_root).endswith(os.path.normpath(tools_dir)):
+            # 当前在tools目录下，向上四级找到项目根目录
+            self.project_root = os.path.abspath(os.path.join(self.project_root, "..", "..", "..", ".."))
+            logger.info(f"检测到在工具目录下运行，已自动调整项目根目录为: {self.project_root}")
+        
+        # 配置
+        self.config = {
+            # 扫描目录（相对于项目根目录）
+            "scan_dirs": [
+                os.path.join("src", "Public"),
+                os.path.join("src"),
+                # 添加其他需要扫描的目录
+            ],
+            
+            # 文件扩展名过滤
+            "file_extensions": [
+                ".lua"
+            ],
+            
+            # 忽略的目录和文件（glob模式，匹配名称或相对于项目根目录的路径）
+            "ignore_patterns": [
+                ".git", ".svn", ".hg",
+                "node_modules", "__pycache__",
+                "build", "dist"
+            ],
+            
+            # SDK保留ID范围，owners为拥有该范围的文件（相对于项目根目录的glob，"**"匹配任意层目录），
+            # 未指定owners时使用DEFAULT_RANGE_OWNERS
+            "reserved_ranges": [
+                {"name": "UniX SDK", "min": 200000, "max": 250000, "owners": list(DEFAULT_RANGE_OWNERS)}
+                # 可以添加其他保留范围
+            ],
+            
+            # 保留范围和所有者配置文件（TOML或JSON，相对于项目根目录），指定后替代reserved_ranges
+            "ownership_path": None,
+            
+            # 并行解析的进程数（1为单进程，0为使用全部CPU核心）
+            "jobs": 1,
+            
+            # 输出文件路径（相对于项目根目录）
+            "output_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_report.txt"),
+            
+            # 输出JSON文件路径（相对于项目根目录）
+            "json_output_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_report.json"),
+            
+            # 输出NDJSON文件路径（相对于项目根目录）
+            "ndjson_output_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_report.ndjson"),
+            
+            # 机器可读报告的格式：json（单个JSON文档）或 ndjson（每行一条记录）
+            "report_format": "json",
+            
+            # JSON报告的布局：full（每处定义写出完整的文件路径）或 indexed（紧凑格式，通过下标引用文件表）
+            "json_layout": "full",
+            
+            # 生成的Lua注册表模块路径（相对于项目根目录），为None时不生成
+            "lua_registry_path": None,
+            
+            # 分片的部分结果路径（相对于项目根目录），{shard}和{count}替换为分片序号和分片总数
+            "partial_output_path": os.path.join("src", "Public", "UniX-SDK", "tools",
+                                                "netmsg_partial_{shard}of{count}.json"),
+            
+            # 解析缓存路径（相对于项目根目录），与报告文件放在一起
+            "cache_path": os.path.join("src", "Public", "UniX-SDK", "tools", "netmsg_cache.json"),
+            
+            # 是否启用增量解析缓存
+            "use_cache": True,
+            
+            # 是否记录各阶段和每个文件的性能数据
+            "profile": False,
+            
+            # 性能分析中列出的最慢文件数量
+            "profile_top": 10,
+            
+            # 未指定范围时分配新ID的范围（保留范围会被排除）
+            "allocation_range": {"min": 1, "max": 2147483647}
+        }
+        
+        # 确保输出路径是相对于项目根目录的
+        tools_dir = os.path.join("src", "Public", "UniX-SDK", "tools")
+        if not os.path.exists(os.path.join(self.project_root, tools_dir)):
+            logger.warning(f"警告: 工具目录不存在，将在当前目录创建报告文件")
+            self.config["output_path"] = "netmsg_report.txt"
+            self.config["json_output_path"] = "netmsg_report.json"
+            self.config["ndjson_output_path"] = "netmsg_report.ndjson"
+            self.config["cache_path"] = "netmsg_cache.json"
+            self.config["partial_output_path"] = "netmsg_partial_{shard}of{count}.json"
+        
+        # 文件索引，由discover_files建立，解析、统计和报告共用
+        self.file_index = []  # [FileEntry, ...]
+        
+        # 每个文件注册的定义，用于监视模式下按文件撤销和重新注册
+        self.file_definitions = {}  # {file: [(name, id), ...]}
+        
+        # 每个文件中对NetMsg名称的引用，只记录存在引用的文件
+        self.file_references = {}  # {file: [(name, line), ...]}
+        self._references_version = 0
+        
+        # 最近一次交叉比对的结果，定义和引用都未变化时直接复用
+        self._usage_report = None  # ((注册表, 注册表版本, 引用版本), 结果)
+        
+        # 当前的解析缓存条目
+        self.cache_entries = {}  # {file: {size, mtime_ns, hash, definitions}}
+        
+        # 扫描过的目录（绝对路径），监视模式使用
+        self.scanned_dirs = []
+        
+        # ID注册表，存储发现的ID、冲突和保留范围违规信息
+        self.registry = NetMsgRegistry(self.config["reserved_ranges"])
+        
+        # 性能分析数据，仅在启用性能分析时记录
+        self.profile = None  # {phases: {phase: seconds}, files: [...], cache_hits: n}
+        self._report_start = None
+    
+    @property
+    def discovered_ids(self) -> Mapping:
+        """发现的所有NetMsg ID {id: [NetMsgDefinition, ...]}，只读映射"""
+        return self.registry.discovered_ids
+    
+    @property
+    def conflicts(self) -> Mapping:
+        """ID冲突信息 {id: [NetMsgDefinition, ...]}，只读映射"""
+        return self.registry.conflicts
+    
+    @property
+    def reserved_violations(self) -> Dict[str, List[NetMsgDefinition]]:
+        """在保留范围内但不属于该范围所有者的ID {range_name: [NetMsgDefinition, ...]}"""
+        return self.registry.reserved_violations
+    
+    def discover_files(self, verbose: bool = True) -> List[FileEntry]:
+        """
+        扫描所有配置的目录，建立去重后的文件索引
+        
+        每个目录树只遍历一次：按真实路径去重，重叠的扫描目录（如 src/Public 与 src）
+        和指向同一位置的符号链接都不会重复收录，匹配忽略规则的目录和文件会被跳过。
+        
+        Args:
+            verbose: 是否输出每个扫描目录的信息
+            
+        Returns:
+            按路径排序的文件索引
+        """
+        ignore_match = self._compile_ignore_patterns()
+        visited_dirs = set()
+        seen_files = set()
+        index = []
+        empty_dirs = []
+        self.scanned_dirs = []
+        
+        for dir_path in self.config["scan_dirs"]:
+            # 确保路径分隔符正确
+            dir_path = dir_path.replace('/', os.sep)
+            abs_dir_path = os.path.join(self.project_root, dir_path)
+            
+            if not os.path.isdir(abs_dir_path):
+                if verbose:
+                    logger.warning(f"警告: 目录不存在: {abs_dir_path}")
+                continue
+            
+            if verbose:
+                logger.debug(f"扫描目录: {dir_path}")
+            found = self._walk_directory(abs_dir_path, ignore_match, visited_dirs, seen_files,
+                                         self.scanned_dirs)
+            index.extend(found)
+            if verbose:
+                if found:
+                    logger.debug(f"在 {dir_path} 中找到 {len(found)} 个文件")
+                else:
+                    empty_dirs.append(dir_path)
+        
+        # 重叠的扫描目录（如 src/Public 与 src）中的文件只收录一次，之后的目录可能没有新文件；
+        # 只有目录下确实没有任何匹配的文件时才警告
+        for dir_path in empty_dirs:
+            prefix = os.path.normpath(dir_path) + os.sep
+            if any(entry.path.startswith(prefix) for entry in index):
+                logger.debug(f"目录 {dir_path} 中的文件已在其他扫描目录中收录")
+            else:
+                logger.warning(f"警告: 在目录 {dir_path} 中未找到任何 {', '.join(self.config['file_extensions'])} 文件")
+        
+        index.sort(key=lambda entry: entry.path)
+        return index
+    
+    def scan_directory(self, dir_path: str) -> List[str]:
+        """
+        递归扫描目录中的所有文件
+        
+        Args:
+            dir_path: 要扫描的目录路径
+            
+        Returns:
+            符合条件的文件路径列表
+        """
+        # 确保路径分隔符正确
+        dir_path = dir_path.replace('/', os.sep)
+        abs_dir_path = os.path.join(self.project_root, dir_path)
+        
+        if not os.path.isdir(abs_dir_path):
+            logger.warning(f"警告: 目录不存在: {abs_dir_path}")
+            return []
+        
+        found = self._walk_directory(abs_dir_path, self._compile_ignore_patterns(), set(), set())
+        return [entry.path for entry in found]
+    
+    def _compile_ignore_patterns(self):
+        """
+        将忽略规则编译为单个正则表达式
+        
+        Returns:
+            匹配函数，参数为文件名或相对路径（使用/分隔）；没有忽略规则时返回None
+        """
+        patterns = self.config["ignore_patterns"]
+        if not patterns:
+            return None
+        return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns)).match
+    
+    def _walk_directory(self, abs_dir_path: str, ignore_match, visited_dirs: Set[str],
+                        seen_files: Set[str], directories: Optional[List[str]] = None) -> List[FileEntry]:
+        """
+        使用os.scandir遍历目录树
+        
+        Args:
+            abs_dir_path: 目录的绝对路径
+            ignore_match: 忽略规则匹配函数，可以为None
+            visited_dirs: 已遍历目录的真实路径集合，会被更新
+            seen_files: 已收录文件的真实路径集合，会被更新
+            directories: 如果提供，遍历过的目录（绝对路径）会追加到该列表
+            
+        Returns:
+            新发现的文件索引条目
+        """
+        extensions = tuple(self.config["file_extensions"])
+        result = []
+        stack = [abs_dir_path]
+        
+        while stack:
+            current = stack.pop()
+            real_dir = os.path.realpath(current)
+            if real_dir in visited_dirs:
+                continue
+            visited_dirs.add(real_dir)
+            if directories is not None:
+                directories.append(current)
+            
+            try:
+                entries = list(os.scandir(current))
+            except OSError as e:
+                logger.warning(f"警告: 无法读取目录: {current}, 错误: {e}")
+                continue
+            
+            for entry in entries:
+                # 获取相对于项目根目录的路径，忽略规则同时匹配名称和相对路径
+                rel_path = os.path.relpath(entry.path, self.project_root)
+                if ignore_match is not None and (
+                        ignore_match(entry.name) or ignore_match(rel_path.replace(os.sep, '/'))):
+                    continue
+                
+                try:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                        continue
+                    if not entry.name.endswith(extensions) or not entry.is_file():
+                        continue
+                    
+                    real_path = (os.path.realpath(entry.path) if entry.is_symlink()
+                                 else os.path.join(real_dir, entry.name))
+                    if real_path in seen_files:
+                        continue
+                    seen_files.add(real_path)
+                    
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                
+                result.append(FileEntry(rel_path, stat.st_size, stat.st_mtime_ns))
+        
+        return result
+    
+    def parse_file(self, file_path: str) -> List[Tuple[str, int]]:
+        """
+        解析文件中的NetMsg ID定义并注册
+        
+        Args:
+            file_path: 文件路径（相对于项目根目录）
+            
+        Returns:
+            文件中的(名称, ID)定义列表
+        """
+        definitions = extract_file_definitions(self.project_root, file_path)
+        for name, id_value in definitions:
+            self.register_netmsg_id(name, id_value, file_path)
+        return definitions
+    
+    def parse_files(self, files: List[FileEntry]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        解析文件索引中的文件，未变化的文件直接使用解析缓存，其余按配置的并行度分发到进程池
+        
+        Args:
+            files: 文件索引条目列表
+            
+        Returns:
+            {文件路径: [(名称, ID), ...]}，按文件路径排序
+        """
+        cache, entries, tasks = self.plan_parse_tasks(files)
+        if tasks and self.config["use_cache"]:
+            logger.info(f"解析缓存命中 {len(entries)} 个文件，需要解析 {len(tasks)} 个文件")
+        sizes = {file_entry.path: file_entry.size for file_entry in files}
+        results = self._run_parse_tasks(tasks, [sizes[task[1]] for task in tasks], entries.values())
+        return self.merge_parse_results(cache, entries, tasks, results)
+    
+    def plan_parse_tasks(self, files: List[FileEntry]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]],
+                                                                List[Tuple[str, str, Optional[str], bool]]]:
+        """
+        加载解析缓存，大小和修改时间未变化的文件直接使用缓存条目，其余文件生成解析任务
+        
+        Args:
+            files: 文件索引条目列表
+            
+        Returns:
+            (旧的缓存条目, 命中缓存的条目, 解析任务列表)
+        """
+        cache = self.load_cache() if self.config["use_cache"] else {}
+        
+        entries = {}
+        tasks = []
+        for file_entry in files:
+            file_path = file_entry.path
+            cached = cache.get(file_path)
+            if (cached is not None and not cached["racy"]
+                    and file_entry.size == cached["size"]
+                    and file_entry.mtime_ns == cached["mtime_ns"]):
+                entries[file_path] = cached
+                continue
+            tasks.append((self.project_root, file_path, cached["hash"] if cached else None,
+                          self.profile is not None))
+        
+        if self.profile is not None:
+            self.profile["cache_hits"] = len(entries)
+        return cache, entries, tasks
+    
+    def merge_parse_results(self, cache: Dict[str, Dict[str, Any]], entries: Dict[str, Dict[str, Any]],
+                            tasks: List[Tuple[str, str, Optional[str], bool]],
+                            results: List[Optional[Dict[str, Any]]]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        合并解析任务的结果，保存解析缓存
+        
+        Args:
+            cache: 旧的缓存条目
+            entries: 命中缓存的条目，会被更新为新的缓存条目
+            tasks: 解析任务列表
+            results: 与tasks顺序一致的解析结果
+            
+        Returns:
+            {文件路径: [(名称, ID), ...]}，按文件路径排序；无法读取的文件没有定义
+        """
+        self._apply_parse_results(tasks, results, cache, entries)
+        
+        # 已删除或重命名的文件不会出现在新缓存中
+        if self.config["use_cache"] and (tasks or len(entries) != len(cache)):
+            self.save_cache(entries)
+        self.cache_entries = entries
+        
+        parsed = {file_path: entry["definitions"] for file_path, entry in entries.items()}
+        for _, file_path, _, _ in tasks:
+            parsed.setdefault(file_path, [])
+        return {f: parsed[f] for f in sorted(parsed)}
+    
+    def _apply_parse_results(self, tasks: List[Tuple[str, str, Optional[str], bool]],
+                             results: List[Optional[Dict[str, Any]]],
+                             cache: Dict[str, Dict[str, Any]], entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        将解析结果写入缓存条目
+        
+        Args:
+            tasks: [(项目根目录, 文件路径, 已知内容哈希, 是否记录性能数据), ...]
+            results: 与tasks顺序一致的解析结果
+            cache: 旧的缓存条目，内容哈希未变化的文件沿用其中的解析结果
+            entries: 新的缓存条目，会被更新；无法读取的文件会从中移除
+        """
+        for (_, file_path, _, _), entry in zip(tasks, results):
+            if entry is None:
+                entries.pop(file_path, None)
+                continue
+            if self.profile is not None:
+                self.profile["files"].append(dict(entry.pop("profile"), file=file_path))
+            if entry["definitions"] is None:
+                # 内容哈希未变化，沿用缓存结果并更新文件状态
+                for field in PARSE_RESULT_FIELDS:
+                    entry[field] = cache[file_path][field]
+            entries[file_path] = entry
+    
+    def _git(self, *args, stdin_data: Optional[bytes] = None) -> bytes:
+        """
+        在项目根目录执行git命令，返回标准输出
+        
+        Raises:
+            FileNotFoundError: 未安装git
+            subprocess.CalledProcessError: 命令执行失败
+        """
+        return subprocess.run(["git"] + list(args), cwd=self.project_root, input=stdin_data, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, check=True).stdout
+    
+    def _git_to_project_paths(self, toplevel: str, output: bytes) -> List[str]:
+        """将git输出的路径（以NUL分隔，相对于仓库根目录）转换为相对于项目根目录的路径，排除项目以外的文件"""
+        project_root = os.path.realpath(self.project_root)
+        paths = set()
+        for name in output.split(b'\0'):
+            if not name:
+                continue
+            rel_path = os.path.relpath(os.path.join(toplevel, os.fsdecode(name)), project_root)
+            if rel_path != os.pardir and not rel_path.startswith(os.pardir + os.sep):
+                paths.add(rel_path)
+        return sorted(paths)
+    
+    def get_git_changed_files(self, since: Optional[str] = None, staged: bool = False) -> Optional[List[str]]:
+        """
+        查询本地git仓库中有变化的文件
+        
+        Args:
+            since: 与该版本（提交、分支或标签）比较，包含工作区的修改和未跟踪的文件
+            staged: 只查询暂存区中的修改（用于pre-commit钩子）
+            
+        Returns:
+            有变化的文件路径列表（相对于项目根目录，包含已删除的文件），git不可用时返回None
+        """
+        files = self.get_git_files(since, staged)
+        return files[0] if files is not None else None
+    
+    def get_git_files(self, since: Optional[str] = None,
+                      staged: bool = False) -> Optional[Tuple[List[str], List[str], List[str]]]:
+        """
+        查询本地git仓库中的文件列表
+        
+        Args:
+            since: 与该版本比较，参见get_git_changed_files
+            staged: 查询暂存区，参见get_git_changed_files
+            
+        Returns:
+            (有变化的文件, 项目中的文件, 内容需要从暂存区读取的文件)，路径相对于项目根目录，git不可用时返回None。
+            项目中的文件：staged时为暂存区中的文件，否则为已跟踪和未被忽略的未跟踪文件；
+            内容需要从暂存区读取的文件只在staged时存在，即暂存区与HEAD或与工作区不同的文件
+        """
+        try:
+            toplevel = os.fsdecode(self._git("rev-parse", "--show-toplevel").strip())
+            if staged:
+                changed = self._git("diff", "--cached", "--name-only", "--no-renames", "-z")
+                unstaged = self._git("diff", "--name-only", "--no-renames", "-z")
+                listed = self._git("ls-files", "--cached", "--full-name", "-z")
+            else:
+                changed = self._git("diff", "--name-only", "--no-renames", "-z", since, "--")
+                changed += b'\0' + self._git("ls-files", "--others", "--exclude-standard", "--full-name", "-z")
+                unstaged = b""
+                listed = self._git("ls-files", "--cached", "--others", "--exclude-standard", "--full-name", "-z")
+        except FileNotFoundError:
+            logger.warning("警告: 未找到git命令")
+            return None
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"警告: git命令执行失败: {e.stderr.decode('utf-8', 'replace').strip()}")
+            return None
+        
+        changed = self._git_to_project_paths(toplevel, changed)
+        from_index = sorted(set(changed) | set(self._git_to_project_paths(toplevel, unstaged))) if staged else []
+        return changed, self._git_to_project_paths(toplevel, listed), from_index
+    
+    def read_git_index_files(self, file_paths: List[str]) -> Optional[Dict[str, Optional[bytes]]]:
+        """
+        读取暂存区中的文件内容
+        
+        Args:
+            file_paths: 文件路径列表（相对于项目根目录）
+            
+        Returns:
+            {文件路径: 内容}，暂存区中不存在（已删除）的文件内容为None；git不可用时返回None
+        """
+        try:
+            toplevel = os.fsdecode(self._git("rev-parse", "--show-toplevel").strip())
+            project_root = os.path.realpath(self.project_root)
+            specs = b"".join(
+                b":" + os.fsencode(os.path.relpath(os.path.join(project_root, file_path), toplevel)
+                                   .replace(os.sep, '/')) + b"\n"
+                for file_path in file_paths
+            )
+            output = self._git("cat-file", "--batch", stdin_data=specs)
+        except FileNotFoundError:
+            logger.warning("警告: 未找到git命令")
+            return None
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"警告: git命令执行失败: {e.stderr.decode('utf-8', 'replace').strip()}")
+            return None
+        
+        # 输出格式：每个对象一行"<sha> blob <大小>"，随后是内容和换行；不存在的对象为"<名称> missing"
+        contents = {}
+        pos = 0
+        for file_path in file_paths:
+            end = output.index(b"\n", pos)
+            header = output[pos:end].split()
+            pos = end + 1
+            if header[-1] == b"missing":
+                contents[file_path] = None
+                continue
+            size = int(header[-1])
+            contents[file_path] = output[pos:pos + size]
+            pos += size + 1
+        return contents
+    
+    def parse_git_changes(self, since: Optional[str] = None, staged: bool = False) -> Optional[Dict[str, List[Tuple[str, int]]]]:
+        """
+        只重新解析有变化的文件，其余文件的定义和文件索引来自解析缓存，不遍历目录
+        
+        git列出的文件和缓存中的文件逐个比较大小和修改时间（切换分支等操作后git不会报告这些文件），
+        与缓存一致且git未报告变化的文件直接使用缓存，其余重新解析。staged时检查的是暂存区的快照：
+        只包含暂存区中的文件，与工作区不同的文件读取暂存区中的内容（不写入解析缓存）。
+        冲突和保留范围违规仍然在整个项目范围内检测。
+        
+        Args:
+            since: 与该版本比较，参见get_git_changed_files
+            staged: 检查暂存区中的内容，参见get_git_changed_files
+            
+        Returns:
+            {文件路径: [(名称, ID), ...]}，按文件路径排序；git或解析缓存不可用时返回None
+        """
+        if not self.config["use_cache"]:
+            logger.warning("警告: 增量检查需要解析缓存，将执行完整检查")
+            return None
+        
+        git_files = self.get_git_files(since, staged)
+        if git_files is None:
+            logger.warning("警告: 无法获取git变更，将执行完整检查")
+            return None
+        
+        cache = self.load_cache()
+        if not cache:
+            logger.warning("警告: 没有可用的解析缓存，将执行完整检查")
+            return None
+        
+        # 只处理扫描目录内、扩展名匹配且未被忽略的文件
+        ignore_match = self._compile_ignore_patterns()
+        extensions = tuple(self.config["file_extensions"])
+        scan_dirs = [os.path.normpath(d.replace('/', os.sep)) for d in self.config["scan_dirs"]]
+        
+        def in_scope(file_path: str) -> bool:
+            return (file_path.endswith(extensions) and not self._is_ignored(file_path, ignore_match)
+                    and any(file_path.startswith(d + os.sep) or d == os.curdir for d in scan_dirs))
+        
+        changed, listed, from_index = git_files
+        changed_paths = set(filter(in_scope, changed))
+        index_paths = set(filter(in_scope, from_index))
+        candidates = set(filter(in_scope, listed))
+        if not staged:
+            # git忽略但之前扫描过的文件也需要检查
+            candidates.update(changed_paths, cache)
+        worktree_paths = candidates - index_paths
+        
+        entries = {}
+        tasks = []
+        sizes = []
+        for file_path in sorted(worktree_paths):
+            try:
+                file_stat = os.stat(os.path.join(self.project_root, file_path))
+            except OSError:
+                continue
+            cached = cache.get(file_path)
+            if (cached is not None and not cached["racy"] and file_path not in changed_paths
+                    and file_stat.st_size == cached["size"] and file_stat.st_mtime_ns == cached["mtime_ns"]):
+                entries[file_path] = cached
+                continue
+            tasks.append((self.project_root, file_path, cached["hash"] if cached else None,
+                          self.profile is not None))
+            sizes.append(file_stat.st_size)
+        
+        logger.info(f"git报告 {len(changed)} 个文件有变化，需要解析 {len(tasks) + len(index_paths)} 个文件，"
+                    f"其余文件使用解析缓存")
+        if self.profile is not None:
+            self.profile["cache_hits"] = len(entries)
+        
+        self._apply_parse_results(tasks, self._run_parse_tasks(tasks, sizes, list(entries.values())), cache, entries)
+        
+        # 工作区文件的结果写入缓存，暂存区中的内容只用于本次检查
+        saved = {path: entry for path, entry in cache.items() if path not in worktree_paths}
+        saved.update(entries)
+        if tasks or saved.keys() != cache.keys():
+            self.save_cache(saved)
+        
+        if index_paths:
+            contents = self.read_git_index_files(sorted(index_paths))
+            if contents is None:
+                logger.warning("警告: 无法读取暂存区中的文件，将执行完整检查")
+                return None
+            for file_path, data in contents.items():
+                if data is None:
+                    continue
+                cached = cache.get(file_path)
+                entry = parse_content_entry(data, cached["hash"] if cached else None, self.profile is not None)
+                if self.profile is not None:
+                    self.profile["files"].append(dict(entry.pop("profile"), file=file_path))
+                if entry["definitions"] is None:
+                    for field in PARSE_RESULT_FIELDS:
+                        entry[field] = cached[field]
+                entries[file_path] = entry
+        
+        self.file_index = sorted((FileEntry(path, entry["size"], entry["mtime_ns"])
+                                  for path, entry in entries.items()), key=lambda e: e.path)
+        self.cache_entries = entries
+        return {path: entries[path]["definitions"] for path in sorted(entries)}
+    
+    def _run_parse_tasks(self, tasks: List[Tuple[str, str, Optional[str], bool]], sizes: List[int],
+                         known_entries: Iterable[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        执行解析任务，按配置的并行度分发到进程池，内容相同的文件（如多处内置的SDK副本）只完整解析一次
+        
+        Args:
+            tasks: [(项目根目录, 文件路径, 已知内容哈希, 是否记录性能数据), ...]
+            sizes: 与tasks顺序一致的文件大小
+            known_entries: 已有的解析结果（缓存条目），大小和内容哈希相同的文件直接复用
+            
+        Returns:
+            与tasks顺序一致的解析结果列表
+        """
+        results, reused = run_deduplicated_parse_tasks(tasks, sizes, known_entries, self.config["jobs"])
+        if reused:
+            logger.info(f"{reused} 个文件与其他文件内容相同，直接复用解析结果")
+        if self.profile is not None:
+            self.profile["reused_files"] += reused
+        return results
+    
+    def load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """
+        加载解析缓存
+        
+        Returns:
+            {文件路径: 缓存条目}，缓存不存在、损坏或版本不匹配时返回空字典
+        """
+        cache_path = os.path.join(self.project_root, self.config["cache_path"])
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"警告: 无法读取解析缓存，将重新解析所有文件: {e}")
+            return {}
+        
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        
+        # 修改时间与缓存写入时间过于接近的文件，可能在同一时间粒度内再次被修改，
+        # 这类条目不能只凭文件状态判断，需要重新比较内容哈希
+        racy_before_ns = data.get("saved_at_ns", 0) - CACHE_RACY_WINDOW_NS
+        entries = {}
+        for file_path, entry in data.get("files", {}).items():
+            entry["definitions"] = [tuple(item) for item in entry["definitions"]]
+            entry["references"] = [tuple(item) for item in entry["references"]]
+            entry["racy"] = entry["mtime_ns"] >= racy_before_ns
+            entries[file_path] = entry
+        return entries
+    
+    def save_cache(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        写入解析缓存，先写临时文件再替换，避免中断时留下损坏的缓存
+        
+        Args:
+            entries: {文件路径: 缓存条目}
+        """
+        cache_path = os.path.join(self.project_root, self.config["cache_path"])
+        data = {
+            "version": CACHE_VERSION,
+            # time.time_ns()需要Python 3.7，这里只用于判断修改时间是否接近写入时间，浮点精度足够
+            "saved_at_ns": int(time.time() * 1e9),
+            "files": {
+                file_path: {
+                    "size": entry["size"],
+                    "mtime_ns": entry["mtime_ns"],
+                    "hash": entry["hash"],
+                    "definitions": entry["definitions"],
+                    "references": entry["references"]
+                }
+                for file_path, entry in sorted(entries.items())
+            }
+        }
+        
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"警告: 无法写入解析缓存: {cache_path}, 错误: {e}")
+    
+    def register_definitions(self, parsed: Dict[str, List[Tuple[str, int]]]) -> None:
+        """
+        按文件路径顺序注册解析结果，保证串行和并行运行的报告完全一致
+        
+        Args:
+            parsed: {文件路径: [(名称, ID), ...]}
+        """
+        for file_path in sorted(parsed):
+            self.file_definitions[file_path] = parsed[file_path]
+            for name, id_value in parsed[file_path]:
+                self.register_netmsg_id(name, id_value, file_path)
+    
+    def register_references(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        记录文件中对NetMsg名称的引用，用于查找未定义的引用和未使用的ID
+        
+        Args:
+            entries: {文件路径: 解析缓存条目}
+        """
+        for file_path in sorted(entries):
+            references = entries[file_path]["references"]
+            if references:
+                self.file_references[file_path] = references
+            else:
+                self.file_references.pop(file_path, None)
+        self._references_version += 1
+    
+    def get_usage_report(self) -> Dict[str, List[Any]]:
+        """
+        交叉比对定义和引用
+        
+        定义和引用只按名称匹配（引用中NetMsg前面的模块名不参与比较），因此不会误报，
+        但不同模块中的同名消息会被视为同一个名称。
+        结果会被缓存，直到定义或引用发生变化，生成多种报告时只需比对一次。
+        
+        Returns:
+            {"undefined": [NetMsgReference, ...]（引用了未定义的名称，按文件和行号排序）,
+             "unused": [NetMsgDefinition, ...]（定义了但从未引用的名称，按ID排序）}
+        """
+        key = (self.registry, self.registry.version, self._references_version)
+        if self._usage_report is not None and self._usage_report[0] == key:
+            return self._usage_report[1]
+        
+        defined = self.registry.defined_names()
+        referenced = set()
+        undefined = []
+        for file_path in sorted(self.file_references):
+            for name, line in self.file_references[file_path]:
+                referenced.add(name)
+                if name not in defined:
+                    undefined.append(NetMsgReference(name, file_path, line))
+        
+        unused = self.registry.definitions_excluding(referenced)
+        self._usage_report = (key, {"undefined": undefined, "unused": unused})
+        return self._usage_report[1]
+    
+    def unregister_file(self, file_path: str) -> None:
+        """
+        撤销某个文件注册的所有NetMsg ID，冲突和保留范围违规信息同步更新
+        
+        Args:
+            file_path: 文件路径（相对于项目根目录）
+        """
+        self.registry.unregister_file(file_path, self.file_definitions.pop(file_path, []))
+    
+    def register_netmsg_id(self, name: str, id_value: int, file_path: str) -> None:
+        """
+        注册发现的NetMsg ID
+        
+        Args:
+            name: ID名称
+            id_value: ID值
+            file_path: 文件路径
+        """
+        self.registry.register(name, id_value, file_path)
+    
+    def check_reserved_violation(self, name: str, id_value: int, file_path: str) -> None:
+        """
+        检查是否违反保留范围
+        
+        Args:
+            name: ID名称
+            id_value: ID值
+            file_path: 文件路径
+        """
+        self.registry.check_reserved_violation(name, id_value, file_path)
+    
+    def check(self, since: Optional[str] = None, staged: bool = False,
+              write_reports: bool = False) -> CheckResult:
+        """
+        执行检查并返回结构化结果
+        
+        不输出到控制台（消息通过logging记录），异常直接抛出。除解析缓存（由config["use_cache"]控制）外，
+        只有write_reports为True时才写入文件。
+        
+        Args:
+            since: 只重新解析相对于该git版本有变化的文件，其余文件使用解析缓存
+            staged: 检查git暂存区的快照，暂存区中有变化的文件读取暂存区中的内容，其余文件使用解析缓存
+            write_reports: 是否写入文本报告和机器可读报告
+            
+        Returns:
+            检查结果
+        """
+        self.reset()
+        
+        # 增量检查：只解析git报告有变化的文件，文件索引来自解析缓存
+        parsed = None
+        if since is not None or staged:
+            with self._profile_phase("parsing"):
+                parsed = self.parse_git_changes(since, staged)
+        
+        if parsed is None:
+            # 扫描所有配置的目录，建立文件索引（每次运行只遍历一次）
+            with self._profile_phase("discovery"):
+                self.file_index = self.discover_files()
+            
+            # 解析所有文件（可并行），再按文件路径顺序合并注册
+            with self._profile_phase("parsing"):
+                parsed = self.parse_files(self.file_index)
+        
+        return self.finish_check(parsed, write_reports)
+    
+    def reset(self) -> None:
+        """清空上一次检查的结果"""
+        self.file_index = []
+        self.file_definitions = {}
+        self.file_references = {}
+        if self.config["ownership_path"]:
+            # 每次检查都重新读取，修改配置文件后无需重新创建检测器
+            self.config["reserved_ranges"] = load_ownership_config(
+                os.path.join(self.project_root, self.config["ownership_path"]))
+        self.registry = NetMsgRegistry(self.config["reserved_ranges"])
+        self.profile = {"phases": {}, "files": [], "cache_hits": 0, "reused_files": 0} if self.config["profile"] else None
+        self._report_start = None
+    
+    def finish_check(self, parsed: Dict[str, List[Tuple[str, int]]], write_reports: bool = False) -> CheckResult:
+        """
+        注册解析结果，按需写入报告
+        
+        Args:
+            parsed: {文件路径: [(名称, ID), ...]}
+            write_reports: 是否写入文本报告和机器可读报告
+            
+        Returns:
+            检查结果
+        """
+        with self._profile_phase("registration"):
+            self.register_definitions(parsed)
+            self.register_references(self.cache_entries)
+        
+        report_paths = {}
+        if write_reports:
+            self._report_start = time.perf_counter()
+            report_paths["text"] = self.generate_report()
+            report_paths[self.config["report_format"]] = self.generate_data_report()
+            lua_registry_path = self.generate_lua_registry()
+            if lua_registry_path is not None:
+                report_paths["lua"] = lua_registry_path
+            if self.profile is not None:
+                self.profile["phases"]["report_writing"] = time.perf_counter() - self._report_start
+        
+        return self.get_result(report_paths)
+    
+    def get_result(self, report_paths: Optional[Dict[str, str]] = None) -> CheckResult:
+        """
+        获取当前的检查结果
+        
+        Args:
+            report_paths: 已写入的报告 {报告类型: 绝对路径}
+        """
+        usage = self.get_usage_report()
+        return CheckResult(
+            project_root=self.project_root,
+            file_count=len(self.file_index),
+            definitions=self.file_definitions,
+            discovered_ids=self.discovered_ids,
+            conflicts=self.conflicts,
+            reserved_violations=self.reserved_violations,
+            undefined_references=usage["undefined"],
+            unused_definitions=usage["unused"],
+            report_paths=report_paths or {},
+            profile=self.get_profile_report()
+        )
+    
+    def run(self, since: Optional[str] = None, staged: bool = False,
+            partial_paths: Optional[List[str]] = None) -> Optional[CheckResult]:
+        """
+        运行检查，写入报告并输出统计信息（命令行入口）
+        
+        Args:
+            since: 只重新解析相对于该git版本有变化的文件，其余文件使用解析缓存
+            staged: 检查git暂存区的快照，暂存区中有变化的文件读取暂存区中的内容，其余文件使用解析缓存
+            partial_paths: 合并这些分片的部分结果，不扫描项目文件
+            
+        Returns:
+            检查结果，运行过程中发生错误时返回None
+        """
+        try:
+            if partial_paths is not None:
+                logger.info(f"开始合并 {len(partial_paths)} 个分片的部分结果...")
+                result = self.merge_partial_results(partial_paths, write_reports=True)
+            else:
+                logger.info("开始检查NetMsg ID冲突...")
+                result = self.check(since, staged, write_reports=True)
+        except ValueError as e:
+            # 部分结果无效或分片不完整，不是程序错误，不输出调用栈
+            logger.error(f"错误: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"运行过程中发生错误: {e}")
+            logger.error(f"错误详情: {traceback.format_exc()}")
+            return None
+        
+        # 输出统计信息
+        logger.info(f"\n检查完成! 统计信息:")
+        logger.info(f"- 发现的NetMsg ID总数: {len(result.discovered_ids)}")
+        
+        # 计算真正的冲突数量
+        real_conflict_count = len(result.conflicts)
+        if real_conflict_count > 0:
+            logger.info(f"- 冲突的ID数量: {real_conflict_count} (不同名称或不同文件的相同ID)")
+        else:
+            logger.info(f"- 冲突的ID数量: {real_conflict_count}")
+        
+        # 违反保留范围的ID
+        logger.info(f"- 违反保留范围的ID数量: {result.violation_count}")
+        logger.info(f"- 未定义的NetMsg引用数量: {len(result.undefined_references)}")
+        logger.info(f"- 未使用的NetMsg ID数量: {len(result.unused_definitions)}")
+        
+        self.print_profile()
+        
+        logger.info(f"检查完成，报告已生成: {result.report_paths['text']}")
+        logger.info(f"{self.config['report_format'].upper()}报告已生成: {result.report_paths[self.config['report_format']]}")
+        return result
+    
+    def check_shard(self, shard: int, shard_count: int) -> Dict[str, Dict[str, Any]]:
+        """
+        只解析属于某个分片的文件，不注册定义，也不检测冲突
+        
+        文件按路径的哈希稳定地分配到分片（参见shard_of_file），各分片的部分结果由merge_partial_results合并。
+        启用缓存时，只更新该分片文件的缓存条目，其他分片的条目保持不变。
+        
+        Args:
+            shard: 分片序号，从1开始
+            shard_count: 分片总数
+            
+        Returns:
+            {文件路径: 缓存条目}，包含该分片的所有文件
+            
+        Raises:
+            ValueError: 分片序号无效
+        """
+        if not 1 <= shard <= shard_count:
+            raise ValueError(f"无效的分片: {shard}/{shard_count} (应为 1-{shard_count}/{shard_count})")
+        
+        self.reset()
+        with self._profile_phase("discovery"):
+            self.file_index = [entry for entry in self.discover_files()
+                               if shard_of_file(entry.path, shard_count) == shard]
+        
+        with self._profile_phase("parsing"):
+            cache, entries, tasks = self.plan_parse_tasks(self.file_index)
+            sizes = {file_entry.path: file_entry.size for file_entry in self.file_index}
+            results = self._run_parse_tasks(tasks, [sizes[task[1]] for task in tasks], entries.values())
+            self._apply_parse_results(tasks, results, cache, entries)
+        
+        if self.config["use_cache"]:
+            # 其他分片的缓存条目保持不变，本分片已删除或重命名的文件不会出现在新缓存中
+            others = {file_path: entry for file_path, entry in cache.items()
+                      if shard_of_file(file_path, shard_count) != shard}
+            if tasks or len(others) + len(entries) != len(cache):
+                self.save_cache({**others, **entries})
+        self.cache_entries = entries
+        return entries
+    
+    def write_partial_result(self, shard: int, shard_count: int, entries: Dict[str, Dict[str, Any]]) -> str:
+        """
+        写入分片的部分结果，先写临时文件再替换
+        
+        文件路径统一使用/分隔，不同平台上运行的分片也可以合并。
+        
+        Args:
+            shard: 分片序号，从1开始
+            shard_count: 分片总数
+            entries: check_shard返回的缓存条目
+            
+        Returns:
+            部分结果文件的绝对路径
+            
+        Raises:
+            OSError: 无法写入文件
+        """
+        partial_path = os.path.join(self.project_root,
+                                    self.config["partial_output_path"].format(shard=shard, count=shard_count))
+        data = {
+            "version": PARTIAL_RESULT_VERSION,
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "shard": shard,
+            "shard_count": shard_count,
+            "files": {
+                file_path.replace(os.sep, '/'): {
+                    "size": entry["size"],
+                    "mtime_ns": entry["mtime_ns"],
+                    "hash": entry["hash"],
+                    "definitions": entry["definitions"],
+                    "references": entry["references"]
+                }
+                for file_path, entry in sorted(entries.items())
+            }
+        }
+        
+        os.makedirs(os.path.dirname(partial_path) or ".", exist_ok=True)
+        temp_path = partial_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, partial_path)
+        return partial_path
+    
+    def merge_partial_results(self, partial_paths: List[str], write_reports: bool = False) -> CheckResult:
+        """
+        合并各分片的部分结果，注册所有定义，检测冲突和保留范围违规，按需写入报告
+        
+        所有分片必须使用相同的分片总数，且每个分片恰好出现一次。不写入解析缓存。
+        
+        Args:
+            partial_paths: 部分结果文件路径列表
+            write_reports: 是否写入文本报告和机器可读报告
+            
+        Returns:
+            检查结果，与不分片的完整检查一致
+            
+        Raises:
+            ValueError: 部分结果无效、分片总数不一致、分片重复或缺失
+            OSError: 无法读取部分结果
+        """
+        if not partial_paths:
+            raise ValueError("没有指定需要合并的部分结果")
+        
+        self.reset()
+        shards = {}  # {分片序号: 部分结果路径}
+        shard_count = None
+        entries = {}
+        with self._profile_phase("parsing"):
+            for partial_path in partial_paths:
+                with open(partial_path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if not isinstance(data, dict) or data.get("version") != PARTIAL_RESULT_VERSION:
+                    raise ValueError(f"不是有效的部分结果文件，或由不兼容的版本生成: {partial_path}")
+                
+                shard = data["shard"]
+                if shard_count is None:
+                    shard_count = data["shard_count"]
+                elif data["shard_count"] != shard_count:
+                    raise ValueError(f"分片总数不一致: {partial_path} 为 {data['shard_count']}，"
+                                     f"{shards[min(shards)]} 为 {shard_count}")
+                if shard in shards:
+                    raise ValueError(f"分片 {shard}/{shard_count} 重复: {shards[shard]} 和 {partial_path}")
+                shards[shard] = partial_path
+                
+                for file_path, entry in data["files"].items():
+                    entries[file_path.replace('/', os.sep)] = {
+                        "size": entry["size"],
+                        "mtime_ns": entry["mtime_ns"],
+                        "hash": entry["hash"],
+                        "definitions": [tuple(item) for item in entry["definitions"]],
+                        "references": [tuple(item) for item in entry["references"]]
+                    }
+        
+        missing = [str(shard) for shard in range(1, shard_count + 1) if shard not in shards]
+        if missing:
+            raise ValueError(f"缺少分片: {', '.join(missing)} (共 {shard_count} 个分片)")
+        
+        self.file_index = sorted((FileEntry(file_path, entry["size"], entry["mtime_ns"])
+                                  for file_path, entry in entries.items()), key=lambda e: e.path)
+        self.cache_entries = entries
+        return self.finish_check({file_path: entries[file_path]["definitions"] for file_path in sorted(entries)},
+                                 write_reports)
+    
+    def resolve_id_range(self, id_range: Union[str, Tuple[int, int], None] = None) -> Tuple[int, int]:
+        """
+        解析分配ID的范围
+        
+        Args:
+            id_range: 保留范围名称、"min-max"字符串或(min, max)元组，为None时使用配置的allocation_range
+            
+        Returns:
+            (min, max)，包含两端
+            
+        Raises:
+            ValueError: 范围格式错误或保留范围不存在
+        """
+        if id_range is None:
+            return self.config["allocation_range"]["min"], self.config["allocation_range"]["max"]
+        if isinstance(id_range, str):
+            for range_info in self.config["reserved_ranges"]:
+                if range_info["name"] == id_range:
+                    return range_info["min"], range_info["max"]
+            match = re.fullmatch(r'\s*(\d+)\s*-\s*(\d+)\s*', id_range)
+            if not match:
+                names = ", ".join(r["name"] for r in self.config["reserved_ranges"])
+                raise ValueError(f"无效的ID范围: {id_range} (应为 min-max 或保留范围名称: {names})")
+            id_range = (int(match.group(1)), int(match.group(2)))
+        min_id, max_id = id_range
+        if min_id > max_id:
+            raise ValueError(f"无效的ID范围: {min_id}-{max_id}")
+        return min_id, max_id
+    
+    def allocate_ids(self, count: int, id_range: Union[str, Tuple[int, int], None] = None) -> List[int]:
+        """
+        根据已发现的ID分配新的空闲ID（需要先运行检查）
+        
+        除了完整包含分配范围的保留范围外，其他保留范围内的ID不会被分配，
+        因此指定保留范围名称时只在该范围内分配，未指定范围时不会分配任何保留范围内的ID。
+        
+        Args:
+            count: 需要的ID数量
+            id_range: 分配范围，参见resolve_id_range
+            
+        Returns:
+            分配的ID列表，优先返回连续的ID
+            
+        Raises:
+            ValueError: 范围无效或空闲ID不足
+        """
+        if count <= 0:
+            raise ValueError(f"分配的ID数量必须大于0: {count}")
+        min_id, max_id = self.resolve_id_range(id_range)
+        blocked = [(r["min"], r["max"]) for r in self.config["reserved_ranges"]
+                   if not (r["min"] <= min_id and max_id <= r["max"])]
+        return allocate_free_ids(self.discovered_ids, blocked, count, min_id, max_id)
+    
+    @contextlib.contextmanager
+    def _profile_phase(self, phase: str):
+        """记录一个阶段的耗时（未启用性能分析时不做任何事）"""
+        if self.profile is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = self.profile["phases"]
+            phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+    
+    def get_profile_report(self) -> Optional[Dict[str, Any]]:
+        """
+        汇总性能分析数据
+        
+        读取、解码和匹配的耗时是所有被解析文件的累计值，并行解析时可能大于解析阶段的实际耗时。
+        
+        Returns:
+            性能分析数据，未启用性能分析时返回None
+        """
+        if self.profile is None:
+            return None
+        
+        files = self.profile["files"]
+        phases = dict(self.profile["phases"])
+        if self._report_start is not None and "report_writing" not in phases:
+            # 报告写入尚未结束时，记录截至目前的耗时
+            phases["report_writing"] = time.perf_counter() - self._report_start
+        for name, key in (("reading", "read"), ("decoding", "decode"), ("matching", "match")):
+            phases[name] = sum((f[key] for f in files), 0.0)
+        
+        order = ["discovery", "parsing", "reading", "decoding", "matching", "registration", "report_writing"]
+        slowest = sorted(files, key=lambda f: f["total"], reverse=True)[:self.config["profile_top"]]
+        
+        def file_json(f):
+            return {"file": f["file"], "time": f["total"], "read": f["read"], "decode": f["decode"],
+                    "match": f["match"], "bytes": f["bytes"], "matches": f["matches"],
+                    "encoding": f["encoding"]}
+        
+        return {
+            "phases": {name: phases[name] for name in order if name in phases},
+            "totals": {
+                "indexed_files": len(self.file_index),
+                "cache_hits": self.profile["cache_hits"],
+                "reused_files": self.profile["reused_files"],
+                "parsed_files": len(files),
+                "bytes_read": sum(f["bytes"] for f in files),
+                "regex_matches": sum(f["matches"] for f in files)
+            },
+            "slowest_files": [file_json(f) for f in slowest],
+            "files": [file_json(f) for f in sorted(files, key=lambda f: f["file"])]
+        }
+    
+    def print_profile(self) -> None:
+        """输出各阶段耗时和最慢的文件"""
+        profile = self.get_profile_report()
+        if profile is None:
+            return
+        
+        logger.info("\n性能分析:")
+        for phase, elapsed in profile["phases"].items():
+            logger.info(f"- {phase:<16}{elapsed * 1000:>10.1f} ms")
+        totals = profile["totals"]
+        logger.info(f"- 解析文件 {totals['parsed_files']} 个 (缓存命中 {totals['cache_hits']} 个，"
+                    f"内容与其他文件相同而复用解析结果 {totals['reused_files']} 个)，"
+                    f"读取 {totals['bytes_read'] / 1024 / 1024:.2f} MB，正则匹配 {totals['regex_matches']} 次")
+        
+        if profile["slowest_files"]:
+            logger.info(f"\n最慢的 {len(profile['slowest_files'])} 个文件:")
+            for f in profile["slowest_files"]:
+                logger.info(f"  {f['time'] * 1000:>8.2f} ms  {f['bytes']:>10} B  {f['matches']:>6} 次匹配  "
+                            f"{f['encoding'] or '-':<9} {f['file']}")
+    
+    def watch(self, interval: float = 1.0) -> int:
+        """
+        持续监视文件变化，只重新解析变化的文件并增量更新冲突信息和报告
+        
+        Linux下使用inotify接收文件变化事件，其他平台或inotify不可用时定期轮询文件状态。
+        
+        Args:
+            interval: 轮询间隔（秒），同时也是等待事件的超时时间
+            
+        Returns:
+            退出码，首次检测失败时为1且不进入监视
+        """
+        if self.run() is None:
+            return 1
+        
+        watcher = _create_file_watcher(self)
+        logger.info(f"正在监视文件变化 (模式: {watcher.name})，按 Ctrl+C 退出...")
+        
+        try:
+            while True:
+                changed = watcher.poll(interval)
+                if changed is None:
+                    # 事件丢失（如inotify队列溢出），通过比较文件状态找出变化的文件
+                    changed = self._diff_file_index()
+                    watcher.sync(self.scanned_dirs)
+                if not changed:
+                    continue
+                
+                start = time.perf_counter()
+                updated = self.apply_file_changes(changed)
+                if not updated:
+                    continue
+                
+                self.generate_report()
+                self.generate_data_report()
+                self.generate_lua_registry()
+                
+                violation_count = sum(len(v) for v in self.reserved_violations.values())
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] 更新 {updated} 个文件: "
+                            f"ID总数 {len(self.discovered_ids)}，冲突 {len(self.conflicts)}，"
+                            f"违反保留范围 {violation_count} (耗时 {elapsed_ms:.1f} ms)")
+        except KeyboardInterrupt:
+            logger.info("\n已停止监视")
+        finally:
+            watcher.close()
+            if self.config["use_cache"]:
+                self.save_cache(self.cache_entries)
+        return 0
+    
+    def apply_file_changes(self, changed: Set[str]) -> int:
+        """
+        重新解析变化的文件：撤销文件原有的定义，再注册新的定义
+        
+        Args:
+            changed: 变化的文件或目录路径集合（相对于项目根目录），不存在的路径视为已删除
+            
+        Returns:
+            定义发生变化或被删除的文件数量
+        """
+        index = {entry.path: entry for entry in self.file_index}
+        ignore_match = self._compile_ignore_patterns()
+        extensions = tuple(self.config["file_extensions"])
+        updated = 0
+        
+        for file_path in sorted(changed):
+            if not os.path.isfile(os.path.join(self.project_root, file_path)):
+                # 文件或目录已删除（或移出扫描范围），撤销其下所有文件的定义
+                prefix = file_path + os.sep
+                for removed in [p for p in index if p == file_path or p.startswith(prefix)]:
+                    del index[removed]
+                    self.cache_entries.pop(removed, None)
+                    if self.file_references.pop(removed, None) is not None:
+                        self._references_version += 1
+                    self.unregister_file(removed)
+                    updated += 1
+                continue
+            
+            if not file_path.endswith(extensions) or self._is_ignored(file_path, ignore_match):
+                continue
+            
+            cached = self.cache_entries.get(file_path)
+            entry = parse_file_entry(self.project_root, file_path, cached["hash"] if cached else None)
+            if entry is None:
+                continue
+            index[file_path] = FileEntry(file_path, entry["size"], entry["mtime_ns"])
+            
+            if entry["definitions"] is None:
+                # 内容未变化（如编辑器保存了相同内容），只更新文件状态
+                for field in PARSE_RESULT_FIELDS:
+                    entry[field] = cached[field]
+                self.cache_entries[file_path] = entry
+                continue
+            
+            self.cache_entries[file_path] = entry
+            self.unregister_file(file_path)
+            self.register_definitions({file_path: entry["definitions"]})
+            self.register_references({file_path: entry})
+            updated += 1
+        
+        self.file_index = sorted(index.values(), key=lambda entry: entry.path)
+        return updated
+    
+    def _is_ignored(self, file_path: str, ignore_match) -> bool:
+        """
+        判断相对路径的任一部分是否匹配忽略规则，与_walk_directory的判断方式一致
+        
+        Args:
+            file_path: 文件路径（相对于项目根目录）
+            ignore_match: 忽略规则匹配函数，可以为None
+        """
+        if ignore_match is None:
+            return False
+        parts = file_path.split(os.sep)
+        for i, name in enumerate(parts):
+            if ignore_match(name) or ignore_match('/'.join(parts[:i + 1])):
+                return True
+        return False
+    
+    def _diff_file_index(self) -> Set[str]:
+        """
+        重新遍历扫描目录，与当前文件索引比较，找出新增、修改和删除的文件
+        
+        Returns:
+            变化的文件路径集合（相对于项目根目录）
+        """
+        old_index = {entry.path: entry for entry in self.file_index}
+        new_index = {entry.path: entry for entry in self.discover_files(verbose=False)}
+        changed = {path for path, entry in new_index.items() if old_index.get(path) != entry}
+        changed.update(path for path in old_index if path not in new_index)
+        return changed
+    
+    def generate_report(self) -> str:
+        """
+        生成文本报告，按章节逐行写入文件，不在内存中拼接整个报告
+        
+        Returns:
+            报告文件的绝对路径
+        """
+        output_path = os.path.join(self.project_root, self.config["output_path"])
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        
+        try:
+            # 显式指定UTF-8编码和换行符，确保正确处理中文且各平台输出一致
+            with open(output_path, 'w', encoding='utf-8', newline='', buffering=REPORT_BUFFER_SIZE) as file:
+                _write_lines(file, self._iter_report_lines())
+            logger.info(f"报告已成功写入: {output_path}")
+        except Exception as e:
+            logger.error(f"无法写入报告文件: {output_path}, 错误: {e}")
+            logger.error(f"错误详情: {traceback.format_exc()}")
+            # 输出到日志
+            for line in self._iter_report_lines():
+                logger.info(line)
+        return output_path
+    
+    def _iter_report_lines(self):
+        """逐行生成文本报告内容"""
+        violation_count = sum(len(v) for v in self.reserved_violations.values())
+        usage_report = self.get_usage_report()
+        
+        yield "============================================"
+        yield "  UniX SDK - NetMsg ID 冲突检测报告"
+        yield "============================================"
+        yield ""
+        yield f"检测时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        yield f"扫描文件总数: {len(self.file_index)}"
+        yield f"发现的NetMsg ID总数: {len(self.discovered_ids)}"
+        yield f"冲突的ID数量: {len(self.conflicts)}"
+        yield f"违反保留范围的ID数量: {violation_count}"
+        yield f"未定义的NetMsg引用数量: {len(usage_report['undefined'])}"
+        yield f"未使用的NetMsg ID数量: {len(usage_report['unused'])}"
+        yield ""
+        yield "1. ID冲突情况"
+        yield "--------------------------------------------"
+        
+        # 添加冲突信息
+        if self.conflicts:
+            yield f"发现 {len(self.conflicts)} 个ID冲突:"
+            for id_value, usages in sorted(self.conflicts.items()):
+                # 获取不同的名称和文件组合
+                names_files = set((item.name, item.file) for item in usages)
+                yield f"\nID: {id_value} 存在 {len(names_files)} 处不同定义:"
+                
+                # 按文件分组显示
+                files_dict = {}
+                for usage in usages:
+                    if usage.file not in files_dict:
+                        files_dict[usage.file] = []
+                    if usage.name not in files_dict[usage.file]:
+                        files_dict[usage.file].append(usage.name)
+                
+                # 显示每个文件中的定义
+                for file_path, names in sorted(files_dict.items()):
+                    if len(names) == 1:
+                        yield f"  - {names[0]} ({file_path})"
+                    else:
+                        yield f"  - 文件 {file_path} 中有多个定义:"
+                        for name in sorted(names):
+                            yield f"    * {name}"
+        else:
+            yield "未发现ID冲突。"
+        
+        yield ""
+        yield "2. 保留范围违规情况"
+        yield "--------------------------------------------"
+        
+        if self.reserved_violations:
+            for range_name, violations in self.reserved_violations.items():
+                yield f"\n范围 \"{range_name}\" 中发现 {len(violations)} 个非授权使用:"
+                for v in violations:
+                    yield f"  - {v.name} = {v.id} ({v.file})"
+        else:
+            yield "未发现保留范围违规。"
+        
+        yield ""
+        yield "3. 所有发现的NetMsg ID (按ID排序)"
+        yield "--------------------------------------------"
+        
+        # 按ID排序
+        for id_value in sorted(self.discovered_ids):
+            name, file_path = self.registry.first_definition(id_value)  # 取第一个使用情况
+            yield f"{id_value}: {name} ({file_path})"
+        
+        # 添加按名称排序的索引
+        yield ""
+        yield "4. 所有发现的NetMsg ID (按名称排序)"
+        yield "--------------------------------------------"
+        
+        # 按名称排序
+        for id_value in self.registry.ids_by_name():
+            name, file_path = self.registry.first_definition(id_value)
+            yield f"{name}: {id_value} ({file_path})"
+        
+        yield ""
+        yield "5. 未定义的NetMsg引用"
+        yield "--------------------------------------------"
+        
+        if usage_report["undefined"]:
+            yield f"发现 {len(usage_report['undefined'])} 处引用了未定义的名称:"
+            for ref in usage_report["undefined"]:
+                yield f"  - {ref.name} ({ref.file}:{ref.line})"
+        else:
+            yield "未发现未定义的引用。"
+        
+        yield ""
+        yield "6. 未使用的NetMsg ID"
+        yield "--------------------------------------------"
+        
+        if usage_report["unused"]:
+            yield f"发现 {len(usage_report['unused'])} 个定义从未被引用:"
+            for item in usage_report["unused"]:
+                yield f"  - {item.name} = {item.id} ({item.file})"
+        else:
+            yield "未发现未使用的ID。"
+    
+    def generate_data_report(self) -> str:
+        """
+        按配置的格式生成机器可读的报告
+        
+        Returns:
+            报告文件的绝对路径
+        """
+        if self.config["report_format"] == "ndjson":
+            self.generate_ndjson_report()
+            return os.path.join(self.project_root, self.config["ndjson_output_path"])
+        self.generate_json_report()
+        return os.path.join(self.project_root, self.config["json_output_path"])
+    
+    def generate_json_report(self) -> None:
+        """
+        生成JSON格式的报告，逐条序列化写入文件，不复制整个数据结构
+        
+        json_layout为indexed时生成紧凑的索引格式：文件路径只在"files"表中出现一次，
+        各处定义和引用用数组表示并通过下标引用文件，适合定义数量很大的项目。
+        """
+        json_output_path = os.path.join(self.project_root, self.config["json_output_path"])
+        os.makedirs(os.path.dirname(json_output_path), exist_ok=True)
+        indexed = self.config["json_layout"] == "indexed"
+        file_numbers = {}  # {文件路径: 在files表中的下标}，按首次出现的顺序编号
+        
+        def file_json(file_path):
+            if not indexed:
+                return file_path
+            number = file_numbers.get(file_path)
+            if number is None:
+                number = file_numbers[file_path] = len(file_numbers)
+            return number
+        
+        def usages_json(usages):
+            if indexed:
+                return [[usage.name, file_json(usage.file)] for usage in usages]
+            return [{"name": usage.name, "file": usage.file} for usage in usages]
+        
+        def definition_json(definition):
+            if indexed:
+                return [definition.name, definition.id, file_json(definition.file)]
+            return {"name": definition.name, "id": definition.id, "file": definition.file}
+        
+        def reference_json(reference):
+            if indexed:
+                return [reference.name, file_json(reference.file), reference.line]
+            return {"name": reference.name, "file": reference.file, "line": reference.line}
+        
+        def sections(usage_report):
+            yield "timestamp", datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            if indexed:
+                yield "layout", "indexed"
+            yield "conflicts", _JsonObjectStream(
+                (str(k), usages_json(v)) for k, v in self.conflicts.items())
+            yield "reserved_violations", _JsonObjectStream(
+                (k, (definition_json(v) for v in violations)) for k, violations in self.reserved_violations.items())
+            yield "discovered_ids", _JsonObjectStream(
+                (str(k), usages_json(v)) for k, v in self.discovered_ids.items())
+            yield "usage", _JsonObjectStream(iter([
+                ("undefined_references", (reference_json(ref) for ref in usage_report["undefined"])),
+                ("unused_definitions", (definition_json(item) for item in usage_report["unused"]))
+            ]))
+            if indexed:
+                # 生成器按顺序执行，此时报告中出现过的文件都已编号
+                yield "files", list(file_numbers)
+            yield "statistics", {
+                "total_ids": len(self.discovered_ids),
+                "conflict_count": len(self.conflicts),
+                "violation_count": sum(len(v) for v in self.reserved_violations.values()),
+                "undefined_reference_count": len(usage_report["undefined"]),
+                "unused_count": len(usage_report["unused"])
+            }
+            profile = self.get_profile_report()
+            if profile is not None:
+                yield "profile", profile
+        
+        try:
+            with open(json_output_path, 'w', encoding='utf-8', newline='',
+                      buffering=REPORT_BUFFER_SIZE) as file:
+                # 默认格式与 json.dump(report, file, ensure_ascii=False, indent=2) 完全一致
+                _write_json(file, _JsonObjectStream(sections(self.get_usage_report())), compact=indexed)
+            logger.info(f"JSON报告已成功写入: {json_output_path}")
+        except Exception as e:
+            logger.error(f"无法写入JSON报告文件: {json_output_path}, 错误: {e}")
+            logger.error(f"错误详情: {traceback.format_exc()}")
+    
+    def generate_ndjson_report(self) -> None:
+        """
+        生成NDJSON格式的报告，每行一条记录，便于下游工具流式处理
+        
+        记录类型：
+        - summary: 统计信息（第一行）
+        - definition: 每个ID定义 {id, name, file}
+        - conflict: 每个冲突ID {id, definitions: [{name, file}, ...]}
+        - violation: 每个保留范围违规 {range, id, name, file}
+        - undefined_reference: 每个引用了未定义名称的位置 {name, file, line}
+        - unused: 每个从未被引用的定义 {id, name, file}
+        - profile: 性能分析数据（仅在启用性能分析时输出，最后一行）
+        """
+        ndjson_output_path = os.path.join(self.project_root, self.config["ndjson_output_path"])
+        os.makedirs(os.path.dirname(ndjson_output_path), exist_ok=True)
+        
+        def dumps(record):
+            return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        
+        try:
+            usage_report = self.get_usage_report()
+            with open(ndjson_output_path, 'w', encoding='utf-8', newline='',
+                      buffering=REPORT_BUFFER_SIZE) as file:
+                file.write(dumps({
+                    "type": "summary",
+                    "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    "total_files": len(self.file_index),
+                    "total_ids": len(self.discovered_ids),
+                    "conflict_count": len(self.conflicts),
+                    "violation_count": sum(len(v) for v in self.reserved_violations.values()),
+                    "undefined_reference_count": len(usage_report["undefined"]),
+                    "unused_count": len(usage_report["unused"])
+                }) + '\n')
+                
+                for id_value in sorted(self.discovered_ids):
+                    for usage in self.discovered_ids[id_value]:
+                        file.write(dumps({"type": "definition", "id": id_value,
+                                          "name": usage.name, "file": usage.file}) + '\n')
+                
+                for id_value in sorted(self.conflicts):
+                    file.write(dumps({
+                        "type": "conflict",
+                        "id": id_value,
+                        "definitions": [{"name": u.name, "file": u.file} for u in self.conflicts[id_value]]
+                    }) + '\n')
+                
+                for range_name, violations in self.reserved_violations.items():
+                    for v in violations:
+                        file.write(dumps({"type": "violation", "range": range_name, "id": v.id,
+                                          "name": v.name, "file": v.file}) + '\n')
+                
+                for ref in usage_report["undefined"]:
+                    file.write(dumps({"type": "undefined_reference", "name": ref.name,
+                                      "file": ref.file, "line": ref.line}) + '\n')
+                
+                for item in usage_report["unused"]:
+                    file.write(dumps({"type": "unused", "id": item.id,
+                                      "name": item.name, "file": item.file}) + '\n')
+                
+                profile = self.get_profile_report()
+                if profile is not None:
+                    file.write(dumps(dict({"type": "profile"}, **profile)) + '\n')
+            logger.info(f"NDJSON报告已成功写入: {ndjson_output_path}")
+        except Exception as e:
+            logger.error(f"无法写入NDJSON报告文件: {ndjson_output_path}, 错误: {e}")
+            logger.error(f"错误详情: {traceback.format_exc()}")
+    
+    def get_definitions_digest(self) -> str:
+        """
+        所有定义的摘要，只与每个文件的定义有关，与扫描顺序和平台的路径分隔符无关
+        
+        Returns:
+            SHA-1摘要的十六进制字符串
+        """
+        digest = hashlib.sha1(f"netmsg lua registry {LUA_REGISTRY_VERSION}\n".encode('utf-8'))
+        for file_path in sorted(self.file_definitions):
+            definitions = self.file_definitions[file_path]
+            if definitions:
+                digest.update(file_path.replace(os.sep, '/').encode('utf-8') + b'\0')
+                digest.update(''.join(f"{name}={id_value};" for name, id_value in definitions).encode('utf-8'))
+                digest.update(b'\n')
+        return digest.hexdigest()
+    
+    def generate_lua_registry(self) -> Optional[str]:
+        """
+        生成Lua注册表模块：ID到名称的映射、每个模块的ID和分发表骨架
+        
+        定义的摘要写在文件头部，定义未变化时不重写文件，避免文件修改时间变化触发不必要的重新加载；
+        写入时先写临时文件再替换，游戏不会读到写了一半的模块。
+        
+        Returns:
+            模块的绝对路径，未配置lua_registry_path时返回None
+        """
+        if not self.config["lua_registry_path"]:
+            return None
+        
+        registry_path = os.path.join(self.project_root, self.config["lua_registry_path"])
+        digest = self.get_definitions_digest()
+        digest_line = f"-- * Digest: {digest}\n"
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as file:
+                header = [file.readline() for _ in range(LUA_REGISTRY_HEADER_LINES)]
+            if digest_line in header:
+                logger.debug(f"定义未变化，Lua注册表无需更新: {registry_path}")
+                return registry_path
+        except (OSError, ValueError):
+            pass
+        
+        temp_path = registry_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(registry_path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8', newline='', buffering=REPORT_BUFFER_SIZE) as file:
+                _write_lines(file, self._iter_lua_registry_lines(digest))
+            os.replace(temp_path, registry_path)
+            logger.info(f"Lua注册表已成功写入: {registry_path}")
+        except Exception as e:
+            logger.error(f"无法写入Lua注册表: {registry_path}, 错误: {e}")
+            logger.error(f"错误详情: {traceback.format_exc()}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+        return registry_path
+    
+    def _iter_lua_registry_lines(self, digest: str):
+        """逐行生成Lua注册表模块的内容"""
+        # 模块名与require的路径一致：相对于src目录，去掉扩展名，以.分隔
+        modules = []
+        for file_path in sorted(self.file_definitions):
+            definitions = self.file_definitions[file_path]
+            if definitions:
+                module = os.path.splitext(file_path)[0].replace(os.sep, '.')
+                if module.startswith("src."):
+                    module = module[len("src."):]
+                modules.append((_lua_string(module), file_path, definitions))
+        
+        yield "-- =================================================="
+        yield "-- * UniX SDK - NetMsg Registry"
+        yield "-- *"
+        yield "-- * 由 netmsg_conflict_checker.py 根据扫描结果自动生成，请勿手动修改"
+        yield f"-- * Digest: {digest}"
+        yield "-- =================================================="
+        yield ""
+        yield "---@class UDK.NetMsgRegistry"
+        yield "local NetMsgRegistry = {}"
+        yield ""
+        
+        yield "-- ID到名称的映射，存在冲突的ID取第一处定义"
+        yield "NetMsgRegistry.Names = {"
+        conflicts = self.conflicts
+        for id_value in sorted(self.discovered_ids):
+            name, file_path = self.registry.first_definition(id_value)
+            line = f"    [{id_value}] = {_lua_string(name)},"
+            if id_value in conflicts:
+                others = conflicts[id_value][1:]
+                line += " -- 冲突: " + ", ".join(f"{d.name} ({d.file})" for d in others)
+            yield line
+        yield "}"
+        yield ""
+        
+        yield "-- 每个模块（定义所在的文件）的ID {模块 = {名称 = ID}}"
+        yield "NetMsgRegistry.Modules = {"
+        for module, file_path, definitions in modules:
+            yield f"    [{module}] = {{ -- {file_path}"
+            # 同一文件中重复定义的名称以最后一处为准，与Lua中后赋值的结果一致
+            for name, id_value in dict(definitions).items():
+                yield f"        {name} = {id_value},"
+            yield "    },"
+        yield "}"
+        yield ""
+        
+        yield "-- 每个模块的分发表骨架 {模块 = {[ID] = false}}，包含模块的全部ID，由CreateDispatcher复制后填入处理函数"
+        yield "NetMsgRegistry.Dispatch = {"
+        for module, file_path, definitions in modules:
+            yield f"    [{module}] = {{"
+            for id_value, name in sorted({id_value: name for name, id_value in definitions}.items()):
+                yield f"        [{id_value}] = false, -- {name}"
+            yield "    },"
+        yield "}"
+        
+        yield from _LUA_REGISTRY_FOOTER
+
+
+class BatchResult(NamedTuple):
+    """多项目批量检查结果"""
+    results: Dict[str, CheckResult]     # {项目根目录: 检查结果}，按输入顺序排列
+    summary: Dict[str, Any]             # 跨项目汇总，参见BatchChecker.get_summary
+    
+    @property
+    def ok(self) -> bool:
+        """所有项目都没有ID冲突和保留范围违规"""
+        return all(result.ok for result in self.results.values())
+
+
+class BatchChecker:
+    """
+    多项目批量检查
+    
+    所有项目的待解析文件共用一个进程池。内容相同的文件（如共同引用的UniX-SDK，无论位于哪个项目的哪个路径）
+    只完整解析一次，其余副本只读取并比较内容哈希，哈希一致时直接复用解析结果。
+    每个项目仍然使用自己的解析缓存和报告路径。
+    """
+    
+    def __init__(self, project_roots: List[str], config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            project_roots: 项目根目录列表
+            config: 覆盖每个项目检测器配置的键值
+        """
+        self.checkers = []
+        for project_root in project_roots:
+            checker = NetMsgConflictChecker(project_root)
+            _apply_config(checker, config or {})
+            self.checkers.append(checker)
+        
+        # 本次运行的解析统计
+        self.stats = {"parsed_files": 0, "reused_files": 0}
+    
+    def check(self, write_reports: bool = False) -> BatchResult:
+        """
+        检查所有项目
+        
+        Args:
+            write_reports: 是否写入每个项目的报告
+            
+        Returns:
+            批量检查结果
+        """
+        plans = []
+        for checker in self.checkers:
+            checker.reset()
+            checker.file_index = checker.discover_files()
+            plans.append(checker.plan_parse_tasks(checker.file_index))
+        
+        # 所有项目的解析任务合并后按内容去重，相同的文件（包括不同项目、不同路径下的副本）只完整解析一次；
+        # 与某个项目中命中缓存的文件大小和内容哈希都相同的文件，直接复用缓存的结果
+        all_tasks = []
+        all_sizes = []
+        known_entries = []
+        for checker, (_, entries, tasks) in zip(self.checkers, plans):
+            sizes = {entry.path: entry.size for entry in checker.file_index}
+            all_tasks.extend(tasks)
+            all_sizes.extend(sizes[task[1]] for task in tasks)
+            known_entries.extend(entries.values())
+        
+        jobs = max((checker.config["jobs"] for checker in self.checkers), default=1)
+        with self._create_executor(jobs, len(all_tasks)) as executor:
+            all_results, reused = run_deduplicated_parse_tasks(all_tasks, all_sizes, known_entries, jobs, executor)
+        self.stats["reused_files"] = reused
+        self.stats["parsed_files"] = len(all_tasks) - reused
+        
+        results = []
+        position = 0
+        for _, _, tasks in plans:
+            results.append(all_results[position:position + len(tasks)])
+            position += len(tasks)
+        
+        check_results = {}
+        for checker, (cache, entries, tasks), task_results in zip(self.checkers, plans, results):
+            parsed = checker.merge_parse_results(cache, entries, tasks, task_results)
+            check_results[checker.project_root] = checker.finish_check(parsed, write_reports)
+        
+        return BatchResult(check_results, self.get_summary(check_results))
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def _create_executor(jobs: int, task_count: int):
+        """创建所有项目共用的进程池，单进程或无法创建时返回None"""
+        jobs = min(jobs or os.cpu_count() or 1, task_count)
+        if jobs <= 1:
+            yield None
+            return
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"警告: 无法启动进程池 ({e})，改为单进程解析")
+            yield None
+            return
+        with executor:
+            yield executor
+    
+    def get_summary(self, results: Dict[str, CheckResult]) -> Dict[str, Any]:
+        """
+        汇总所有项目的检查结果
+        
+        Returns:
+            {"timestamp", "projects": [每个项目的统计], "totals": 汇总统计,
+             "shared_conflicts": [{id, projects}]（在多个项目中都冲突的ID）}
+        """
+        projects = []
+        conflict_projects = defaultdict(list)
+        for project_root, result in results.items():
+            projects.append({
+                "project_root": project_root,
+                "files": result.file_count,
+                "total_ids": len(result.discovered_ids),
+                "conflict_count": len(result.conflicts),
+                "violation_count": result.violation_count,
+                "undefined_reference_count": len(result.undefined_references),
+                "unused_count": len(result.unused_definitions)
+            })
+            for id_value in result.conflicts:
+                conflict_projects[id_value].append(project_root)
+        
+        totals = {"projects": len(projects)}
+        for key in ("files", "total_ids", "conflict_count", "violation_count",
+                    "undefined_reference_count", "unused_count"):
+            totals[key] = sum(project[key] for project in projects)
+        totals["failed_projects"] = sum(1 for result in results.values() if not result.ok)
+        totals["parsed_files"] = self.stats["parsed_files"]
+        totals["reused_files"] = self.stats["reused_files"]
+        
+        return {
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "projects": projects,
+            "totals": totals,
+            "shared_conflicts": [
+                {"id": id_value, "projects": roots}
+                for id_value, roots in sorted(conflict_projects.items())
+                if len(roots) > 1
+            ]
+        }
+
+
+def _write_lines(file, lines) -> None:
+    """逐行写入文本，行之间以换行符分隔，末尾不追加换行符"""
+    first = True
+    for line in lines:
+        if not first:
+            file.write('\n')
+        file.write(line)
+        first = False
+
+
+# 流式写入JSON数组时每批编码的元素数量
+JSON_ARRAY_BATCH_SIZE = 1024
+
+# 报告使用的JSON编码器，复用同一个实例，避免逐条写入时重复创建
+_INDENTED_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+_COMPACT_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+# 生成的Lua注册表的格式版本，格式变化时递增，摘要随之变化，已生成的文件会被重写
+LUA_REGISTRY_VERSION = 1
+
+# Lua注册表文件头的行数，摘要写在其中
+LUA_REGISTRY_HEADER_LINES = 6
+
+# Lua注册表中固定的分发函数部分
+_LUA_REGISTRY_FOOTER = (
+    "",
+    "---|📘- 创建模块的消息分发函数，按ID直接查表，代替逐个比较ID的if-elseif链",
+    "---",
+    "---| `示例`：`local dispatcher = NetMsgRegistry.CreateDispatcher(\"Public.UniX-SDK.utils.udk_storage\", { ClientUpload = handleClientUpload })`",
+    "---@param module string 模块名（require的路径）",
+    "---@param handlers table<string, function> {名称 = 处理函数}，处理函数的参数为 (msg, playerId, msgId)",
+    "---@return function dispatcher 分发函数 function(msgId, msg, playerId)，可直接传给System:BindNotify",
+    "function NetMsgRegistry.CreateDispatcher(module, handlers)",
+    "    local ids = NetMsgRegistry.Modules[module]",
+    "    if ids == nil then",
+    "        error(\"[UDK:NetMsgRegistry] Unknown module: \" .. tostring(module))",
+    "    end",
+    "    -- 复制骨架，分发表一次性包含模块的全部ID",
+    "    local dispatch = {}",
+    "    for id, handler in pairs(NetMsgRegistry.Dispatch[module]) do",
+    "        dispatch[id] = handler",
+    "    end",
+    "    for name, handler in pairs(handlers) do",
+    "        local id = ids[name]",
+    "        if id == nil then",
+    "            error(\"[UDK:NetMsgRegistry] Unknown message \" .. tostring(name) .. \" in module \" .. module)",
+    "        end",
+    "        dispatch[id] = handler",
+    "    end",
+    "    return function(msgId, msg, playerId)",
+    "        local handler = dispatch[msgId]",
+    "        if handler then",
+    "            return handler(msg, playerId, msgId)",
+    "        end",
+    "    end",
+    "end",
+    "",
+    "return NetMsgRegistry",
+    ""
+)
+
+
+def _lua_string(value: str) -> str:
+    """转换为Lua的双引号字符串字面量"""
+    return '"' + re.sub(r'[\\"\x00-\x1f\x7f]', lambda m: '\\%03d' % ord(m.group()), value) + '"'
+
+
+class _JsonObjectStream(NamedTuple):
+    """由_write_json逐个写入的JSON对象"""
+    items: Iterable[Tuple[str, Any]]  # (键, 值)迭代器
+
+
+def _write_json(file, value, indent: str = '', compact: bool = False) -> None:
+    """
+    流式写入JSON值，不需要先在内存中构造完整的数据结构
+    
+    值为_JsonObjectStream时逐个写入键值对，为生成器时分批写入数组元素（元素本身直接序列化），
+    其余值直接序列化。输出格式与json.dump(..., ensure_ascii=False, indent=2)完全一致，
+    compact为True时与json.dump(..., ensure_ascii=False, separators=(',', ':'))一致。
+    
+    Args:
+        file: 输出文件
+        value: 要写入的值
+        indent: 当前所在行的缩进
+        compact: 是否使用不带空白的紧凑格式
+    """
+    if isinstance(value, types.GeneratorType):
+        # 每批元素一起编码，减少调用编码器的次数，内存中只保留一批元素
+        first = True
+        while True:
+            batch = list(itertools.islice(value, JSON_ARRAY_BATCH_SIZE))
+            if not batch:
+                break
+            if compact:
+                file.write(('[' if first else ',') + _COMPACT_JSON_ENCODER.encode(batch)[1:-1])
+            else:
+                # 去掉外层的"[\n"和"\n]"，只保留逐行缩进的元素
+                text = _INDENTED_JSON_ENCODER.encode(batch)[2:-2].replace('\n', '\n' + indent)
+                file.write(('[\n' if first else ',\n') + indent + text)
+            first = False
+        file.write('[]' if first else (']' if compact else '\n' + indent + ']'))
+        return
+    
+    if not isinstance(value, _JsonObjectStream):
+        if compact:
+            file.write(_COMPACT_JSON_ENCODER.encode(value))
+        else:
+            file.write(_INDENTED_JSON_ENCODER.encode(value).replace('\n', '\n' + indent))
+        return
+    
+    inner = indent + '  '
+    first = True
+    for key, item in value.items:
+        if compact:
+            file.write('{' if first else ',')
+        else:
+            file.write(('{\n' if first else ',\n') + inner)
+        file.write(json.dumps(key, ensure_ascii=False) + (':' if compact else ': '))
+        _write_json(file, item, inner, compact)
+        first = False
+    if first:
+        file.write('{}')
+    else:
+        file.write('}' if compact else '\n' + indent + '}')
+
+
+class _InotifyWatcher:
+    """基于Linux inotify的文件变化监视器（通过ctypes调用libc，无需额外依赖）"""
+    
+    name = "inotify"
+    
+    # 通过事件得知变化，无需遍历目录
+    event_driven = True
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    
+    # 事件头：wd, mask, cookie, len
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    # 收到事件后继续等待的时间（秒），合并编辑器保存时产生的一连串事件
+    DEBOUNCE = 0.02
+    
+    def __init__(self, checker: NetMsgConflictChecker):
+        import ctypes
+        import ctypes.util
         
-        # 正则表达式模式 - 使用非贪婪匹配和限制重复次数，防止灾难性回溯
-        self.patterns = [
-            r'\.NetMsg\s*?=\s*?{([^}]{1,10000})}',      # 标准定义模式，限制内容大小
-            r'\.NetMsg\.(\w{1,100})\s*?=\s*?(\d{1,20})', # 单行定义模式，限制标识符和数字长度
-            r'NetMsg\s*?=\s*?{([^}]{1,10000})}',        # 局部变量定义模式，限制内容大小
-            r'local\s+NetMsg\s*?=\s*?{([^}]{1,10000})}'  # 完整局部变量定义，限制内容大小
-        ]
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
         
-        # 键值对模式 - 同样限制标识符和数字长度
-        self.key_value_pattern = re.compile(r'(\w{1,100})\s*?=\s*?(\d{1,20})')
+        self._checker = checker
+        self._watches = {}  # {wd: 目录绝对路径}
+        self.sync(checker.scanned_dirs)
     
-    def scan_directory(self, dir_path: str) -> List[str]:
+    def sync(self, directories: List[str]) -> None:
+        """为尚未监视的目录添加监视"""
+        watched = set(self._watches.values())
+        for directory in directories:
+            if directory not in watched:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+                if wd >= 0:
+                    self._watches[wd] = directory
+    
+    def poll(self, timeout: float) -> Optional[Set[str]]:
         """
-        递归扫描目录中的所有文件
+        等待文件变化事件
         
         Args:
-            dir_path: 要扫描的目录路径
+            timeout: 最长等待时间（秒）
             
         Returns:
-            符合条件的文件路径列表
+            变化的文件或目录路径集合（相对于项目根目录）；事件队列溢出时返回None
         """
-        result = []
-        # 确保路径分隔符正确
-        dir_path = dir_path.replace('/', os.sep)
-        abs_dir_path = os.path.join(self.project_root, dir_path)
-        
-        if not os.path.exists(abs_dir_path):
-            print(f"警告: 目录不存在: {abs_dir_path}")
-            return result
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return set()
         
-        print(f"正在扫描目录: {dir_path}")
-        
-        for root, _, files in os.walk(abs_dir_path):
-            for file in files:
-                # 检查文件扩展名
-                if any(file.endswith(ext) for ext in self.config["file_extensions"]):
-                    # 获取相对于项目根目录的路径
-                    rel_path = os.path.relpath(os.path.join(root, file), self.project_root)
-                    # 统一使用系统路径分隔符
-                    rel_path = rel_path.replace('\\', os.sep)
-                    result.append(rel_path)
-        
-        return result
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                if select.select([self._fd], [], [], self.DEBOUNCE)[0]:
+                    continue
+                return changed
+            
+            if not self._parse_events(data, changed):
+                return None
     
-    def parse_file(self, file_path: str) -> None:
-        """
-        解析文件中的NetMsg ID定义
-        
-        Args:
-            file_path: 文件路径（相对于项目根目录）
-        """
-        abs_path = os.path.join(self.project_root, file_path)
-        
-        # 检查文件是否存在
-        if not os.path.exists(abs_path):
-            print(f"错误: 文件不存在: {abs_path}")
-            return
+    def _parse_events(self, data: bytes, changed: Set[str]) -> bool:
+        """解析一批inotify事件，返回False表示事件队列已溢出"""
+        header_size = self.EVENT_HEADER.size
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + name_len].rstrip(b'\0')
+            offset += header_size + name_len
             
-        # 检查文件大小，避免处理过大的文件
-        try:
-            file_size = os.path.getsize(abs_path)
-            if file_size > 10 * 1024 * 1024:  # 10MB
-                print(f"警告: 文件过大 ({file_size / 1024 / 1024:.2f} MB)，跳过: {file_path}")
-                return
-        except OSError as e:
-            print(f"无法获取文件大小: {abs_path}, 错误: {e}")
-            return
-        
-        try:
-            # 尝试多种编码方式打开文件
-            encodings = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312', 'latin1']
-            content = None
+            if mask & self.IN_Q_OVERFLOW:
+                return False
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
             
-            for encoding in encodings:
-                try:
-                    with codecs.open(abs_path, 'r', encoding=encoding) as file:
-                        # 限制读取大小，避免内存问题
-                        content = file.read(5 * 1024 * 1024)  # 最多读取5MB
-                    print(f"成功使用 {encoding} 编码打开文件: {file_path}")
-                    break
-                except UnicodeDecodeError:
-                    continue
-                except MemoryError:
-                    print(f"内存不足，无法处理文件: {file_path}")
-                    return
-                except Exception as e:
-                    print(f"尝试使用 {encoding} 编码打开文件时出错: {e}")
-                    continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            abs_path = os.path.join(directory, os.fsdecode(name))
+            rel_path = os.path.relpath(abs_path, self._checker.project_root)
             
-            if content is None:
-                print(f"无法使用任何编码打开文件: {abs_path}")
-                return
-        except Exception as e:
-            print(f"无法打开文件: {abs_path}, 错误: {e}")
-            return
-        
-        # 使用所有模式查找NetMsg定义
-        for pattern in self.patterns:
-            for match in re.finditer(pattern, content):
-                if len(match.groups()) == 1:
-                    # 处理块定义 (如 NetMsg = {...})
-                    block = match.group(1)
-                    self.process_netmsg_block(block, file_path)
-                elif len(match.groups()) == 2:
-                    # 处理单行定义 (如 NetMsg.Key = Value)
-                    key, value = match.groups()
-                    try:
-                        id_value = int(value)
-                        self.register_netmsg_id(key, id_value, file_path)
-                    except ValueError:
-                        pass
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                # 新目录：匹配忽略规则时不监视，否则监视该目录并收录其中已有的文件
+                ignore_match = self._checker._compile_ignore_patterns()
+                if self._checker._is_ignored(rel_path, ignore_match):
+                    continue
+                changed.add(rel_path)
+                directories = []
+                found = self._checker._walk_directory(abs_path, ignore_match, set(), set(), directories)
+                self.sync(directories)
+                changed.update(entry.path for entry in found)
+            else:
+                changed.add(rel_path)
+        return True
+    
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """定期比较文件状态的文件变化监视器，在inotify不可用时使用"""
+    
+    name = "轮询"
+    
+    # 每次都要遍历扫描目录比较文件状态
+    event_driven = False
+    
+    def __init__(self, checker: NetMsgConflictChecker):
+        self._checker = checker
+    
+    def sync(self, directories: List[str]) -> None:
+        pass
+    
+    def poll(self, timeout: float) -> Optional[Set[str]]:
+        time.sleep(timeout)
+        return self._checker._diff_file_index()
     
-    def process_netmsg_block(self, block: str, file_path: str) -> None:
+    def close(self) -> None:
+        pass
+
+
+def _create_file_watcher(checker: NetMsgConflictChecker):
+    """创建文件变化监视器，优先使用inotify，不可用时回退到轮询"""
+    if sys.platform.startswith('linux'):
+        try:
+            return _InotifyWatcher(checker)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"警告: 无法使用inotify ({e})，改为轮询文件状态")
+    return _PollingWatcher(checker)
+
+
+class NetMsgQueryServer:
+    """
+    常驻内存的NetMsg ID查询服务（JSON-RPC 2.0，每行一条消息）
+    
+    启动时完成一次完整检查，之后索引常驻内存。每次处理请求前只重新解析文件状态发生变化的文件
+    （inotify可用时直接使用文件变化事件，否则按刷新间隔比较文件状态），查询只访问内存中的索引。
+    """
+    
+    # JSON-RPC错误码
+    PARSE_ERROR = -32700
+    INVALID_REQUEST = -32600
+    METHOD_NOT_FOUND = -32601
+    INVALID_PARAMS = -32602
+    INTERNAL_ERROR = -32603
+    
+    def __init__(self, checker: NetMsgConflictChecker, refresh_interval: float = 1.0):
         """
-        处理NetMsg定义块
-        
         Args:
-            block: NetMsg定义块内容
-            file_path: 文件路径
+            checker: 检测器
+            refresh_interval: 轮询模式下两次比较文件状态的最短间隔（秒）
         """
-        # 查找形如 Key = Value 的定义
-        for match in self.key_value_pattern.finditer(block):
-            key, value = match.groups()
-            try:
-                id_value = int(value)
-                self.register_netmsg_id(key, id_value, file_path)
-            except ValueError:
-                pass
+        self.checker = checker
+        self.refresh_interval = refresh_interval
+        self.watcher = None
+        self.running = False
+        self._lock = threading.Lock()  # 套接字模式下多个连接的请求依次处理
+        self._last_refresh = 0.0
+        self._methods = {
+            "status": self.status,
+            "is_free": self.is_free,
+            "who_defines": self.who_defines,
+            "file_ids": self.file_ids,
+            "conflicts": self.list_conflicts,
+            "allocate": self.allocate,
+            "refresh": self.force_refresh,
+            "shutdown": self.shutdown
+        }
     
-    def register_netmsg_id(self, name: str, id_value: int, file_path: str) -> None:
+    def start(self) -> None:
+        """完成初始检查并开始监视文件变化"""
+        start = time.perf_counter()
+        self.checker.check()
+        self.checker.registry.build_name_index()
+        self.watcher = _create_file_watcher(self.checker)
+        self._last_refresh = time.monotonic()
+        self.running = True
+        logger.info(f"索引已建立: {len(self.checker.file_index)} 个文件，{len(self.checker.discovered_ids)} 个ID "
+                    f"(耗时 {time.perf_counter() - start:.2f} 秒，监视模式: {self.watcher.name})")
+    
+    def close(self) -> None:
+        """停止监视，启用缓存时保存解析缓存"""
+        self.running = False
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+            if self.checker.config["use_cache"]:
+                self.checker.save_cache(self.checker.cache_entries)
+    
+    def refresh(self, force: bool = False) -> int:
         """
-        注册发现的NetMsg ID
+        重新解析文件状态发生变化的文件
         
         Args:
-            name: ID名称
-            id_value: ID值
-            file_path: 文件路径
+            force: 是否忽略轮询模式的刷新间隔
+            
+        Returns:
+            定义发生变化或被删除的文件数量
         """
-        if id_value not in self.discovered_ids:
-            self.discovered_ids[id_value] = []
-        
-        # 检查是否已经存在相同的定义（相同名称和文件）
-        for existing in self.discovered_ids[id_value]:
-            if existing["name"] == name and existing["file"] == file_path:
-                # 已经存在相同的定义，不重复添加
-                return
-        
-        # 添加新的定义
-        self.discovered_ids[id_value].append({
-            "name": name,
-            "file": file_path
-        })
-        
-        # 检查是否存在真正的冲突（不同名称或不同文件）
-        if len(self.discovered_ids[id_value]) > 1:
-            # 检查是否有不同的名称或文件
-            names_files = set((item["name"], item["file"]) for item in self.discovered_ids[id_value])
-            if len(names_files) > 1:
-                # 真正的冲突：不同名称或不同文件
-                self.conflicts[id_value] = self.discovered_ids[id_value]
+        now = time.monotonic()
+        if not self.watcher.event_driven and not force and now - self._last_refresh < self.refresh_interval:
+            return 0
+        self._last_refresh = now
         
-        # 检查是否违反保留范围
-        self.check_reserved_violation(name, id_value, file_path)
+        changed = self.watcher.poll(0)
+        if changed is None:
+            # 事件丢失（如inotify队列溢出），通过比较文件状态找出变化的文件
+            changed = self.checker._diff_file_index()
+            self.watcher.sync(self.checker.scanned_dirs)
+        if not changed:
+            return 0
+        
+        updated = self.checker.apply_file_changes(changed)
+        if updated:
+            logger.info(f"[{datetime.now().strftime('%H:%M:%S')}] 更新 {updated} 个文件")
+        return updated
     
-    def check_reserved_violation(self, name: str, id_value: int, file_path: str) -> None:
+    def handle_line(self, line: bytes) -> Optional[bytes]:
         """
-        检查是否违反保留范围
+        处理一行请求（单个请求或批量请求）
         
-        Args:
-            name: ID名称
-            id_value: ID值
-            file_path: 文件路径
+        Returns:
+            编码后的响应（含换行符），请求全部为通知时返回None
         """
-        for range_info in self.config["reserved_ranges"]:
-            if range_info["min"] <= id_value <= range_info["max"]:
-                # 检查是否是SDK自己的ID（通过文件路径判断）
-                is_sdk = "UniX-SDK" in file_path
-                
-                if not is_sdk:
-                    self.reserved_violations[range_info["name"]].append({
-                        "name": name,
-                        "id": id_value,
-                        "file": file_path
-                    })
-    
-    def run(self) -> None:
-        """运行检查"""
         try:
-            print("开始检查NetMsg ID冲突...")
-            
-            # 初始化数据结构
-            self.discovered_ids = {}
-            self.conflicts = {}
-            self.reserved_violations = defaultdict(list)
-            
-            # 扫描所有配置的目录
-            for dir_path in self.config["scan_dirs"]:
-                print(f"扫描目录: {dir_path}")
-                files = self.scan_directory(dir_path)
-                
-                if not files:
-                    print(f"警告: 在目录 {dir_path} 中未找到任何 {', '.join(self.config['file_extensions'])} 文件")
-                    continue
-                
-                print(f"在 {dir_path} 中找到 {len(files)} 个文件")
-                
-                for file_path in files:
-                    self.parse_file(file_path)
-            
-            # 生成报告
-            self.generate_report()
-            
-            # 输出统计信息
-            print(f"\n检查完成! 统计信息:")
-            print(f"- 发现的NetMsg ID总数: {len(self.discovered_ids)}")
-            
-            # 计算真正的冲突数量
-            real_conflict_count = len(self.conflicts)
-            if real_conflict_count > 0:
-                print(f"- 冲突的ID数量: {real_conflict_count} (不同名称或不同文件的相同ID)")
-            else:
-                print(f"- 冲突的ID数量: {real_conflict_count}")
-                
-            # 违反保留范围的ID
-            violation_count = sum(len(v) for v in self.reserved_violations.values())
-            print(f"- 违反保留范围的ID数量: {violation_count}")
-            
-        except Exception as e:
-            print(f"运行过程中发生错误: {e}")
-            print(f"错误详情: {traceback.format_exc()}")
-        
-        # 生成JSON报告
-        self.generate_json_report()
-        
-        print(f"检查完成，报告已生成: {os.path.join(self.project_root, self.config['output_path'])}")
-        print(f"JSON报告已生成: {os.path.join(self.project_root, self.config['json_output_path'])}")
-    
-    def generate_report(self) -> None:
-        """生成报告"""
-        # 统计信息
-        total_files = sum(len(self.scan_directory(dir_path)) for dir_path in self.config["scan_dirs"])
-        
-        report = [
-            "============================================",
-            "  UniX SDK - NetMsg ID 冲突检测报告",
-            "============================================",
-            "",
-            f"检测时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"扫描文件总数: {total_files}",
-            f"发现的NetMsg ID总数: {len(self.discovered_ids)}",
-            f"冲突的ID数量: {len(self.conflicts)}",
-            f"违反保留范围的ID数量: {sum(len(v) for v in self.reserved_violations.values())}",
-            "",
-            "1. ID冲突情况",
-            "--------------------------------------------"
-        ]
+            message = json.loads(line)
+        except ValueError as e:
+            return self._encode(self._error(None, self.PARSE_ERROR, f"无法解析JSON: {e}"))
         
-        # 添加冲突信息
-        if self.conflicts:
-            report.append(f"发现 {len(self.conflicts)} 个ID冲突:")
-            for id_value, usages in sorted(self.conflicts.items()):
-                # 获取不同的名称和文件组合
-                names_files = set((item["name"], item["file"]) for item in usages)
-                report.append(f"\nID: {id_value} 存在 {len(names_files)} 处不同定义:")
-                
-                # 按文件分组显示
-                files_dict = {}
-                for usage in usages:
-                    if usage["file"] not in files_dict:
-                        files_dict[usage["file"]] = []
-                    if usage["name"] not in files_dict[usage["file"]]:
-                        files_dict[usage["file"]].append(usage["name"])
-                
-                # 显示每个文件中的定义
-                for file_path, names in sorted(files_dict.items()):
-                    if len(names) == 1:
-                        report.append(f"  - {names[0]} ({file_path})")
-                    else:
-                        report.append(f"  - 文件 {file_path} 中有多个定义:")
-                        for name in sorted(names):
-                            report.append(f"    * {name}")
-        else:
-            report.append("未发现ID冲突。")
+        with self._lock:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"警告: 刷新索引失败: {e}")
             
-        report.append("")
-        report.append("2. 保留范围违规情况")
-        report.append("--------------------------------------------")
+            if not isinstance(message, list):
+                return self._encode(self._handle_message(message))
+            if not message:
+                return self._encode(self._error(None, self.INVALID_REQUEST, "批量请求不能为空"))
+            responses = [response for response in map(self._handle_message, message) if response is not None]
+            return self._encode(responses) if responses else None
+    
+    def _handle_message(self, message: Any) -> Optional[Dict[str, Any]]:
+        """处理单个请求，通知（没有id的请求）不返回响应"""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" \
+                or not isinstance(message.get("method"), str):
+            request_id = message.get("id") if isinstance(message, dict) else None
+            return self._error(request_id, self.INVALID_REQUEST, "无效的JSON-RPC请求")
         
-        if self.reserved_violations:
-            for range_name, violations in self.reserved_violations.items():
-                report.append(f"\n范围 \"{range_name}\" 中发现 {len(violations)} 个非授权使用:")
-                for v in violations:
-                    report.append(f"  - {v['name']} = {v['id']} ({v['file']})")
+        request_id = message.get("id")
+        method = self._methods.get(message["method"])
+        params = message.get("params", {})
+        if method is None:
+            response = self._error(request_id, self.METHOD_NOT_FOUND, f"未知的方法: {message['method']}")
+        elif not isinstance(params, (dict, list)):
+            response = self._error(request_id, self.INVALID_PARAMS, "params必须是对象或数组")
         else:
-            report.append("未发现保留范围违规。")
-            
-        report.append("")
-        report.append("3. 所有发现的NetMsg ID (按ID排序)")
-        report.append("--------------------------------------------")
+            try:
+                signature = inspect.signature(method)
+                bound = signature.bind(*params) if isinstance(params, list) else signature.bind(**params)
+            except TypeError as e:
+                response = self._error(request_id, self.INVALID_PARAMS, f"参数错误: {e}")
+            else:
+                try:
+                    response = {"jsonrpc": "2.0", "id": request_id, "result": method(*bound.args, **bound.kwargs)}
+                except ValueError as e:
+                    response = self._error(request_id, self.INVALID_PARAMS, str(e))
+                except Exception as e:
+                    logger.error(f"处理请求 {message['method']} 时发生错误: {e}")
+                    logger.debug(traceback.format_exc())
+                    response = self._error(request_id, self.INTERNAL_ERROR, str(e))
         
-        # 按ID排序
-        for id_value in sorted(self.discovered_ids.keys()):
-            usage = self.discovered_ids[id_value][0]  # 取第一个使用情况
-            report.append(f"{id_value}: {usage['name']} ({usage['file']})")
-            
-        # 添加按名称排序的索引
-        report.append("")
-        report.append("4. 所有发现的NetMsg ID (按名称排序)")
-        report.append("--------------------------------------------")
+        return response if "id" in message else None
+    
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+    
+    @staticmethod
+    def _encode(response: Any) -> bytes:
+        return (_COMPACT_JSON_ENCODER.encode(response) + '\n').encode('utf-8')
+    
+    @staticmethod
+    def _definition_json(definition: NetMsgDefinition) -> Dict[str, Any]:
+        return {"name": definition.name, "id": definition.id, "file": definition.file}
+    
+    @staticmethod
+    def _require_int(name: str, value: Any) -> int:
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f"参数{name}必须是整数: {value!r}")
+        return value
+    
+    def status(self) -> Dict[str, Any]:
+        """索引的概况"""
+        checker = self.checker
+        usage = checker.get_usage_report()
+        return {
+            "project_root": checker.project_root,
+            "watcher": self.watcher.name,
+            "files": len(checker.file_index),
+            "total_ids": len(checker.discovered_ids),
+            "conflict_count": len(checker.conflicts),
+            "violation_count": sum(len(v) for v in checker.reserved_violations.values()),
+            "undefined_reference_count": len(usage["undefined"]),
+            "unused_count": len(usage["unused"])
+        }
+    
+    def is_free(self, id) -> Dict[str, Any]:
+        """ID是否未被使用，同时返回已有的定义和ID所在的保留范围"""
+        id_value = self._require_int("id", id)
+        definitions = self.checker.registry.get_definitions(id_value)
+        return {
+            "id": id_value,
+            "free": not definitions,
+            "definitions": [self._definition_json(d) for d in definitions],
+            "reserved_ranges": [r["name"] for r in self.checker.registry._range_index.lookup(id_value)]
+        }
+    
+    def who_defines(self, name) -> Dict[str, Any]:
+        """定义某个名称的所有位置"""
+        if not isinstance(name, str):
+            raise ValueError(f"参数name必须是字符串: {name!r}")
+        return {"name": name, "definitions": [self._definition_json(d) for d in self.checker.registry.find_name(name)]}
+    
+    def file_ids(self, file) -> Dict[str, Any]:
+        """某个文件定义的所有ID，文件可以是绝对路径或相对于项目根目录的路径"""
+        if not isinstance(file, str):
+            raise ValueError(f"参数file必须是字符串: {file!r}")
+        file_path = os.path.normpath(file)
+        if os.path.isabs(file_path):
+            file_path = os.path.relpath(file_path, self.checker.project_root)
+        definitions = self.checker.file_definitions.get(file_path, [])
+        return {"file": file_path, "definitions": [{"name": name, "id": id_value} for name, id_value in definitions]}
+    
+    def list_conflicts(self) -> Dict[str, Any]:
+        """所有冲突和保留范围违规"""
+        return {
+            "conflicts": [{"id": id_value, "definitions": [self._definition_json(d) for d in definitions]}
+                          for id_value, definitions in self.checker.conflicts.items()],
+            "reserved_violations": {range_name: [self._definition_json(d) for d in violations]
+                                    for range_name, violations in self.checker.reserved_violations.items()}
+        }
+    
+    def allocate(self, count, range=None) -> Dict[str, Any]:
+        """分配空闲ID（只计算，不会预留，写入文件后才视为已使用）"""
+        self._require_int("count", count)
+        if range is not None and not isinstance(range, str):
+            if not (isinstance(range, list) and len(range) == 2):
+                raise ValueError(f"参数range必须是字符串或[min, max]: {range!r}")
+            range = (self._require_int("range", range[0]), self._require_int("range", range[1]))
+        return {"ids": self.checker.allocate_ids(count, range)}
+    
+    def force_refresh(self) -> Dict[str, Any]:
+        """立即比较文件状态并更新索引"""
+        return {"updated": self.refresh(force=True)}
+    
+    def shutdown(self) -> Dict[str, Any]:
+        """处理完当前请求后停止服务"""
+        self.running = False
+        return {}
+    
+    def serve_stdio(self, stdin=None, stdout=None) -> None:
+        """从标准输入逐行读取请求，响应写入标准输出"""
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        for line in iter(stdin.readline, b''):
+            if not line.strip():
+                continue
+            response = self.handle_line(line)
+            if response is not None:
+                stdout.write(response)
+                stdout.flush()
+            if not self.running:
+                break
+    
+    def serve_socket(self, address: str) -> None:
+        """
+        在本地套接字上提供服务，每个连接中逐行读取请求
         
-        # 按名称排序
-        sorted_by_name = sorted(
-            [(usage[0]['name'], id_value, usage[0]['file']) 
-             for id_value, usage in self.discovered_ids.items()],
-            key=lambda x: x[0].lower()
-        )
+        Args:
+            address: Unix套接字路径，或 [HOST:]PORT（TCP，默认只监听127.0.0.1）
+        """
+        query_server = self
         
-        for name, id_value, file_path in sorted_by_name:
-            report.append(f"{name}: {id_value} ({file_path})")
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in iter(self.rfile.readline, b''):
+                    if not line.strip():
+                        continue
+                    response = query_server.handle_line(line)
+                    if response is not None:
+                        self.wfile.write(response)
+                    if not query_server.running:
+                        # shutdown()会等待serve_forever退出，必须在其他线程中调用
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
         
-        # 写入报告文件
-        output_path = os.path.join(self.project_root, self.config["output_path"])
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        match = re.fullmatch(r'(?:(.+):)?(\d+)', address)
+        if match and os.sep not in address and '/' not in address:
+            server_class = type("ThreadingTCPServer", (socketserver.ThreadingTCPServer,),
+                                {"daemon_threads": True, "allow_reuse_address": True})
+            # 每个响应只写一次，关闭Nagle算法避免小包被延迟发送
+            tcp_handler = type("TcpHandler", (Handler,), {"disable_nagle_algorithm": True})
+            server = server_class((match.group(1) or "127.0.0.1", int(match.group(2))), tcp_handler)
+            unix_path = None
+        else:
+            if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+                raise ValueError(f"当前平台不支持Unix套接字，请使用 [HOST:]PORT: {address}")
+            unix_path = os.path.abspath(address)
+            if os.path.isfile(unix_path) or os.path.isdir(unix_path):
+                raise ValueError(f"套接字路径已存在且不是套接字: {unix_path}")
+            if os.path.exists(unix_path):
+                # 上次运行遗留的套接字文件
+                os.unlink(unix_path)
+            server_class = type("ThreadingUnixStreamServer", (socketserver.ThreadingUnixStreamServer,),
+                                {"daemon_threads": True})
+            server = server_class(unix_path, Handler)
         
         try:
-            # 使用codecs模块确保正确处理中文
-            with codecs.open(output_path, 'w', encoding='utf-8') as file:
-                file.write('\n'.join(report))
-            print(f"报告已成功写入: {output_path}")
-        except Exception as e:
-            print(f"无法写入报告文件: {output_path}, 错误: {e}")
-            print(f"错误详情: {traceback.format_exc()}")
-            # 打印到控制台
-            print('\n'.join(report))
+            logger.info(f"查询服务正在监听: {unix_path or '%s:%d' % server.server_address[:2]}")
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if unix_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(unix_path)
+
+
+def check_project(project_root: str, since: Optional[str] = None, staged: bool = False,
+                  write_reports: bool = False, **config) -> CheckResult:
+    """
+    检查项目并返回结构化结果，供构建脚本等在进程内调用
     
-    def generate_json_report(self) -> None:
-        """生成JSON格式的报告"""
-        # 处理冲突数据，确保JSON可序列化
-        conflicts_json = {}
-        for id_value, usages in self.conflicts.items():
-            conflicts_json[str(id_value)] = [
-                {"name": usage["name"], "file": usage["file"]} 
-                for usage in usages
-            ]
+    默认不输出到控制台，不写入报告和解析缓存。
+    
+    Args:
+        project_root: 项目根目录路径
+        since: 只重新解析相对于该git版本有变化的文件（需要解析缓存）
+        staged: 检查git暂存区的快照，暂存区中有变化的文件读取暂存区中的内容（需要解析缓存）
+        write_reports: 是否写入文本报告和机器可读报告
+        config: 覆盖检测器的配置项，例如 jobs=4, use_cache=True
         
-        # 处理发现的ID数据，确保JSON可序列化
-        discovered_json = {}
-        for id_value, usages in self.discovered_ids.items():
-            discovered_json[str(id_value)] = [
-                {"name": usage["name"], "file": usage["file"]} 
-                for usage in usages
-            ]
+    Returns:
+        检查结果
+    """
+    return _create_checker(project_root, config).check(since, staged, write_reports)
+
+
+def allocate_ids(project_root: str, count: int, id_range: Union[str, Tuple[int, int], None] = None,
+                 **config) -> List[int]:
+    """
+    检查项目并分配新的空闲ID，供构建脚本等在进程内调用
+    
+    默认不输出到控制台，不写入报告和解析缓存。
+    
+    Args:
+        project_root: 项目根目录路径
+        count: 需要的ID数量
+        id_range: 保留范围名称、"min-max"字符串或(min, max)元组，默认为配置的allocation_range
+        config: 覆盖检测器的配置项，例如 use_cache=True
         
-        # 处理违规数据
-        violations_json = {}
-        for range_name, violations in self.reserved_violations.items():
-            violations_json[range_name] = [
-                {"name": v["name"], "id": v["id"], "file": v["file"]}
-                for v in violations
-            ]
+    Returns:
+        分配的ID列表，优先返回连续的ID
+    """
+    checker = _create_checker(project_root, config)
+    checker.check()
+    return checker.allocate_ids(count, id_range)
+
+
+def check_projects(project_roots: List[str], write_reports: bool = False, **config) -> BatchResult:
+    """
+    批量检查多个项目，所有项目共用一个进程池，相同的文件只解析一次
+    
+    默认不输出到控制台，不写入报告和解析缓存。
+    
+    Args:
+        project_roots: 项目根目录列表
+        write_reports: 是否写入每个项目的报告
+        config: 覆盖检测器的配置项，例如 jobs=4, use_cache=True
         
-        report = {
-            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "conflicts": conflicts_json,
-            "reserved_violations": violations_json,
-            "discovered_ids": discovered_json,
-            "statistics": {
-                "total_ids": len(self.discovered_ids),
-                "conflict_count": len(self.conflicts),
-                "violation_count": sum(len(v) for v in self.reserved_violations.values())
-            }
-        }
+    Returns:
+        批量检查结果
+    """
+    return BatchChecker(project_roots, dict({"use_cache": False}, **config)).check(write_reports)
+
+
+def _create_checker(project_root: str, config: Dict[str, Any]) -> NetMsgConflictChecker:
+    """创建作为库使用的检测器，默认不使用解析缓存"""
+    checker = NetMsgConflictChecker(project_root)
+    checker.config["use_cache"] = False
+    _apply_config(checker, config)
+    return checker
+
+
+def _apply_config(checker: NetMsgConflictChecker, config: Dict[str, Any]) -> None:
+    """覆盖检测器的配置项，不允许未知的配置项"""
+    for key, value in config.items():
+        if key not in checker.config:
+            raise ValueError(f"未知的配置项: {key}")
+        checker.config[key] = value
+
+
+def read_manifest(manifest_path: str) -> List[str]:
+    """
+    读取批量检查的清单文件
+    
+    每行一个项目根目录，空行和#开头的行会被忽略，相对路径相对于清单文件所在目录。
+    
+    Args:
+        manifest_path: 清单文件路径
         
-        # 写入JSON报告文件
-        json_output_path = os.path.join(self.project_root, self.config["json_output_path"])
-        os.makedirs(os.path.dirname(json_output_path), exist_ok=True)
+    Returns:
+        项目根目录的绝对路径列表
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    project_roots = []
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                project_roots.append(os.path.normpath(os.path.join(base_dir, os.path.expanduser(line))))
+    return project_roots
+
+
+def batch_command(project_roots: List[str], args) -> int:
+    """
+    命令行的批量检查：写入每个项目的报告和跨项目的汇总报告
+    
+    Args:
+        project_roots: 项目根目录列表
+        args: 命令行参数
         
-        try:
-            with codecs.open(json_output_path, 'w', encoding='utf-8') as file:
-                json.dump(report, file, ensure_ascii=False, indent=2)
-            print(f"JSON报告已成功写入: {json_output_path}")
-        except Exception as e:
-            print(f"无法写入JSON报告文件: {json_output_path}, 错误: {e}")
-            print(f"错误详情: {traceback.format_exc()}")
+    Returns:
+        退出码
+    """
+    # 同一个项目只检查一次
+    project_roots = list(dict.fromkeys(os.path.abspath(root) for root in project_roots))
+    missing = [root for root in project_roots if not os.path.isdir(root)]
+    for root in missing:
+        logger.error(f"错误: 项目根目录不存在: {root}")
+    if missing or not project_roots:
+        return 1
+    
+    batch = BatchChecker(project_roots, {
+        "jobs": args.jobs,
+        "use_cache": not args.no_cache,
+        "report_format": args.format,
+        "json_layout": args.json_layout,
+        "ownership_path": args.ownership and os.path.abspath(args.ownership),
+        "lua_registry_path": args.lua_registry
+    })
+    for checker in batch.checkers:
+        checker.config["ignore_patterns"].extend(args.ignore)
+    
+    logger.info(f"开始批量检查 {len(project_roots)} 个项目的NetMsg ID冲突...")
+    start = time.perf_counter()
+    result = batch.check(write_reports=True)
+    summary = result.summary
+    
+    logger.info("\n各项目统计信息:")
+    for project in summary["projects"]:
+        logger.info(f"- {project['project_root']}: 文件 {project['files']}，ID {project['total_ids']}，"
+                    f"冲突 {project['conflict_count']}，违反保留范围 {project['violation_count']}，"
+                    f"未定义引用 {project['undefined_reference_count']}，未使用 {project['unused_count']}")
+    
+    totals = summary["totals"]
+    logger.info(f"\n批量检查完成! 共 {totals['projects']} 个项目，{totals['files']} 个文件 "
+                f"(耗时 {time.perf_counter() - start:.2f} 秒)")
+    logger.info(f"- 解析文件 {totals['parsed_files']} 个，复用内容相同文件的解析结果 {totals['reused_files']} 个")
+    logger.info(f"- 存在冲突或保留范围违规的项目: {totals['failed_projects']} 个")
+    logger.info(f"- 在多个项目中都冲突的ID: {len(summary['shared_conflicts'])} 个")
+    
+    summary_path = os.path.abspath(args.summary)
+    try:
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+        with open(summary_path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        logger.info(f"汇总报告已生成: {summary_path}")
+    except OSError as e:
+        logger.error(f"无法写入汇总报告: {summary_path}, 错误: {e}")
+        return 1
+    
+    if args.strict and not result.ok:
+        return 1
+    return 0
+
+
+def allocate_command(checker: NetMsgConflictChecker, count: int, id_range: Optional[str],
+                     since: Optional[str] = None, staged: bool = False) -> int:
+    """
+    命令行的--allocate：检查项目后将分配的ID逐行输出到标准输出
+    
+    Returns:
+        退出码
+    """
+    try:
+        checker.check(since, staged)
+        start = time.perf_counter()
+        ids = checker.allocate_ids(count, id_range)
+    except ValueError as e:
+        logger.error(f"错误: {e}")
+        return 1
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    contiguous = ids[-1] - ids[0] + 1 == len(ids)
+    min_id, max_id = checker.resolve_id_range(id_range)
+    logger.info(f"在范围 {min_id}-{max_id} 内分配了 {len(ids)} 个{'连续的' if contiguous else '不连续的'}ID "
+                f"(已使用 {len(checker.discovered_ids)} 个，耗时 {elapsed_ms:.1f} ms):")
+    flush_logging()
+    for id_value in ids:
+        print(id_value)
+    return 0
+
+
+def serve_command(checker: NetMsgConflictChecker, address: Optional[str], refresh_interval: float) -> int:
+    """
+    命令行的--serve：建立索引后持续响应查询，直到收到shutdown请求、输入结束或按下Ctrl+C
+    
+    Args:
+        checker: 检测器
+        address: 套接字地址，为None时使用标准输入输出
+        refresh_interval: 轮询模式下两次比较文件状态的最短间隔（秒）
+        
+    Returns:
+        退出码
+    """
+    server = NetMsgQueryServer(checker, refresh_interval)
+    try:
+        server.start()
+        if address is None:
+            logger.info("查询服务已就绪，从标准输入读取请求 (每行一条JSON-RPC消息)")
+            server.serve_stdio()
+        else:
+            server.serve_socket(address)
+    except KeyboardInterrupt:
+        logger.info("\n已停止查询服务")
+    except (OSError, ValueError) as e:
+        logger.error(f"错误: {e}")
+        return 1
+    finally:
+        server.close()
+    return 0
+
+
+def shard_command(checker: NetMsgConflictChecker, shard: int, shard_count: int) -> int:
+    """
+    命令行的--shard：解析属于该分片的文件并写入部分结果，冲突在合并时检测
+    
+    Returns:
+        退出码
+    """
+    start = time.perf_counter()
+    try:
+        entries = checker.check_shard(shard, shard_count)
+        partial_path = checker.write_partial_result(shard, shard_count, entries)
+    except (OSError, ValueError) as e:
+        logger.error(f"错误: {e}")
+        return 1
+    
+    definition_count = sum(len(entry["definitions"]) for entry in entries.values())
+    logger.info(f"分片 {shard}/{shard_count}: 解析了 {len(entries)} 个文件，{definition_count} 处定义 "
+                f"(耗时 {time.perf_counter() - start:.2f} 秒)")
+    logger.info(f"部分结果已写入: {partial_path}")
+    return 0
+
+
+def configure_logging(level: int = logging.INFO, buffered: bool = True, stream=None) -> None:
+    """
+    配置命令行输出，消息默认写入标准输出
+    
+    Args:
+        level: 输出的最低日志级别
+        buffered: 是否批量输出消息；警告及以上级别的消息仍会立即输出，保证输出顺序
+        stream: 输出流，默认为标准输出
+    """
+    for handler in list(logger.handlers):
+        if not isinstance(handler, logging.NullHandler):
+            logger.removeHandler(handler)
+            handler.close()
+    
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    if buffered:
+        handler = logging.handlers.MemoryHandler(LOG_BUFFER_CAPACITY, logging.WARNING, handler)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def flush_logging() -> None:
+    """输出所有缓冲的消息"""
+    for handler in logger.handlers:
+        handler.flush()
+
+
+def non_negative_int(value: str) -> int:
+    """命令行参数的类型：非负整数，负数或非整数时由argparse报告错误"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是整数: {value}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"不能为负数: {value}")
+    return number
 
 
 def main():
@@ -498,19 +4485,123 @@ def main():
     try:
         # 使用argparse处理命令行参数
         parser = argparse.ArgumentParser(description='UniX SDK - NetMsg ID 冲突检测工具')
-        parser.add_argument('project_root', nargs='?', default=os.getcwd(),
-                            help='项目根目录路径 (默认: 当前工作目录)')
-        parser.add_argument('--verbose', '-v', action='store_true',
-                            help='显示详细日志')
+        parser.add_argument('project_roots', nargs='*', metavar='project_root',
+                            help='项目根目录路径 (默认: 当前工作目录)；指定多个时批量检查')
+        verbosity = parser.add_mutually_exclusive_group()
+        verbosity.add_argument('--verbose', '-v', action='store_true',
+                               help='显示详细日志')
+        verbosity.add_argument('--quiet', '-q', action='store_true',
+                               help='只输出警告和错误')
         parser.add_argument('--output', '-o', 
                             help='指定输出报告路径')
+        parser.add_argument('--yes', '-y', action='store_true',
+                            help='未找到src目录时不询问，直接继续')
         parser.add_argument('--auto-detect', '-a', action='store_true',
                             help='自动检测项目根目录 (向上查找直到找到src目录)')
+        parser.add_argument('--jobs', '-j', type=non_negative_int, default=1,
+                            help='并行解析的进程数 (默认: 1，0表示使用全部CPU核心)')
+        parser.add_argument('--no-cache', action='store_true',
+                            help='不使用增量解析缓存，重新解析所有文件')
+        parser.add_argument('--ignore', action='append', default=[], metavar='PATTERN',
+                            help='额外忽略的目录或文件 (glob模式，可重复指定)')
+        parser.add_argument('--format', '-f', choices=['json', 'ndjson'], default='json',
+                            help='机器可读报告的格式 (默认: json；ndjson为每行一条记录)')
+        parser.add_argument('--json-layout', choices=['full', 'indexed'], default='full',
+                            help='JSON报告的布局 (默认: full；indexed为紧凑格式，文件路径只出现一次，通过下标引用)')
+        parser.add_argument('--lua-registry', metavar='PATH',
+                            help='生成Lua注册表模块 (ID到名称的映射和每个模块的分发表)，定义未变化时不重写')
+        parser.add_argument('--profile', action='store_true',
+                            help='记录各阶段和每个文件的耗时，输出最慢的文件，并写入JSON报告的profile部分')
+        parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                            help='性能分析中列出的最慢文件数量 (默认: 10)')
+        git_group = parser.add_mutually_exclusive_group()
+        git_group.add_argument('--since', metavar='REV',
+                               help='只重新解析相对于该git版本有变化的文件，其余文件使用解析缓存')
+        git_group.add_argument('--staged', action='store_true',
+                               help='检查将要提交的git暂存区快照，暂存区中有变化的文件读取暂存区中的内容 (用于pre-commit钩子)')
+        parser.add_argument('--strict', action='store_true',
+                            help='发现ID冲突或保留范围违规时以退出码1结束')
+        parser.add_argument('--ownership', metavar='FILE',
+                            help='保留范围和所有者配置文件 (TOML或JSON)，替代脚本中的reserved_ranges')
+        parser.add_argument('--allocate', type=int, metavar='N',
+                            help='分配N个未使用的ID (优先连续)，不生成报告')
+        parser.add_argument('--range', dest='id_range', metavar='NAME|MIN-MAX',
+                            help='分配ID的范围：保留范围名称或MIN-MAX (默认: 所有保留范围以外)')
+        parser.add_argument('--manifest', metavar='FILE',
+                            help='批量检查清单文件中列出的项目 (每行一个项目根目录，#开头为注释)')
+        parser.add_argument('--summary', default='netmsg_batch_summary.json', metavar='PATH',
+                            help='批量检查的汇总报告路径 (默认: 当前目录下的netmsg_batch_summary.json)')
+        parser.add_argument('--watch', '-w', action='store_true',
+                            help='持续监视文件变化，增量更新冲突信息和报告')
+        parser.add_argument('--watch-interval', type=float, default=1.0, metavar='SECONDS',
+                            help='监视模式和查询服务轮询文件状态的间隔 (默认: 1秒)')
+        parser.add_argument('--serve', action='store_true',
+                            help='启动常驻的JSON-RPC查询服务 (默认使用标准输入输出)，日志写入标准错误')
+        parser.add_argument('--socket', metavar='PATH|[HOST:]PORT',
+                            help='查询服务监听的本地套接字：Unix套接字路径或TCP端口 (默认只监听127.0.0.1)')
+        shard_group = parser.add_mutually_exclusive_group()
+        shard_group.add_argument('--shard', metavar='I/N',
+                                 help='只解析按路径哈希分配到第I个分片 (共N个) 的文件，写入部分结果 (--output指定路径)')
+        shard_group.add_argument('--merge', nargs='+', metavar='PARTIAL',
+                                 help='合并所有分片的部分结果，检测冲突和保留范围违规并生成报告')
         
         args = parser.parse_args()
         
+        # 配置日志输出；监视模式和查询服务需要及时输出每次更新，不缓冲；
+        # 查询服务的标准输出用于响应，日志写入标准错误
+        level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+        configure_logging(level, buffered=not (args.watch or args.serve),
+                          stream=sys.stderr if args.serve else None)
+        
+        if args.socket is not None and not args.serve:
+            parser.error("--socket 需要与 --serve 一起使用")
+        if args.serve:
+            conflicting = [option for option, used in (
+                ("--since/--staged", args.since is not None or args.staged),
+                ("--allocate", args.allocate is not None), ("--watch", args.watch),
+                ("--profile", args.profile)) if used]
+            if conflicting:
+                parser.error(f"--serve 不支持以下参数: {', '.join(conflicting)}")
+        shard = None
+        if args.shard is not None:
+            try:
+                shard = parse_shard_spec(args.shard)
+            except ValueError as e:
+                parser.error(str(e))
+        if args.shard is not None or args.merge:
+            option = "--shard" if args.shard is not None else "--merge"
+            conflicting = [name for name, used in (
+                ("--since/--staged", args.since is not None or args.staged),
+                ("--allocate", args.allocate is not None), ("--watch", args.watch),
+                ("--serve", args.serve), ("--profile", args.profile)) if used]
+            if conflicting:
+                parser.error(f"{option} 不支持以下参数: {', '.join(conflicting)}")
+        
+        # 提前检查所有者配置文件，格式错误时直接给出提示
+        if args.ownership:
+            try:
+                load_ownership_config(os.path.abspath(args.ownership))
+            except (OSError, ValueError) as e:
+                logger.error(f"错误: {e}")
+                return 1
+        
+        # 指定多个项目或清单文件时，批量检查
+        project_roots = list(args.project_roots)
+        if args.manifest:
+            project_roots.extend(read_manifest(args.manifest))
+        if args.manifest or len(project_roots) > 1:
+            unsupported = [option for option, used in (
+                ("--auto-detect", args.auto_detect), ("--output", args.output),
+                ("--since/--staged", args.since is not None or args.staged),
+                ("--allocate", args.allocate is not None), ("--watch", args.watch),
+                ("--serve", args.serve), ("--profile", args.profile),
+                ("--shard/--merge", args.shard is not None or bool(args.merge))) if used]
+            if unsupported:
+                parser.error(f"批量检查不支持以下参数: {', '.join(unsupported)}")
+            return batch_command(project_roots, args)
+        
         # 规范化项目根目录路径
-        project_root = os.path.abspath(args.project_root)
+        project_root = os.path.abspath(project_roots[0] if project_roots else os.getcwd())
         
         # 自动检测项目根目录
         if args.auto_detect:
@@ -520,7 +4611,7 @@ def main():
             for _ in range(max_levels):
                 if os.path.exists(os.path.join(current_dir, "src")):
                     project_root = current_dir
-                    print(f"自动检测到项目根目录: {project_root}")
+                    logger.info(f"自动检测到项目根目录: {project_root}")
                     break
                 
                 parent_dir = os.path.dirname(current_dir)
@@ -529,58 +4620,95 @@ def main():
                 current_dir = parent_dir
         
         # 显示基本信息
-        print("============================================")
-        print("  UniX SDK - NetMsg ID 冲突检测工具")
-        print("============================================")
-        print(f"Python版本: {sys.version}")
-        print(f"操作系统: {sys.platform}")
-        print(f"项目根目录: {project_root}")
-        print("============================================")
+        logger.info("============================================")
+        logger.info("  UniX SDK - NetMsg ID 冲突检测工具")
+        logger.info("============================================")
+        logger.info(f"Python版本: {sys.version}")
+        logger.info(f"操作系统: {sys.platform}")
+        logger.info(f"项目根目录: {project_root}")
+        logger.info("============================================")
         
         # 检查项目根目录是否存在
         if not os.path.exists(project_root):
-            print(f"错误: 项目根目录不存在: {project_root}")
-            print(f"当前工作目录: {os.getcwd()}")
+            logger.error(f"错误: 项目根目录不存在: {project_root}")
+            logger.info(f"当前工作目录: {os.getcwd()}")
             return 1
             
         # 检查路径是否安全
         try:
             project_root = os.path.abspath(project_root)
             if not os.path.isabs(project_root):
-                print(f"错误: 项目根目录必须是绝对路径: {project_root}")
+                logger.error(f"错误: 项目根目录必须是绝对路径: {project_root}")
                 return 1
                 
             # 检查路径是否包含可疑字符
             if any(char in project_root for char in ['|', ';', '&', '`', '$', '(', ')', '<', '>']):
-                print(f"错误: 项目根目录包含可疑字符: {project_root}")
+                logger.error(f"错误: 项目根目录包含可疑字符: {project_root}")
                 return 1
         except Exception as e:
-            print(f"验证项目根目录时出错: {e}")
+            logger.error(f"验证项目根目录时出错: {e}")
             return 1
         
         # 检查是否是有效的项目目录
         if not os.path.exists(os.path.join(project_root, "src")):
-            print(f"警告: 指定的目录可能不是有效的项目根目录，未找到src目录: {project_root}")
-            print(f"提示: 请确保指定的是项目根目录，或使用 --auto-detect 参数自动检测")
+            logger.warning(f"警告: 指定的目录可能不是有效的项目根目录，未找到src目录: {project_root}")
+            logger.warning(f"提示: 请确保指定的是项目根目录，或使用 --auto-detect 参数自动检测")
             
-            # 安全地获取用户输入
-            try:
-                response = input("是否继续? (y/n): ").strip().lower()
-                if response != 'y':
+            if not args.yes:
+                # 非交互环境中无法确认，避免阻塞等待输入
+                if not sys.stdin or not sys.stdin.isatty():
+                    logger.error("错误: 非交互环境中无法确认，如需继续请使用 --yes 参数")
+                    return 1
+                
+                # 安全地获取用户输入
+                flush_logging()
+                try:
+                    response = input("是否继续? (y/n): ").strip().lower()
+                    if response != 'y':
+                        return 1
+                except (EOFError, KeyboardInterrupt):
+                    logger.error("\n用户取消操作")
                     return 1
-            except (EOFError, KeyboardInterrupt):
-                print("\n用户取消操作")
-                return 1
         
         # 创建检测器并运行
         checker = NetMsgConflictChecker(project_root)
-        checker.run()
+        checker.config["jobs"] = args.jobs
+        checker.config["use_cache"] = not args.no_cache
+        checker.config["ignore_patterns"].extend(args.ignore)
+        checker.config["report_format"] = args.format
+        checker.config["json_layout"] = args.json_layout
+        checker.config["profile"] = args.profile
+        checker.config["profile_top"] = max(0, args.profile_top)
+        if args.ownership:
+            checker.config["ownership_path"] = os.path.abspath(args.ownership)
+        if args.lua_registry:
+            checker.config["lua_registry_path"] = os.path.abspath(args.lua_registry)
+        if shard is not None:
+            if args.output:
+                checker.config["partial_output_path"] = os.path.abspath(args.output)
+            return shard_command(checker, *shard)
+        if args.output:
+            checker.config["output_path"] = os.path.abspath(args.output)
+        if args.allocate is not None:
+            return allocate_command(checker, args.allocate, args.id_range, args.since, args.staged)
+        if args.watch:
+            return checker.watch(max(0.05, args.watch_interval))
+        if args.serve:
+            return serve_command(checker, args.socket, max(0.05, args.watch_interval))
         
+        result = checker.run(since=args.since, staged=args.staged,
+                             partial_paths=[os.path.abspath(path) for path in args.merge] if args.merge else None)
+        if result is None:
+            return 1
+        if args.strict and not result.ok:
+            return 1
         return 0
     except Exception as e:
-        print(f"发生错误: {e}")
-        print(f"错误详情: {traceback.format_exc()}")
+        logger.error(f"发生错误: {e}")
+        logger.error(f"错误详情: {traceback.format_exc()}")
         return 1
+    finally:
+        flush_logging()
 
 
 if __name__ == "__main__":
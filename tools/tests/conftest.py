@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+"""测试共用配置：工具脚本不是安装的包，将tools目录加入模块搜索路径"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
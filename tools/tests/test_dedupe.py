@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""内容相同的文件只完整解析一次"""
+
+from netmsg_conflict_checker import parse_file_entry, run_deduplicated_parse_tasks
+
+
+def write_module(root, name, id_value):
+    path = root / f"{name}.lua"
+    path.write_text(f"local M = {{}}\nM.NetMsg = {{ Msg{id_value} = {id_value} }}\nreturn M\n", encoding="utf-8")
+    return path.name
+
+
+def run(root, names, known_entries=()):
+    tasks = [(str(root), name, None, False) for name in names]
+    sizes = [(root / name).stat().st_size for name in names]
+    return run_deduplicated_parse_tasks(tasks, sizes, known_entries)
+
+
+def test_copies_sharing_size_with_other_files_are_reused(tmp_path):
+    # 所有文件大小相同，内容两两相同：每种内容只解析一次
+    names = [write_module(tmp_path, f"m{index}", 100 + index) for index in range(10)]
+    for index in range(10):
+        (tmp_path / f"copy{index}.lua").write_bytes((tmp_path / names[index]).read_bytes())
+    names += [f"copy{index}.lua" for index in range(10)]
+    
+    results, reused = run(tmp_path, names)
+    assert reused == 10
+    for index in range(10):
+        assert results[index]["definitions"] == [(f"Msg{100 + index}", 100 + index)]
+        assert results[10 + index]["definitions"] == results[index]["definitions"]
+        assert results[10 + index]["size"] == results[index]["size"]
+
+
+def test_known_entry_matched_by_size_and_hash(tmp_path):
+    names = [write_module(tmp_path, f"m{index}", 100 + index) for index in range(3)]
+    known = [parse_file_entry(str(tmp_path), name) for name in names]
+    (tmp_path / "copy.lua").write_bytes((tmp_path / names[2]).read_bytes())
+    write_module(tmp_path, "other", 199)
+    
+    results, reused = run(tmp_path, ["copy.lua", "other.lua"], known)
+    assert reused == 1
+    assert results[0]["definitions"] == [("Msg102", 102)]
+    assert results[1]["definitions"] == [("Msg199", 199)]
+
+
+def test_unreadable_files_are_skipped(tmp_path):
+    names = [write_module(tmp_path, f"m{index}", 100 + index) for index in range(2)]
+    tasks = [(str(tmp_path), name, None, False) for name in names + ["missing.lua"]]
+    sizes = [(tmp_path / name).stat().st_size for name in names] + [(tmp_path / names[0]).stat().st_size]
+    results, reused = run_deduplicated_parse_tasks(tasks, sizes)
+    assert results[2] is None
+    assert reused == 0
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+"""重叠的扫描目录只收录一次文件，且不会因此输出警告"""
+
+import logging
+
+from netmsg_conflict_checker import NetMsgConflictChecker
+
+
+def discover(root, caplog):
+    checker = NetMsgConflictChecker(str(root))
+    # 只检查文件发现过程中的日志
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger="netmsg_conflict_checker"):
+        return [entry.path.replace("\\", "/") for entry in checker.discover_files()]
+
+
+def test_overlapping_scan_dirs_do_not_warn(tmp_path, caplog):
+    sdk = tmp_path / "src" / "Public" / "UniX-SDK"
+    sdk.mkdir(parents=True)
+    (sdk / "a.lua").write_text("X.NetMsg.A = 1\n", encoding="utf-8")
+    
+    assert discover(tmp_path, caplog) == ["src/Public/UniX-SDK/a.lua"]
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+
+def test_directory_without_matching_files_warns(tmp_path, caplog):
+    (tmp_path / "src" / "Public").mkdir(parents=True)
+    (tmp_path / "src" / "Game").mkdir()
+    (tmp_path / "src" / "Game" / "b.lua").write_text("X.NetMsg.B = 2\n", encoding="utf-8")
+    
+    assert discover(tmp_path, caplog) == ["src/Game/b.lua"]
+    warnings = [record.getMessage() for record in caplog.records if record.levelno >= logging.WARNING]
+    assert warnings == ["警告: 在目录 src/Public 中未找到任何 .lua 文件"]
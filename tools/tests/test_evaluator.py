@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""常量表达式的计算，以及扫描器只接受完整解析的ID值"""
+
+import pytest
+
+from netmsg_conflict_checker import evaluate_lua_constant, parse_lua_constant, scan_netmsg_definitions
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("210000", 210000),
+    ("0x30D41", 200001),
+    ("1e5", 100000),
+    ("2E3", 2000),
+    ("0x1p4", 16),
+    ("0x1.8p1", 3),
+    ("BASE + 3", 103),
+    ("(BASE + 1) * 2", 202),
+    ("BASE\n + 2", 102),
+    ("BASE -- 注释\n + 2", 102),
+    ("2 ^ 3 ^ 2", 512),
+    ("-2 ^ 2 + 8", 4),
+    ("7 // 2", 3),
+    ("BASE / 4", 25),
+])
+def test_constant_expressions(expr, expected):
+    assert evaluate_lua_constant(expr, {"BASE": 100}) == expected
+
+
+@pytest.mark.parametrize("expr", [
+    "1.5",          # 不是整数
+    "7 / 2",
+    "1e-1",
+    "1e",           # 格式错误的数字
+    "1..2",
+    "0x",
+    "BASE .. 'x'",  # 字符串拼接
+    "BASE or 5",
+    "f(1)",         # 函数调用和未知名称
+    "UNKNOWN + 1",
+    "-1",           # 负数
+    "1 / 0",
+    "(1 + 2",
+    "9223372036854775808",  # 超过MAX_ID_VALUE
+    "1" * 5000,
+    "2 ^ 70",
+])
+def test_non_constant_expressions(expr):
+    assert evaluate_lua_constant(expr, {"BASE": 100}) is None
+
+
+def test_parse_stops_before_next_statement():
+    text = "local A = 100 local B = 5"
+    value, end = parse_lua_constant(text, text.index("100"), {})
+    assert value == 100
+    assert text[end:] == " local B = 5"
+
+
+def test_exponent_is_not_read_as_next_statement():
+    assert scan_netmsg_definitions("X.NetMsg.A = 1e5\n") == [("A", 100000)]
+    assert scan_netmsg_definitions("X.NetMsg = {\n    A = 1e5,\n}\n") == [("A", 100000)]
+
+
+def test_expression_continues_on_next_line():
+    content = "local BASE = 100\nX.NetMsg.A = BASE\n    + 2\nX.NetMsg = {\n    B = BASE\n        + 3,\n}\n"
+    assert scan_netmsg_definitions(content) == [("A", 102), ("B", 103)]
+
+
+def test_locals_on_one_line():
+    content = "local BASE = 100 local OFF = 5\nX.NetMsg.A = BASE + OFF\n"
+    assert scan_netmsg_definitions(content) == [("A", 105)]
+
+
+def test_value_must_end_at_field_or_statement_boundary():
+    content = (
+        "local BASE = 100\n"
+        "X.NetMsg = {\n"
+        "    A = BASE .. 'x',\n"
+        "    B = BASE (1),\n"
+        "    C = 3 -- 注释\n"
+        "}\n"
+        "X.NetMsg.D = BASE and 1\n"
+        "X.NetMsg.E = BASE:Get()\n"
+        "if ok then X.NetMsg.F = 6 end\n"
+        "X.NetMsg.G = 7; X.NetMsg.H = 8\n"
+    )
+    assert scan_netmsg_definitions(content) == [("C", 3), ("F", 6), ("G", 7), ("H", 8)]
+
+
+def test_unknown_value_still_scans_references():
+    references = []
+    assert scan_netmsg_definitions("local id = X.NetMsg.Key\n", None, references) == []
+    assert references == [("Key", 1)]
+
+
+def test_local_in_nested_block_does_not_leak():
+    content = (
+        "local BASE = 10\n"
+        "local function Init()\n"
+        "    local BASE = 20\n"
+        "    X.NetMsg.Inner = BASE + 1\n"
+        "end\n"
+        "if DEBUG then local BASE = 30 elseif TEST then local BASE = 40 end\n"
+        "for i = 1, 3 do local BASE = 50 end\n"
+        "X.NetMsg.A = BASE + 1\n"
+    )
+    assert scan_netmsg_definitions(content) == [("Inner", 21), ("A", 11)]
+
+
+def test_parameter_shadows_local_constant():
+    content = (
+        "local BASE = 10\n"
+        "function M.Register(BASE)\n"
+        "    X.NetMsg.Inner = BASE + 1\n"
+        "end\n"
+        "X.NetMsg.A = BASE + 1\n"
+    )
+    assert scan_netmsg_definitions(content) == [("A", 11)]
+
+
+def test_redeclaration_without_constant_value():
+    content = (
+        "local BASE = 10\n"
+        "local OFF = 1\n"
+        "local BASE\n"
+        "local OFF, other = 2, 3\n"
+        "X.NetMsg.A = BASE + 1\n"
+        "X.NetMsg.B = OFF\n"
+        "local LIMIT <const> = 7\n"
+        "X.NetMsg.C = LIMIT\n"
+    )
+    assert scan_netmsg_definitions(content) == [("C", 7)]
+
+
+def test_ids_beyond_max_value_are_skipped():
+    content = (
+        "X.NetMsg = {\n"
+        "    A = 9223372036854775807,\n"
+        "    B = 9223372036854775808,\n"
+        "    C = " + "9" * 5000 + ",\n"
+        "}\n"
+        "X.NetMsg.D = 99999999999999999999\n"
+    )
+    assert scan_netmsg_definitions(content) == [("A", 9223372036854775807)]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""--since和--staged的增量检查与完整检查一致"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from netmsg_conflict_checker import NetMsgConflictChecker
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="需要git")
+
+
+def git(root, *args):
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@example.com"] + list(args),
+                   cwd=root, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def write_module(root, rel_path, body):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"local M = {{}}\nM.NetMsg = {{ {body} }}\nreturn M\n", encoding="utf-8")
+
+
+def definitions(root, **options):
+    checker = NetMsgConflictChecker(str(root))
+    result = checker.check(**options)
+    return sorted((d.name, d.id, d.file) for defs in result.discovered_ids.values() for d in defs)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "src" / "Public" / "UniX-SDK" / "tools").mkdir(parents=True)
+    (tmp_path / ".gitignore").write_text("src/Public/UniX-SDK/tools/\n", encoding="utf-8")
+    write_module(tmp_path, "src/Game/a.lua", "Foo = 1, Bar = 2")
+    git(tmp_path, "init", "-q", ".")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-qm", "base")
+    return tmp_path
+
+
+def test_since_rechecks_files_changed_by_checkout(repo):
+    write_module(repo, "src/Game/b.lua", "NewConf = 101")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "add")
+    definitions(repo)  # 建立解析缓存
+    
+    # 切换到旧版本后，b.lua不在工作区中，git diff HEAD也不会报告它
+    git(repo, "checkout", "-q", "HEAD~1")
+    assert definitions(repo, since="HEAD") == definitions(repo)
+    assert ("NewConf", 101, os.path.join("src", "Game", "b.lua")) not in definitions(repo, since="HEAD")
+    
+    # 切换回来后，缓存中没有的b.lua同样需要解析
+    git(repo, "checkout", "-q", "-")
+    assert definitions(repo, since="HEAD") == definitions(repo)
+
+
+def test_staged_reads_index_content(repo):
+    definitions(repo)
+    write_module(repo, "src/Game/a.lua", "Foo = 1, Staged = 3")
+    git(repo, "add", "src/Game/a.lua")
+    write_module(repo, "src/Game/a.lua", "Unstaged = 4")
+    write_module(repo, "src/Game/untracked.lua", "Untracked = 5")
+    
+    names = {name for name, _, _ in definitions(repo, staged=True)}
+    assert names == {"Foo", "Staged"}
+    
+    # 暂存区中的内容不写入缓存，之后的检查仍然使用工作区中的内容
+    assert {name for name, _, _ in definitions(repo, since="HEAD")} == {"Unstaged", "Untracked"}
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""NetMsgRegistry的注册、撤销、冲突和保留范围违规"""
+
+import random
+import time
+
+import pytest
+
+from netmsg_conflict_checker import NetMsgRegistry
+
+SDK_RANGE = {"name": "UniX SDK", "min": 200000, "max": 250000, "owners": ["**/*UniX-SDK*/**"]}
+
+
+def definitions(registry, id_value):
+    return [(d.name, d.id, d.file) for d in registry.discovered_ids[id_value]]
+
+
+def test_same_definition_registered_once():
+    registry = NetMsgRegistry([])
+    assert registry.register("Foo", 1, "a.lua")
+    assert not registry.register("Foo", 1, "a.lua")
+    assert definitions(registry, 1) == [("Foo", 1, "a.lua")]
+    assert not registry.conflicts
+
+
+def test_conflicts_follow_register_and_unregister():
+    registry = NetMsgRegistry([])
+    registry.register("Foo", 1, "a.lua")
+    registry.register("Bar", 1, "b.lua")
+    registry.register("Foo", 1, "c.lua")
+    assert list(registry.conflicts) == [1]
+    
+    registry.unregister_file("b.lua", [("Bar", 1)])
+    assert definitions(registry, 1) == [("Foo", 1, "a.lua"), ("Foo", 1, "c.lua")]
+    assert list(registry.conflicts) == [1]
+    
+    registry.unregister_file("a.lua", [("Foo", 1)])
+    assert definitions(registry, 1) == [("Foo", 1, "c.lua")]
+    assert not registry.conflicts
+    
+    registry.unregister_file("c.lua", [("Foo", 1)])
+    assert 1 not in registry.discovered_ids
+
+
+def test_unregister_keeps_order_and_appends_after_last():
+    registry = NetMsgRegistry([])
+    for index in range(5):
+        registry.register(f"N{index}", 7, f"f{index}.lua")
+    
+    # 依次移除中间、第一处和最后一处定义
+    registry.unregister_file("f2.lua", [("N2", 7)])
+    registry.unregister_file("f0.lua", [("N0", 7)])
+    registry.unregister_file("f4.lua", [("N4", 7)])
+    registry.register("N5", 7, "f5.lua")
+    assert definitions(registry, 7) == [("N1", 7, "f1.lua"), ("N3", 7, "f3.lua"), ("N5", 7, "f5.lua")]
+    
+    # 撤销不存在的定义不影响已有定义
+    registry.unregister_file("f1.lua", [("Other", 7), ("N1", 8)])
+    registry.unregister_file("missing.lua", [("N1", 7)])
+    assert len(registry.discovered_ids[7]) == 3
+
+
+def test_reserved_violations_respect_owners():
+    registry = NetMsgRegistry([SDK_RANGE])
+    registry.register("Sdk", 200001, "src/Public/UniX-SDK/net.lua")
+    registry.register("Game", 200002, "src/Game/net.lua")
+    registry.register("Free", 100, "src/Game/net.lua")
+    assert [(d.name, d.id) for d in registry.reserved_violations["UniX SDK"]] == [("Game", 200002)]
+    
+    registry.unregister_file("src/Game/net.lua", [("Game", 200002), ("Free", 100)])
+    assert registry.reserved_violations == {}
+
+
+def test_many_definitions_under_one_id_stay_linear():
+    # 逐个比较同一ID下的所有定义时，两万处定义需要数十秒
+    registry = NetMsgRegistry([])
+    count = 20000
+    start = time.perf_counter()
+    for index in range(count):
+        registry.register(f"N{index}", 7, f"f{index % 50}.lua")
+    assert not registry.register("N0", 7, "f0.lua")
+    for file_index in range(50):
+        registry.unregister_file(f"f{file_index}.lua",
+                                 [(f"N{index}", 7) for index in range(file_index, count, 50)])
+    assert time.perf_counter() - start < 5
+    assert not registry.discovered_ids
+    assert not registry.conflicts
+
+
+def test_random_operations_match_model():
+    rng = random.Random(20251017)
+    for _ in range(200):
+        registry = NetMsgRegistry([{"name": "Low", "min": 0, "max": 2, "owners": []}])
+        model = []  # [(名称, ID, 文件), ...]，按注册顺序排列
+        for _ in range(50):
+            file_path = f"f{rng.randrange(4)}.lua"
+            if rng.random() < 0.7:
+                definition = (f"N{rng.randrange(4)}", rng.randrange(5), file_path)
+                assert registry.register(*definition) == (definition not in model)
+                if definition not in model:
+                    model.append(definition)
+            else:
+                removed = [(name, id_value) for name, id_value, path in model if path == file_path]
+                removed = rng.sample(removed, rng.randrange(len(removed) + 1))
+                registry.unregister_file(file_path, removed)
+                model = [d for d in model if not (d[2] == file_path and (d[0], d[1]) in removed)]
+            
+            expected = {}
+            for definition in model:
+                expected.setdefault(definition[1], []).append(definition)
+            assert {id_value: definitions(registry, id_value) for id_value in registry.discovered_ids} == expected
+            assert set(registry.conflicts) == {id_value for id_value, defs in expected.items() if len(defs) > 1}
+            assert sorted((d.name, d.id, d.file) for d in registry.reserved_violations.get("Low", [])) == \
+                sorted(d for d in model if d[1] <= 2)
+
+
+def test_records_support_key_access():
+    registry = NetMsgRegistry([])
+    registry.register("Foo", 1, "a.lua")
+    definition = registry.discovered_ids[1][0]
+    assert definition.name == definition["name"] == "Foo"
+    assert dict(definition) == {"name": "Foo", "id": 1, "file": "a.lua"}
+    assert definition.get("line") is None
+    with pytest.raises(KeyError):
+        definition["line"]
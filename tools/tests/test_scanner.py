@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""分块扫描与一次性扫描的结果一致，没有换行的文件也按块扫描"""
+
+import io
+
+import pytest
+
+import netmsg_conflict_checker
+from netmsg_conflict_checker import (NetMsgScanner, _new_parse_entry, _parse_file_stream, _scan_stream,
+                                     scan_netmsg_definitions)
+
+
+def single_line_source(count):
+    """生成压缩成一行的源码，包含跨越分块边界的行注释、字符串和长注释"""
+    parts = ["local BASE = 1000 local P = {} P.NetMsg = {"]
+    for index in range(count):
+        parts.append(f" Msg{index} = BASE + {index},")
+        if index % 7 == 0:
+            parts.append(' Text = "' + "NetMsg.Fake = 1 " * 20 + '",')
+        if index % 11 == 0:
+            parts.append(" --[[ Fake = 2, " + "x" * 200 + " ]]")
+    parts.append(" } P.NetMsg.Tail = BASE * 2 return P -- " + "NetMsg.Comment = 3 " * 50)
+    return "".join(parts)
+
+
+def scan_in_chunks(content, chunk_size):
+    references = []
+    scanner = _scan_stream(io.BytesIO(content.encode("utf-8")), "utf-8", "strict", chunk_size, references, None)
+    return scanner.definitions, references
+
+
+@pytest.fixture
+def feed_sizes(monkeypatch):
+    """记录每次输入扫描器的内容长度"""
+    sizes = []
+    feed = NetMsgScanner.feed
+    
+    def recording_feed(self, content, final=True):
+        sizes.append(len(content))
+        return feed(self, content, final)
+    
+    monkeypatch.setattr(NetMsgScanner, "feed", recording_feed)
+    return sizes
+
+
+@pytest.mark.parametrize("chunk_size", [1, 37, 1000])
+def test_single_line_file_matches_single_pass(monkeypatch, feed_sizes, chunk_size):
+    monkeypatch.setattr(netmsg_conflict_checker, "SCAN_HOLDBACK", 64)
+    content = single_line_source(300)
+    assert "\n" not in content
+    
+    expected = scan_netmsg_definitions(content, None, [])
+    assert len(expected) == 301
+    feed_sizes.clear()
+    assert scan_in_chunks(content, chunk_size) == (expected, [])
+    # 未处理部分不随文件增长：最长的单个记号（字符串）加上分块和保留长度
+    assert max(feed_sizes) < chunk_size + 64 + 400
+
+
+def test_multiline_file_matches_single_pass(monkeypatch):
+    monkeypatch.setattr(netmsg_conflict_checker, "SCAN_HOLDBACK", 64)
+    content = single_line_source(200).replace(",", ",\n").replace("--[[", "\n--[[") + "\nprint(P.NetMsg.Msg3)\n"
+    references = []
+    expected = scan_netmsg_definitions(content, None, references)
+    assert references == [("Msg3", content.count("\n"))]
+    for chunk_size in (1, 50, 999):
+        assert scan_in_chunks(content, chunk_size) == (expected, references)
+
+
+def test_line_comment_crossing_chunks_without_newline(monkeypatch):
+    monkeypatch.setattr(netmsg_conflict_checker, "SCAN_HOLDBACK", 16)
+    content = "X.NetMsg.A = 1 -- " + "X.NetMsg.B = 2 " * 100 + "\nX.NetMsg.C = 3\n"
+    assert scan_in_chunks(content, 10)[0] == [("A", 1), ("C", 3)]
+
+
+def test_stream_rescans_with_scopes_when_ids_use_locals():
+    content = "local BASE = 10\nfunction f()\n    local BASE = 20\nend\nX.NetMsg.A = BASE + 1\nprint(X.NetMsg.A)\n"
+    entry = _new_parse_entry(len(content), 0, False)
+    _parse_file_stream(io.BytesIO(content.encode("utf-8")), entry, None, 0.0, chunk_size=8)
+    assert entry["definitions"] == [("A", 11)]
+    assert entry["references"] == [("A", 6)]
+
+
+def test_references_inside_definition_block(monkeypatch):
+    content = (
+        "local P = {}\n"
+        "P.NetMsg = {\n"
+        "    A = Other.NetMsg.B,\n"
+        "    C = 5, -- Other.NetMsg.Commented\n"
+        "    D = { Other.NetMsg.E, 'Other.NetMsg.Quoted' },\n"
+        "    F = MyNetMsg.G,\n"
+        "}\n"
+        "print(P.NetMsg.C)\n"
+    )
+    references = []
+    assert scan_netmsg_definitions(content, None, references) == [("C", 5)]
+    assert references == [("B", 3), ("E", 5), ("C", 8)]
+    
+    monkeypatch.setattr(netmsg_conflict_checker, "SCAN_HOLDBACK", 16)
+    for chunk_size in (1, 7, 40):
+        assert scan_in_chunks(content, chunk_size) == ([("C", 5)], references)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""监视模式：首次检查失败时不进入监视，新建的目录匹配忽略规则时不监视"""
+
+import sys
+import time
+
+import pytest
+
+import netmsg_conflict_checker
+from netmsg_conflict_checker import NetMsgConflictChecker
+
+
+def test_watch_stops_when_first_check_fails(tmp_path, monkeypatch):
+    checker = NetMsgConflictChecker(str(tmp_path))
+    monkeypatch.setattr(checker, "run", lambda: None)
+    monkeypatch.setattr(netmsg_conflict_checker, "_create_file_watcher",
+                        lambda checker: pytest.fail("首次检查失败后不应开始监视"))
+    assert checker.watch(0.05) == 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="需要inotify")
+def test_new_ignored_directory_is_not_watched(tmp_path):
+    (tmp_path / "src").mkdir()
+    checker = NetMsgConflictChecker(str(tmp_path))
+    checker.discover_files()
+    watcher = netmsg_conflict_checker._InotifyWatcher(checker)
+    try:
+        ignored = tmp_path / "src" / "node_modules"
+        ignored.mkdir()
+        (ignored / "a.lua").write_text("X.NetMsg.A = 1\n", encoding="utf-8")
+        (tmp_path / "src" / "Game").mkdir()
+        (tmp_path / "src" / "Game" / "b.lua").write_text("X.NetMsg.B = 2\n", encoding="utf-8")
+        time.sleep(0.05)
+        
+        changed = {path.replace("\\", "/") for path in watcher.poll(1.0)}
+        assert changed == {"src/Game", "src/Game/b.lua"}
+        assert str(ignored) not in watcher._watches.values()
+    finally:
+        watcher.close()